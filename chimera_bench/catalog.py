@@ -2,19 +2,27 @@ from __future__ import annotations
 
 import csv
 import gzip
+import io
 import json
-import os
-import re
-import shlex
+import math
 import shutil
+import socket
 import subprocess
-from collections import Counter
-from datetime import datetime, timezone
+import tempfile
+import threading
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import Any, Iterable
+from typing import Any, BinaryIO, Iterable, Iterator
 
 from .config import load_yaml_dir
 from .dataset_prepare import resolve_strain_madness_reads
+from .io.catalog_cache import CatalogCache
+from .io.fingerprint import content_fingerprint, stat_signature
+from .io.length_sketch import LengthSketch
+from .io.records import iter_fastq_blocks, iter_line_blocks
+from .io.reference_index import ReferenceIndex
 
 
 PUBLIC_DATASET_ORDER = [
@@ -61,12 +69,25 @@ DB_SOURCE_NAMES = {
     "refseq_complete": "NCBI RefSeq complete genomes",
 }
 MISSING = "—"
-CATALOG_CACHE_VERSION = 2
 _SEQKIT_CMD: list[str] | None | bool = False
-
-
-def _now_iso() -> str:
-    return datetime.now(timezone.utc).isoformat()
+SCAN_ENGINES = ("auto", "seqkit", "python")
+# Engine picked per file kind ("fastq", "fasta.gz", ...) in this process; see `_select_engine`.
+_ENGINE_CHOICES: dict[str, str] = {}
+# Calibration times both engines on up to this many (uncompressed) bytes from the first file of
+# a kind, and is skipped for smaller samples, whose timings are mostly process start-up.
+_CALIBRATION_BYTES = 32 << 20
+_CALIBRATION_MIN_BYTES = 8 << 20
+_SCAN_BLOCK_BYTES = 1 << 22
+# Uncompressed files are split into byte ranges of at least this size for parallel scans.
+_RANGE_SCAN_MIN_BYTES = 64 << 20
+# Deleting these bytes leaves only the G/C bases, or only the Q30 (Phred+33 >= '?') quality characters.
+# `catalog --approx` samples records at this many evenly spaced offsets of an uncompressed file.
+_APPROX_POINTS = 8
+_APPROX_GZIP_CHUNK = 1 << 16
+# Normal quantile of the two-sided 95% error bounds reported for estimates.
+_APPROX_Z = 1.96
+_NON_GC_BYTES = bytes(value for value in range(256) if value not in b"GgCc")
+_LOW_QUAL_BYTES = bytes(range(33 + 30))
 
 
 def _open_text(path: Path):
@@ -75,33 +96,6 @@ def _open_text(path: Path):
     return path.open("r", encoding="utf-8", errors="strict")
 
 
-def _file_signature(path: Path) -> str:
-    stat = path.stat()
-    return f"{stat.st_size}:{stat.st_mtime_ns}"
-
-
-def _read_cache(cache_path: Path) -> dict[str, Any]:
-    if not cache_path.exists():
-        return {"version": CATALOG_CACHE_VERSION, "files": {}}
-    try:
-        payload = json.loads(cache_path.read_text())
-    except json.JSONDecodeError:
-        return {"version": CATALOG_CACHE_VERSION, "files": {}}
-    if not isinstance(payload, dict):
-        return {"version": CATALOG_CACHE_VERSION, "files": {}}
-    if payload.get("version") != CATALOG_CACHE_VERSION:
-        return {"version": CATALOG_CACHE_VERSION, "files": {}}
-    if not isinstance(payload.get("files"), dict):
-        payload["files"] = {}
-    return payload
-
-
-def _write_cache(cache_path: Path, payload: dict[str, Any]) -> None:
-    cache_path.parent.mkdir(parents=True, exist_ok=True)
-    payload["version"] = CATALOG_CACHE_VERSION
-    cache_path.write_text(json.dumps(payload, indent=2, sort_keys=True))
-
-
 def _detect_sequence_format(path: Path) -> str:
     lower = path.name.lower()
     fasta_suffixes = (".fa", ".fna", ".fasta", ".fa.gz", ".fna.gz", ".fasta.gz")
@@ -159,19 +153,9 @@ def _catalog_number_or_text(value: Any) -> int | str:
     return _parse_int(text)
 
 
-def _n50_from_hist(length_counts: dict[int, int] | Counter[int], total_bases: int) -> int:
-    if total_bases <= 0:
-        return 0
-    threshold = total_bases / 2
-    running = 0
-    for length in sorted(length_counts, reverse=True):
-        running += int(length) * int(length_counts[length])
-        if running >= threshold:
-            return int(length)
-    return 0
-
-
-def _stats_complete(stats: dict[str, Any], *, require_histogram: bool) -> bool:
+def _stats_complete(stats: dict[str, Any], *, require_histogram: bool, allow_estimate: bool = False) -> bool:
+    if stats.get("estimated") and not allow_estimate:
+        return False
     required = {
         "format",
         "records",
@@ -187,7 +171,7 @@ def _stats_complete(stats: dict[str, Any], *, require_histogram: bool) -> bool:
         return False
     if stats.get("format") == "fastq" and "q30_percent" not in stats:
         return False
-    if require_histogram and "length_counts" not in stats:
+    if require_histogram and "length_sketch" not in stats:
         return False
     return True
 
@@ -199,7 +183,7 @@ def _finalize_sequence_stats(
     total_bases: int,
     min_len: int,
     max_len: int,
-    length_counts: Counter[int],
+    lengths: LengthSketch,
     gc_bases: int,
     q30_bases: int | None,
     size_bytes: int,
@@ -213,7 +197,7 @@ def _finalize_sequence_stats(
         "min_len": min_len if records else 0,
         "mean_len": mean_len,
         "max_len": max_len if records else 0,
-        "n50": _n50_from_hist(length_counts, total_bases),
+        "n50": lengths.n50(total_bases),
         "gc_percent": (gc_bases * 100 / total_bases) if total_bases else 0.0,
         "size_bytes": size_bytes,
     }
@@ -222,113 +206,370 @@ def _finalize_sequence_stats(
     else:
         stats["q30_percent"] = None
     if keep_histogram:
-        stats["length_counts"] = {str(length): count for length, count in length_counts.items()}
+        stats["length_sketch"] = lengths.to_dict()
         stats["gc_bases"] = gc_bases
         if q30_bases is not None:
             stats["q30_bases"] = q30_bases
     return stats
 
 
-def _scan_fastq(path: Path, *, keep_histogram: bool) -> dict[str, Any]:
-    records = 0
-    total_bases = 0
-    min_len: int | None = None
-    max_len = 0
-    gc_bases = 0
-    q30_bases = 0
-    length_counts: Counter[int] = Counter()
-    with _open_text(path) as fh:
-        while True:
-            header = fh.readline()
-            if not header:
-                break
-            seq = fh.readline().rstrip("\n\r")
-            plus = fh.readline()
-            qual = fh.readline().rstrip("\n\r")
-            if not seq or not plus or not qual:
-                raise ValueError(f"FASTQ record truncated: {path}")
-            if not header.startswith("@") or not plus.startswith("+"):
-                raise ValueError(f"invalid FASTQ record: {path}")
-            if len(seq) != len(qual):
-                raise ValueError(f"FASTQ sequence/quality length mismatch: {path}")
-            length = len(seq)
-            records += 1
-            total_bases += length
-            min_len = length if min_len is None else min(min_len, length)
-            max_len = max(max_len, length)
-            length_counts[length] += 1
-            for base in seq:
-                if base in "GgCc":
-                    gc_bases += 1
-            for char in qual:
-                if ord(char) - 33 >= 30:
-                    q30_bases += 1
+def _empty_partial() -> dict[str, Any]:
+    return {
+        "records": 0,
+        "total_bases": 0,
+        "min_len": None,
+        "max_len": 0,
+        "lengths": LengthSketch(),
+        "gc_bases": 0,
+        "q30_bases": 0,
+    }
+
+
+def _finalize_partials(fmt: str, partials: list[dict[str, Any]], *, size_bytes: int, keep_histogram: bool) -> dict[str, Any]:
+    """Reduce per-range partial stats (in file order) to the stats of a whole-file scan."""
+    lengths = LengthSketch()
+    for partial in partials:
+        lengths.merge(partial["lengths"])
+    min_lens = [partial["min_len"] for partial in partials if partial["min_len"] is not None]
     return _finalize_sequence_stats(
-        fmt="fastq",
-        records=records,
-        total_bases=total_bases,
-        min_len=min_len or 0,
-        max_len=max_len,
-        length_counts=length_counts,
-        gc_bases=gc_bases,
-        q30_bases=q30_bases,
-        size_bytes=path.stat().st_size,
+        fmt=fmt,
+        records=sum(partial["records"] for partial in partials),
+        total_bases=sum(partial["total_bases"] for partial in partials),
+        min_len=min(min_lens) if min_lens else 0,
+        max_len=max(partial["max_len"] for partial in partials),
+        lengths=lengths,
+        gc_bases=sum(partial["gc_bases"] for partial in partials),
+        q30_bases=sum(partial["q30_bases"] for partial in partials) if fmt == "fastq" else None,
+        size_bytes=size_bytes,
         keep_histogram=keep_histogram,
     )
 
 
-def _scan_fasta(path: Path, *, keep_histogram: bool) -> dict[str, Any]:
-    records = 0
-    total_bases = 0
-    min_len: int | None = None
-    max_len = 0
+def _scan_fastq_range(path: Path, start: int = 0, end: int | None = None) -> dict[str, Any]:
+    partial = _empty_partial()
+    for _headers, seqs, _pluses, quals in iter_fastq_blocks(path, start, end):
+        lengths = list(map(len, seqs))
+        block_min = min(lengths)
+        partial["records"] += len(lengths)
+        partial["total_bases"] += sum(lengths)
+        partial["min_len"] = block_min if partial["min_len"] is None else min(partial["min_len"], block_min)
+        partial["max_len"] = max(partial["max_len"], max(lengths))
+        partial["lengths"].update(lengths)
+        partial["gc_bases"] += len(b"".join(seqs).translate(None, _NON_GC_BYTES))
+        partial["q30_bases"] += len(b"".join(quals).translate(None, _LOW_QUAL_BYTES))
+    return partial
+
+
+def _scan_fasta_range(path: Path, start: int = 0, end: int | None = None) -> dict[str, Any]:
+    partial = _empty_partial()
+    lengths = partial["lengths"]
     current_bases = 0
-    current_gc = 0
-    gc_bases = 0
-    length_counts: Counter[int] = Counter()
     saw_header = False
 
     def finish_record() -> None:
-        nonlocal records, total_bases, min_len, max_len, current_bases, current_gc, gc_bases
-        records += 1
-        total_bases += current_bases
-        gc_bases += current_gc
-        min_len = current_bases if min_len is None else min(min_len, current_bases)
-        max_len = max(max_len, current_bases)
-        length_counts[current_bases] += 1
-
-    with _open_text(path) as fh:
-        for raw in fh:
+        partial["records"] += 1
+        partial["total_bases"] += current_bases
+        partial["min_len"] = current_bases if partial["min_len"] is None else min(partial["min_len"], current_bases)
+        partial["max_len"] = max(partial["max_len"], current_bases)
+        lengths.add(current_bases)
+
+    for block in iter_line_blocks(path, start, end):
+        seq_lines: list[bytes] = []
+        for raw in block:
             line = raw.strip()
             if not line:
                 continue
-            if line.startswith(">"):
+            if line.startswith(b">"):
                 if saw_header:
                     finish_record()
                 saw_header = True
                 current_bases = 0
-                current_gc = 0
                 continue
             if not saw_header:
                 raise ValueError(f"FASTA sequence before header: {path}")
             current_bases += len(line)
-            for base in line:
-                if base in "GgCc":
-                    current_gc += 1
+            seq_lines.append(line)
+        # GC only feeds the file total, so count it once per block.
+        partial["gc_bases"] += len(b"".join(seq_lines).translate(None, _NON_GC_BYTES))
     if saw_header:
         finish_record()
-    return _finalize_sequence_stats(
-        fmt="fasta",
-        records=records,
-        total_bases=total_bases,
-        min_len=min_len or 0,
-        max_len=max_len,
-        length_counts=length_counts,
-        gc_bases=gc_bases,
-        q30_bases=None,
-        size_bytes=path.stat().st_size,
-        keep_histogram=keep_histogram,
+    return partial
+
+
+def _scan_range(path: Path, fmt: str, start: int = 0, end: int | None = None) -> dict[str, Any]:
+    if fmt == "fastq":
+        return _scan_fastq_range(path, start, end)
+    return _scan_fasta_range(path, start, end)
+
+
+def _scan_fastq(path: Path, *, keep_histogram: bool) -> dict[str, Any]:
+    return _finalize_partials(
+        "fastq", [_scan_fastq_range(path)], size_bytes=path.stat().st_size, keep_histogram=keep_histogram
+    )
+
+
+def _scan_fasta(path: Path, *, keep_histogram: bool) -> dict[str, Any]:
+    return _finalize_partials(
+        "fasta", [_scan_fasta_range(path)], size_bytes=path.stat().st_size, keep_histogram=keep_histogram
+    )
+
+
+def _is_fastq_record(buf: bytes, ends: list[int]) -> bool:
+    seq = buf[ends[0] + 1 : ends[1]].rstrip(b"\r")
+    plus = buf[ends[1] + 1 : ends[2]]
+    qual = buf[ends[2] + 1 : ends[3]].rstrip(b"\r")
+    following = buf[ends[3] + 1 : ends[3] + 2]
+    return bool(seq) and plus.startswith(b"+") and len(seq) == len(qual) and following in {b"", b"@"}
+
+
+def _next_record_start(fh: BinaryIO, offset: int, fmt: str) -> int | None:
+    """First record start at or after `offset` (> 0) in an uncompressed FASTA/FASTQ file.
+
+    FASTA records start at a `>` line. A FASTQ `@` line may also be a quality line, so a
+    candidate must be followed by a sequence, a `+` line, an equally long quality line and
+    another `@` line (or the end of the file).
+    """
+    fh.seek(offset - 1)
+    buf = fh.read(_SCAN_BLOCK_BYTES)
+    eof = not buf
+    marker = b">" if fmt == "fasta" else b"@"
+    search = 0
+    while True:
+        if eof and buf and not buf.endswith(b"\n"):
+            buf += b"\n"
+        newline = buf.find(b"\n", search)
+        candidate = newline + 1
+        ready = newline >= 0 and (candidate < len(buf) or eof)
+        ends: list[int] = []
+        if ready and fmt == "fastq" and buf[candidate : candidate + 1] == marker:
+            pos = candidate
+            while len(ends) < 4:
+                end = buf.find(b"\n", pos)
+                if end < 0:
+                    break
+                ends.append(end)
+                pos = end + 1
+            ready = len(ends) == 4 and (ends[3] + 1 < len(buf) or eof)
+        if not ready:
+            if eof:
+                return None
+            more = fh.read(_SCAN_BLOCK_BYTES)
+            eof = not more
+            buf += more
+            continue
+        if candidate >= len(buf):
+            return None
+        if buf[candidate : candidate + 1] == marker and (fmt == "fasta" or _is_fastq_record(buf, ends)):
+            return offset - 1 + candidate
+        search = candidate
+
+
+def _record_ranges(path: Path, fmt: str, parts: int) -> list[tuple[int, int]]:
+    """Split an uncompressed file into up to `parts` byte ranges that each start at a record."""
+    size = path.stat().st_size
+    offsets = [0]
+    with path.open("rb") as fh:
+        for idx in range(1, parts):
+            target = max(size * idx // parts, offsets[-1] + 1)
+            if target >= size:
+                break
+            offset = _next_record_start(fh, target, fmt)
+            if offset is None:
+                break
+            offsets.append(offset)
+    offsets.append(size)
+    return list(zip(offsets, offsets[1:]))
+
+
+def _iter_sample_lines(path: Path, start: int = 0, end: int | None = None) -> Iterator[tuple[bytes, float]]:
+    """Raw lines (line ending stripped) from `start`, each with the file bytes it occupies.
+
+    gzip input is always read from the start; a line is charged its share of the compressed
+    bytes that decoded to it.
+    """
+    if path.suffix != ".gz":
+        with path.open("rb") as fh:
+            fh.seek(start)
+            pos = start
+            while end is None or pos < end:
+                line = fh.readline()
+                if not line:
+                    return
+                pos += len(line)
+                yield line.rstrip(b"\r\n"), float(len(line))
+        return
+    decomp = zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+    pending = b""
+    pending_cost = 0.0
+    carry = 0.0
+    with path.open("rb") as fh:
+        for chunk in iter(lambda: fh.read(_APPROX_GZIP_CHUNK), b""):
+            out: list[bytes] = []
+            data = chunk
+            while data:
+                out.append(decomp.decompress(data))
+                if not decomp.eof:
+                    break
+                # Concatenated (multi-member) gzip: continue with a fresh decompressor.
+                data = decomp.unused_data
+                decomp = zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+            text = b"".join(out)
+            carry += len(chunk)
+            if not text:
+                continue
+            rate = carry / len(text)
+            carry = 0.0
+            pieces = text.split(b"\n")
+            for piece in pieces[:-1]:
+                yield (pending + piece).rstrip(b"\r"), pending_cost + (len(piece) + 1) * rate
+                pending, pending_cost = b"", 0.0
+            pending += pieces[-1]
+            pending_cost += len(pieces[-1]) * rate
+    if pending:
+        yield pending.rstrip(b"\r"), pending_cost + carry
+
+
+def _add_sample_record(point: dict[str, Any], seq: bytes, qual: bytes | None, cost: float) -> None:
+    partial = point["partial"]
+    length = len(seq)
+    partial["records"] += 1
+    partial["total_bases"] += length
+    partial["min_len"] = length if partial["min_len"] is None else min(partial["min_len"], length)
+    partial["max_len"] = max(partial["max_len"], length)
+    partial["lengths"].add(length)
+    partial["gc_bases"] += len(seq.translate(None, _NON_GC_BYTES))
+    if qual is not None:
+        partial["q30_bases"] += len(qual.translate(None, _LOW_QUAL_BYTES))
+    point["units"].append((length, cost))
+
+
+def _sample_point(path: Path, fmt: str, start: int, end: int | None, records: int) -> dict[str, Any]:
+    """Partial stats of up to `records` records from `start`; `complete` when the range ran out first."""
+    point: dict[str, Any] = {"partial": _empty_partial(), "units": [], "complete": True}
+    lines = _iter_sample_lines(path, start, end)
+    if fmt == "fastq":
+        record: list[bytes] = []
+        cost = 0.0
+        for line, line_cost in lines:
+            if len(point["units"]) >= records:
+                point["complete"] = False
+                break
+            record.append(line)
+            cost += line_cost
+            if len(record) < 4:
+                continue
+            header, seq, plus, qual = record
+            if not seq or not qual:
+                raise ValueError(f"FASTQ record truncated: {path}")
+            if not header.startswith(b"@") or not plus.startswith(b"+"):
+                raise ValueError(f"invalid FASTQ record: {path}")
+            if len(seq) != len(qual):
+                raise ValueError(f"FASTQ sequence/quality length mismatch: {path}")
+            _add_sample_record(point, seq, qual, cost)
+            record = []
+            cost = 0.0
+        else:
+            if record:
+                raise ValueError(f"FASTQ record truncated: {path}")
+        lines.close()
+        return point
+
+    seq_lines: list[bytes] = []
+    cost = 0.0
+    saw_header = False
+    for line, line_cost in lines:
+        stripped = line.strip()
+        if stripped.startswith(b">"):
+            if saw_header:
+                _add_sample_record(point, b"".join(seq_lines), None, cost)
+                if len(point["units"]) >= records:
+                    point["complete"] = False
+                    break
+            saw_header = True
+            seq_lines = []
+            cost = line_cost
+            continue
+        cost += line_cost
+        if not stripped:
+            continue
+        if not saw_header:
+            raise ValueError(f"FASTA sequence before header: {path}")
+        seq_lines.append(stripped)
+    else:
+        if saw_header:
+            _add_sample_record(point, b"".join(seq_lines), None, cost)
+    lines.close()
+    return point
+
+
+def _ratio_half_width(units: list[tuple[float, float]], size: int) -> float:
+    """95% error bound of the ratio estimate `size * sum(y) / sum(x)` over sampled `(y, x)` units."""
+    n = len(units)
+    total_x = sum(x for _y, x in units)
+    if total_x <= 0:
+        return 0.0
+    ratio = sum(y for y, _x in units) / total_x
+    if n < 2:
+        return size * ratio
+    residual = sum((y - ratio * x) ** 2 for y, x in units) / (n - 1)
+    finite = max(0.0, 1.0 - total_x / size)
+    return _APPROX_Z * size * math.sqrt(finite * residual / n) / (total_x / n)
+
+
+def _approx_scan(path: Path, records: int, keep_histogram: bool) -> dict[str, Any]:
+    """Stats extrapolated from `records` records at each of `_APPROX_POINTS` evenly spaced offsets.
+
+    Record and base counts are scaled from the sampled bytes to the file size and carry
+    `records_ci`/`bases_ci` error bounds; length, GC and Q30 figures are those of the sample.
+    gzip streams cannot be entered mid-way, so only their first `records` records are read and
+    the bounds assume that head is representative. When every sampled range is read to its
+    end the exact stats are returned instead.
+    """
+    if records < 1:
+        raise ValueError(f"approximate catalog needs at least one record per offset: {records}")
+    fmt = _detect_sequence_format(path)
+    size = path.stat().st_size
+    ranges = [(0, None)] if path.suffix == ".gz" else _record_ranges(path, fmt, _APPROX_POINTS)
+    points = [_sample_point(path, fmt, start, end, records) for start, end in ranges]
+    partials = [point["partial"] for point in points]
+    if all(point["complete"] for point in points):
+        return _finalize_partials(fmt, partials, size_bytes=size, keep_histogram=keep_histogram)
+
+    stats = _finalize_partials(fmt, partials, size_bytes=size, keep_histogram=False)
+    sampled_bytes = sum(cost for point in points for _length, cost in point["units"])
+    if len(points) > 1:
+        # Records next to each other are alike, so each offset is one sampling unit.
+        units = [
+            (
+                float(point["partial"]["records"]),
+                float(point["partial"]["total_bases"]),
+                sum(cost for _length, cost in point["units"]),
+            )
+            for point in points
+        ]
+    else:
+        units = [(1.0, float(length), cost) for length, cost in points[0]["units"]]
+    factor = size / sampled_bytes
+    sampled_records = stats["records"]
+    stats.update(
+        {
+            "records": round(sampled_records * factor),
+            "total_bases": round(stats["total_bases"] * factor),
+            "estimated": True,
+            "records_ci": _ratio_half_width([(y, x) for y, _bases, x in units], size),
+            "bases_ci": _ratio_half_width([(bases, x) for _y, bases, x in units], size),
+            "sampled_records": sampled_records,
+        }
     )
+    if keep_histogram:
+        lengths_sketch = LengthSketch()
+        for partial in partials:
+            lengths_sketch.merge(partial["lengths"])
+        stats["length_sketch"] = lengths_sketch.scaled(factor).to_dict()
+        stats["gc_bases"] = round(sum(partial["gc_bases"] for partial in partials) * factor)
+        if fmt == "fastq":
+            stats["q30_bases"] = round(sum(partial["q30_bases"] for partial in partials) * factor)
+    return stats
 
 
 def _seqkit_cmd() -> list[str] | None:
@@ -351,6 +592,18 @@ def _seqkit_cmd() -> list[str] | None:
         _SEQKIT_CMD = [str(env_seqkit)]
         return list(_SEQKIT_CMD)
 
+    # Resolve the environment's binary once, so later calls skip `conda run` start-up.
+    located = subprocess.run(
+        [conda_bin, "run", "-n", "seqkit", "sh", "-c", "command -v seqkit"],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    located_lines = located.stdout.strip().splitlines() if located.returncode == 0 else []
+    if located_lines and Path(located_lines[-1]).is_file():
+        _SEQKIT_CMD = [located_lines[-1]]
+        return list(_SEQKIT_CMD)
+
     probe = subprocess.run(
         [conda_bin, "run", "-n", "seqkit", "seqkit", "version"],
         stdout=subprocess.DEVNULL,
@@ -365,31 +618,49 @@ def _seqkit_cmd() -> list[str] | None:
     return list(_SEQKIT_CMD)
 
 
-def _cache_hit(cache: dict[str, Any], path: Path, *, require_histogram: bool) -> tuple[str, dict[str, Any] | None]:
-    key = str(path)
-    signature = _file_signature(path)
-    cached = cache.setdefault("files", {}).get(key)
-    if isinstance(cached, dict) and cached.get("signature") == signature:
-        stats = cached.get("stats")
-        if isinstance(stats, dict) and _stats_complete(stats, require_histogram=require_histogram):
-            return signature, dict(stats)
-    return signature, None
-
-
-def _store_cache(cache: dict[str, Any], path: Path, *, signature: str, stats: dict[str, Any]) -> None:
-    cache.setdefault("files", {})[str(path)] = {
-        "signature": signature,
-        "stats": stats,
-        "updated_at": _now_iso(),
-    }
+def _cache_hit(
+    cache: CatalogCache | None, path: Path, *, require_histogram: bool, allow_estimate: bool = False
+) -> tuple[dict[str, str | None], dict[str, Any] | None]:
+    """Cached stats for `path`, matched on its stat signature or else on its content fingerprint.
+
+    Returns the file's fingerprints (content only computed after a signature miss) and the
+    stats. A content match found under another path is re-recorded under this one. Estimated
+    stats only count when `allow_estimate` is set, so an exact scan replaces them.
+    """
+    fingerprints: dict[str, str | None] = {"signature": stat_signature(path), "content": None}
+    if cache is None:
+        return fingerprints, None
+    cached = cache.get(str(path))
+    if cached is not None and cached["signature"] == fingerprints["signature"]:
+        if _stats_complete(cached["stats"], require_histogram=require_histogram, allow_estimate=allow_estimate):
+            return fingerprints, dict(cached["stats"])
+    content = content_fingerprint(path, cache.fingerprint_mode)
+    fingerprints["content"] = content
+    if content is None:
+        return fingerprints, None
+    for entry in cache.find_fingerprint(content):
+        if _stats_complete(entry["stats"], require_histogram=require_histogram, allow_estimate=allow_estimate):
+            _store_cache(cache, path, fingerprints=fingerprints, stats=entry["stats"])
+            return fingerprints, dict(entry["stats"])
+    return fingerprints, None
+
+
+def _store_cache(
+    cache: CatalogCache | None, path: Path, *, fingerprints: dict[str, str | None], stats: dict[str, Any]
+) -> None:
+    if cache is not None:
+        cache.put(
+            str(path), signature=str(fingerprints["signature"]), stats=stats, fingerprint=fingerprints["content"]
+        )
 
 
-def _scan_with_seqkit(paths: list[Path]) -> dict[str, dict[str, Any]]:
+def _scan_with_seqkit(paths: list[Path], *, threads: int = 1) -> dict[str, dict[str, Any]]:
+    """`seqkit stats` for each file; seqkit reads up to `threads` files at once."""
     cmd = _seqkit_cmd()
     if not cmd or not paths:
         return {}
     proc = subprocess.run(
-        cmd + ["stats", "-Ta", *[str(path) for path in paths]],
+        cmd + ["stats", "-Ta", "-j", str(max(1, min(threads, len(paths)))), *[str(path) for path in paths]],
         capture_output=True,
         text=True,
         check=False,
@@ -404,23 +675,9 @@ def _scan_with_seqkit(paths: list[Path]) -> dict[str, dict[str, Any]]:
         if not file_path:
             continue
         path = Path(file_path)
-        fmt = str(row.get("format", "")).lower()
-        if fmt not in {"fastq", "fasta"}:
-            continue
-        total_bases = _parse_int(row["sum_len"])
-        records = _parse_int(row["num_seqs"])
-        stats_by_path[str(path)] = {
-            "format": fmt,
-            "records": records,
-            "total_bases": total_bases,
-            "min_len": _parse_int(row["min_len"]),
-            "mean_len": float(_parse_float(row["avg_len"]) or 0.0),
-            "max_len": _parse_int(row["max_len"]),
-            "n50": _parse_int(row["N50"]),
-            "gc_percent": float(_parse_float(row.get("GC(%)")) or 0.0),
-            "q30_percent": float(_parse_float(row.get("Q30(%)")) or 0.0) if fmt == "fastq" else None,
-            "size_bytes": path.stat().st_size,
-        }
+        stats = _stats_from_seqkit_row(row, path=None, size_bytes=path.stat().st_size)
+        if stats is not None:
+            stats_by_path[str(path)] = stats
     return stats_by_path
 
 
@@ -446,85 +703,321 @@ def _stats_from_seqkit_row(row: dict[str, str], *, path: Path | None, size_bytes
 
 
 def _scan_group_with_seqkit(paths: list[Path]) -> dict[str, Any] | None:
+    """`seqkit stats` of the files read as one stream (N50 needs every length at once)."""
     cmd = _seqkit_cmd()
     if not cmd or not paths:
         return None
-    if any(path.suffix == ".gz" for path in paths):
+    # Concatenated gzip members are one valid gzip stream, so files are fed as raw bytes as
+    # long as all of them or none of them are compressed.
+    compressed = {path.suffix == ".gz" for path in paths}
+    if len(compressed) != 1:
         return None
     formats = {_detect_sequence_format(path) for path in paths}
     if len(formats) != 1:
         return None
-    cat_cmd = "cat " + " ".join(shlex.quote(str(path)) for path in paths)
-    seqkit_cmd = " ".join(shlex.quote(part) for part in [*cmd, "stats", "-Ta", "-"])
-    proc = subprocess.run(
-        ["bash", "-lc", f"{cat_cmd} | {seqkit_cmd}"],
-        capture_output=True,
-        text=True,
-        check=False,
+    proc = subprocess.Popen(
+        cmd + ["stats", "-Ta", "-"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
     )
-    if proc.returncode != 0:
+
+    def _feed() -> None:
+        try:
+            for path in paths:
+                last = b""
+                with path.open("rb") as fh:
+                    for block in iter(lambda: fh.read(_SCAN_BLOCK_BYTES), b""):
+                        proc.stdin.write(block)
+                        last = block[-1:]
+                # Keep a file without a final newline from running into the next header.
+                if compressed == {False} and last and last != b"\n":
+                    proc.stdin.write(b"\n")
+        except BrokenPipeError:
+            pass
+        finally:
+            try:
+                proc.stdin.close()
+            except BrokenPipeError:
+                pass
+
+    feeder = threading.Thread(target=_feed, daemon=True)
+    feeder.start()
+    output = proc.stdout.read().decode("utf-8", errors="replace")
+    feeder.join()
+    if proc.wait() != 0:
         return None
-    reader = csv.DictReader(proc.stdout.splitlines(), delimiter="\t")
+    reader = csv.DictReader(output.splitlines(), delimiter="\t")
     rows = list(reader)
     if len(rows) != 1:
         return None
     return _stats_from_seqkit_row(rows[0], path=None, size_bytes=sum(path.stat().st_size for path in paths))
 
 
-def scan_sequence_files(paths: list[Path], *, cache: dict[str, Any] | None = None) -> list[dict[str, Any]]:
-    cache = cache if cache is not None else {"version": CATALOG_CACHE_VERSION, "files": {}}
+def _file_kind(path: Path) -> str:
+    return _detect_sequence_format(path) + (".gz" if path.suffix == ".gz" else "")
+
+
+def _calibration_sample(path: Path, fmt: str, out_dir: Path) -> tuple[Path, int] | None:
+    """The first whole records (up to `_CALIBRATION_BYTES`) of `path`, compressed like `path`."""
+    with (gzip.open(path, "rb") if path.suffix == ".gz" else path.open("rb")) as fh:
+        data = fh.read(_CALIBRATION_BYTES)
+        more = bool(fh.read(1))
+    if more:
+        cut = _next_record_start(io.BytesIO(data), max(1, len(data) * 3 // 4), fmt)
+        if cut is None:
+            return None
+        data = data[:cut]
+    if len(data) < _CALIBRATION_MIN_BYTES:
+        return None
+    sample = out_dir / f"calibration.{fmt}"
+    if path.suffix == ".gz":
+        sample = sample.with_name(sample.name + ".gz")
+        with gzip.open(sample, "wb", compresslevel=6) as out:
+            out.write(data)
+    else:
+        sample.write_bytes(data)
+    return sample, len(data)
+
+
+def _calibrate_engine(path: Path) -> dict[str, Any] | None:
+    """Time seqkit and the Python scanner on one core each over a sample of `path`."""
+    if not _seqkit_cmd():
+        return None
+    fmt = _detect_sequence_format(path)
+    with tempfile.TemporaryDirectory(prefix="chimera_calibrate_") as tmp:
+        sampled = _calibration_sample(path, fmt, Path(tmp))
+        if sampled is None:
+            return None
+        sample, sample_bytes = sampled
+        start = time.perf_counter()
+        seqkit_ok = bool(_scan_with_seqkit([sample]))
+        seqkit_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        _scan_file(sample, False)
+        python_seconds = time.perf_counter() - start
+    if not seqkit_ok:
+        return None
+    throughput = {
+        "seqkit": sample_bytes / 1_000_000 / max(seqkit_seconds, 1e-9),
+        "python": sample_bytes / 1_000_000 / max(python_seconds, 1e-9),
+    }
+    return {"engine": max(throughput, key=throughput.get), "mb_per_s": throughput}
+
+
+def _select_engine(path: Path, *, engine: str, cache: CatalogCache | None, progress: bool) -> str:
+    """Scan engine for `path`: as requested, or for `auto` the faster one on this host.
+
+    `auto` calibrates once per host and file kind (the result is kept in the cache metadata)
+    and falls back to seqkit when available and the sample is too small to time.
+    """
+    if engine not in SCAN_ENGINES:
+        raise ValueError(f"unknown scan engine: {engine}")
+    if engine == "seqkit" and not _seqkit_cmd():
+        raise ValueError("scan engine seqkit requested but seqkit was not found")
+    if engine != "auto":
+        return engine
+    if not _seqkit_cmd():
+        return "python"
+    kind = _file_kind(path)
+    if kind in _ENGINE_CHOICES:
+        return _ENGINE_CHOICES[kind]
+    meta_key = f"engine:{socket.gethostname()}:{kind}"
+    stored = cache.get_meta(meta_key) if cache is not None else None
+    if stored is not None:
+        _ENGINE_CHOICES[kind] = json.loads(stored)["engine"]
+        return _ENGINE_CHOICES[kind]
+    calibration = _calibrate_engine(path)
+    if calibration is None:
+        return "seqkit"
+    _ENGINE_CHOICES[kind] = calibration["engine"]
+    if cache is not None:
+        cache.set_meta(meta_key, json.dumps(calibration, sort_keys=True))
+    if progress:
+        rates = " ".join(f"{name}={rate:.1f}MB/s" for name, rate in sorted(calibration["mb_per_s"].items()))
+        print(f"[catalog] calibrate kind={kind} {rates} engine={calibration['engine']}")
+    return _ENGINE_CHOICES[kind]
+
+
+def _report_throughput(engine: str, paths: list[Path], seconds: float, **details: Any) -> None:
+    size = sum(path.stat().st_size for path in paths)
+    rate = size / 1_000_000 / seconds if seconds > 0 else 0.0
+    extra = "".join(f" {key}={value}" for key, value in details.items())
+    print(f"[catalog] engine={engine} files={len(paths)}{extra} bytes={size} seconds={seconds:.1f} mb_per_s={rate:.1f}")
+
+
+def _scan_file(path: Path, keep_histogram: bool) -> dict[str, Any]:
+    if _detect_sequence_format(path) == "fastq":
+        return _scan_fastq(path, keep_histogram=keep_histogram)
+    return _scan_fasta(path, keep_histogram=keep_histogram)
+
+
+def scan_sequence_files(
+    paths: list[Path],
+    *,
+    cache: CatalogCache | None = None,
+    jobs: int = 1,
+    approx_records: int | None = None,
+    engine: str = "auto",
+    progress: bool = False,
+) -> list[dict[str, Any]]:
+    """Stats for each file, from the cache, seqkit or a Python scan.
+
+    `engine` picks seqkit or the Python scanner per file (see `_select_engine`); multi-file
+    datasets need length sketches, which only the Python scanner produces. seqkit reads up to
+    `jobs` files at once. Python scans run in a pool of `jobs` processes; large uncompressed
+    files are also split into record-aligned byte ranges whose partial stats reduce to the
+    whole-file result. Each result is committed to `cache` as soon as its file finishes, so an
+    interrupted scan resumes. With `approx_records`, files missing from the cache are estimated
+    by `_approx_scan` instead; cached exact stats are still preferred.
+    """
     require_histogram = len(paths) > 1
-    signatures: dict[str, str] = {}
+    fingerprints: dict[str, dict[str, str | None]] = {}
     results: dict[str, dict[str, Any]] = {}
     pending: list[Path] = []
 
     for path in paths:
-        signature, cached = _cache_hit(cache, path, require_histogram=require_histogram)
-        signatures[str(path)] = signature
+        fingerprints[str(path)], cached = _cache_hit(
+            cache, path, require_histogram=require_histogram, allow_estimate=approx_records is not None
+        )
         if cached is not None:
             results[str(path)] = cached
         else:
             pending.append(path)
 
-    seqkit_pending = pending if not require_histogram else []
-    seqkit_results = _scan_with_seqkit(seqkit_pending)
-    for path in pending:
+    def _finish(path: Path, stats: dict[str, Any]) -> None:
         key = str(path)
-        fmt = _detect_sequence_format(path)
-        stats = seqkit_results.get(key)
-        if stats is None:
-            if fmt == "fastq":
-                stats = _scan_fastq(path, keep_histogram=require_histogram)
-            else:
-                stats = _scan_fasta(path, keep_histogram=require_histogram)
-        _store_cache(cache, path, signature=signatures[key], stats=stats)
+        _store_cache(cache, path, fingerprints=fingerprints[key], stats=stats)
         results[key] = dict(stats)
 
+    if approx_records is not None:
+        if jobs > 1 and len(pending) > 1:
+            with ProcessPoolExecutor(max_workers=min(jobs, len(pending))) as pool:
+                futures = {pool.submit(_approx_scan, path, approx_records, require_histogram): path for path in pending}
+                for future in as_completed(futures):
+                    _finish(futures[future], future.result())
+        else:
+            for path in pending:
+                _finish(path, _approx_scan(path, approx_records, require_histogram))
+        return [dict(results[str(path)]) for path in paths]
+
+    ranges: dict[str, tuple[str, list[tuple[int, int]]]] = {}
+    if jobs > 1:
+        for path in pending:
+            parts = min(jobs, path.stat().st_size // _RANGE_SCAN_MIN_BYTES)
+            if path.suffix == ".gz" or parts < 2:
+                continue
+            fmt = _detect_sequence_format(path)
+            path_ranges = _record_ranges(path, fmt, parts)
+            if len(path_ranges) > 1:
+                ranges[str(path)] = (fmt, path_ranges)
+
+    # seqkit reads each file on one core, so files split into ranges are scanned in Python.
+    seqkit_pending = [
+        path
+        for path in pending
+        if not require_histogram
+        and str(path) not in ranges
+        and _select_engine(path, engine=engine, cache=cache, progress=progress) == "seqkit"
+    ]
+    start = time.perf_counter()
+    seqkit_results = _scan_with_seqkit(seqkit_pending, threads=jobs)
+    if progress and seqkit_pending:
+        _report_throughput(
+            "seqkit", seqkit_pending, time.perf_counter() - start, threads=max(1, min(jobs, len(seqkit_pending)))
+        )
+
+    scan_pending = []
+    for path in pending:
+        stats = seqkit_results.get(str(path))
+        if stats is None:
+            scan_pending.append(path)
+        else:
+            _finish(path, stats)
+    start = time.perf_counter()
+    tasks = len(scan_pending) + sum(len(path_ranges) - 1 for _, path_ranges in ranges.values())
+    if jobs > 1 and tasks > 1:
+        partials: dict[str, list[dict[str, Any] | None]] = {}
+        with ProcessPoolExecutor(max_workers=min(jobs, tasks)) as pool:
+            futures = {}
+            for path in scan_pending:
+                if str(path) not in ranges:
+                    futures[pool.submit(_scan_file, path, require_histogram)] = (path, None)
+                    continue
+                fmt, path_ranges = ranges[str(path)]
+                partials[str(path)] = [None] * len(path_ranges)
+                for idx, (range_start, range_end) in enumerate(path_ranges):
+                    futures[pool.submit(_scan_range, path, fmt, range_start, range_end)] = (path, idx)
+            for future in as_completed(futures):
+                path, idx = futures[future]
+                if idx is None:
+                    _finish(path, future.result())
+                    continue
+                parts_done = partials[str(path)]
+                parts_done[idx] = future.result()
+                if all(part is not None for part in parts_done):
+                    _finish(
+                        path,
+                        _finalize_partials(
+                            ranges[str(path)][0],
+                            parts_done,
+                            size_bytes=path.stat().st_size,
+                            keep_histogram=require_histogram,
+                        ),
+                    )
+    else:
+        for path in scan_pending:
+            _finish(path, _scan_file(path, require_histogram))
+    if progress and scan_pending:
+        _report_throughput("python", scan_pending, time.perf_counter() - start, jobs=max(1, min(jobs, tasks)))
+
     return [dict(results[str(path)]) for path in paths]
 
 
-def scan_sequence_group(paths: list[Path], *, cache: dict[str, Any] | None = None) -> dict[str, Any]:
-    cache = cache if cache is not None else {"version": CATALOG_CACHE_VERSION, "files": {}}
+def scan_sequence_group(
+    paths: list[Path],
+    *,
+    cache: CatalogCache | None = None,
+    jobs: int = 1,
+    approx_records: int | None = None,
+    engine: str = "auto",
+    progress: bool = False,
+) -> dict[str, Any]:
+    scan_options: dict[str, Any] = {
+        "cache": cache,
+        "jobs": jobs,
+        "approx_records": approx_records,
+        "engine": engine,
+        "progress": progress,
+    }
     if len(paths) == 1:
-        return scan_sequence_files(paths, cache=cache)[0]
+        return scan_sequence_files(paths, **scan_options)[0]
 
-    signatures = [_file_signature(path) for path in paths]
+    signatures = [stat_signature(path) for path in paths]
     group_key = "group:" + "|".join(f"{path}:{signature}" for path, signature in zip(paths, signatures))
-    cached = cache.setdefault("files", {}).get(group_key)
-    if isinstance(cached, dict):
+    cached = cache.get(group_key) if cache is not None else None
+    if cached is not None:
         stats = cached.get("stats")
         if isinstance(stats, dict) and _stats_complete(stats, require_histogram=False):
             return dict(stats)
 
-    stats = _scan_group_with_seqkit(paths)
+    # A single seqkit stream uses one core; with several jobs, scan the files side by side instead.
+    stats = None
+    if (
+        jobs <= 1
+        and approx_records is None
+        and _select_engine(paths[0], engine=engine, cache=cache, progress=progress) == "seqkit"
+    ):
+        start = time.perf_counter()
+        stats = _scan_group_with_seqkit(paths)
+        if progress and stats is not None:
+            _report_throughput("seqkit", paths, time.perf_counter() - start, stream="group")
     if stats is None:
-        stats_list = scan_sequence_files(paths, cache=cache)
+        stats_list = scan_sequence_files(paths, **scan_options)
         stats = _merge_sequence_stats(stats_list)
-    cache.setdefault("files", {})[group_key] = {
-        "signature": "|".join(signatures),
-        "stats": stats,
-        "updated_at": _now_iso(),
-    }
+    # Estimates stay per file, so a later exact scan of the group is not mistaken for a hit.
+    if cache is not None and not stats.get("estimated"):
+        cache.put(group_key, signature="|".join(signatures), stats=stats)
     return dict(stats)
 
 
@@ -684,11 +1177,11 @@ def _dataset_catalog_row_from_metadata(
     }
 
 
-def _hist_from_stats(stats: dict[str, Any]) -> Counter[int]:
-    raw = stats.get("length_counts")
+def _sketch_from_stats(stats: dict[str, Any]) -> LengthSketch:
+    raw = stats.get("length_sketch")
     if not isinstance(raw, dict):
         raise ValueError("missing length histogram for multi-file dataset")
-    return Counter({int(length): int(count) for length, count in raw.items()})
+    return LengthSketch.from_dict(raw)
 
 
 def _merge_sequence_stats(stats_list: list[dict[str, Any]]) -> dict[str, Any]:
@@ -703,20 +1196,40 @@ def _merge_sequence_stats(stats_list: list[dict[str, Any]]) -> dict[str, Any]:
     gc_bases = sum(int(stats.get("gc_bases", 0)) for stats in stats_list)
     has_fastq = any(stats.get("format") == "fastq" for stats in stats_list)
     q30_bases = sum(int(stats.get("q30_bases", 0)) for stats in stats_list) if has_fastq else None
-    length_counts: Counter[int] = Counter()
+    lengths = LengthSketch()
     for stats in stats_list:
-        length_counts.update(_hist_from_stats(stats))
-    return {
+        lengths.merge(_sketch_from_stats(stats))
+    merged: dict[str, Any] = {
         "records": records,
         "total_bases": total_bases,
         "size_bytes": total_bytes,
         "min_len": min(int(stats["min_len"]) for stats in stats_list),
         "mean_len": (total_bases / records) if records else 0.0,
         "max_len": max(int(stats["max_len"]) for stats in stats_list),
-        "n50": _n50_from_hist(length_counts, total_bases),
+        "n50": lengths.n50(total_bases),
         "gc_percent": (gc_bases * 100 / total_bases) if total_bases else 0.0,
         "q30_percent": (q30_bases * 100 / total_bases) if q30_bases is not None and total_bases else None,
     }
+    if any(stats.get("estimated") for stats in stats_list):
+        # Files are sampled independently, so their error bounds add in quadrature.
+        merged["estimated"] = True
+        for key in ("records_ci", "bases_ci"):
+            merged[key] = math.sqrt(sum(float(stats.get(key) or 0.0) ** 2 for stats in stats_list))
+        merged["sampled_records"] = sum(int(stats.get("sampled_records", stats["records"])) for stats in stats_list)
+    return merged
+
+
+def _estimate_label(stats: dict[str, Any]) -> str:
+    """Error bounds of an estimated row, empty for exact stats."""
+    if not stats.get("estimated"):
+        return ""
+    records = int(stats["records"]) or 1
+    bases = int(stats["total_bases"]) or 1
+    return (
+        f"reads ±{float(stats['records_ci']) * 100 / records:.2f}%, "
+        f"bases ±{float(stats['bases_ci']) * 100 / bases:.2f}% "
+        f"(95%, {int(stats['sampled_records']):,} records sampled)"
+    )
 
 
 def collect_dataset_rows(
@@ -725,12 +1238,15 @@ def collect_dataset_rows(
     cache_path: Path,
     dataset_names: Iterable[str] | None = None,
     progress: bool = False,
+    jobs: int = 1,
+    fingerprint: str = "sample",
+    approx_records: int | None = None,
+    engine: str = "auto",
 ) -> list[dict[str, Any]]:
     datasets = load_yaml_dir(config_root / "datasets")
     names = list(dataset_names) if dataset_names is not None else _ordered_dataset_names(datasets)
-    cache = _read_cache(cache_path)
     rows: list[dict[str, Any]] = []
-
+    cache = CatalogCache(cache_path, fingerprint_mode=fingerprint)
     for name in names:
         if name not in datasets:
             continue
@@ -751,7 +1267,9 @@ def collect_dataset_rows(
         for path in paths:
             if not path.exists():
                 raise FileNotFoundError(path)
-        merged = scan_sequence_group(paths, cache=cache)
+        merged = scan_sequence_group(
+            paths, cache=cache, jobs=jobs, approx_records=approx_records, engine=engine, progress=progress
+        )
         row = {
             "dataset": name,
             "dataset_name": DATASET_DISPLAY_NAMES.get(name, name),
@@ -765,19 +1283,74 @@ def collect_dataset_rows(
             "gc_percent": _format_decimal(float(merged["gc_percent"]), 2),
             "q30_percent": _format_decimal(merged.get("q30_percent"), 2),
             "truth": _dataset_truth(dataset),
+            "estimate": _estimate_label(merged),
         }
         rows.append(row)
-        _write_cache(cache_path, cache)
         if progress:
             print(
                 "[catalog] dataset="
                 + name
                 + f" done bytes={merged['size_bytes']} records={merged['records']} bases={merged['total_bases']}"
+                + (" estimated" if merged.get("estimated") else "")
             )
 
+    cache.close()
     return rows
 
 
+def _cached_group_stats(paths: list[Path], cache: CatalogCache) -> dict[str, Any] | None:
+    """Record and base totals for a group of files from the cache alone (group entry or every file), else None.
+
+    Only the totals are summed, so per-file entries without a length sketch (single-file or
+    seqkit scans) still combine.
+    """
+    if len(paths) > 1:
+        group_key = "group:" + "|".join(f"{path}:{stat_signature(path)}" for path in paths)
+        cached = cache.get(group_key)
+        if cached is not None and _stats_complete(cached.get("stats") or {}, require_histogram=False):
+            stats = cached["stats"]
+            return {"records": int(stats["records"]), "total_bases": int(stats["total_bases"])}
+    records = 0
+    total_bases = 0
+    for path in paths:
+        _fingerprints, stats = _cache_hit(cache, path, require_histogram=False)
+        if stats is None:
+            return None
+        records += int(stats["records"])
+        total_bases += int(stats["total_bases"])
+    return {"records": records, "total_bases": total_bases}
+
+
+def dataset_read_stats(
+    dataset: dict[str, Any], *, cache_path: Path | None = None, scan: bool = True
+) -> dict[str, int] | None:
+    """Read and base counts for one (expanded) dataset, for throughput reporting.
+
+    Uses the configured `catalog` numbers for a standalone dataset; samples of a collection
+    carry collection totals there, so their input files are looked up in (or scanned into)
+    the catalog cache. With `scan=False` a cache miss returns None instead of scanning.
+    """
+    catalog = dataset.get("catalog") or {}
+    if not dataset.get("dataset_collection"):
+        reads = catalog.get("reads_or_contigs")
+        bases = catalog.get("base_pairs_bp")
+        if isinstance(reads, int) and isinstance(bases, int):
+            return {"reads": reads, "bases": bases}
+    paths = _dataset_input_paths(dataset)
+    if not paths or not all(path.exists() for path in paths):
+        return None
+    if cache_path is None:
+        if not scan:
+            return None
+        merged = scan_sequence_group(paths)
+    else:
+        with CatalogCache(cache_path) as cache:
+            merged = scan_sequence_group(paths, cache=cache) if scan else _cached_group_stats(paths, cache)
+    if merged is None:
+        return None
+    return {"reads": int(merged["records"]), "bases": int(merged["total_bases"])}
+
+
 def _select_build_source(builds: list[dict[str, Any]]) -> tuple[Path, str]:
     for build in builds:
         build_cfg = build.get("build") or {}
@@ -787,106 +1360,39 @@ def _select_build_source(builds: list[dict[str, Any]]) -> tuple[Path, str]:
     raise ValueError("reference DB build has no target TSV")
 
 
-def _target_entries(target_path: Path) -> list[tuple[Path, str]]:
-    entries: list[tuple[Path, str]] = []
-    with target_path.open("r", encoding="utf-8") as fh:
-        for raw in fh:
-            line = raw.strip()
-            if not line or line.startswith("#"):
-                continue
-            parts = line.split("\t")
-            if len(parts) < 2:
-                raise ValueError(f"invalid target row: {target_path}: {line}")
-            path = Path(parts[0])
-            if not path.is_absolute():
-                path = (target_path.parent / path).resolve()
-            entries.append((path, parts[1]))
-    return entries
-
-
-def _accession_from_path(path: Path) -> str:
-    match = re.match(r"^(GC[AF]_\d+\.\d+)", path.name)
-    if not match:
-        raise ValueError(f"cannot parse assembly accession from path: {path}")
-    return match.group(1)
-
-
-def _assembly_summary_candidates(target_path: Path, entries: list[tuple[Path, str]]) -> list[Path]:
-    roots: list[Path] = []
-    for base in [target_path.parent, *(entries[0][0].parents if entries else [])]:
-        roots.append(base)
-    candidates: list[Path] = []
-    seen: set[Path] = set()
-    for root in roots:
-        for path in sorted(root.glob("assembly_summary*.txt")):
-            if path not in seen:
-                seen.add(path)
-                candidates.append(path)
-    return candidates
-
-
-def _load_assembly_rows(summary_path: Path, accessions: set[str]) -> dict[str, dict[str, int | str]]:
-    rows: dict[str, dict[str, int | str]] = {}
-    with summary_path.open("r", encoding="utf-8", errors="strict") as fh:
-        for raw in fh:
-            if not raw.strip() or raw.startswith("#"):
-                continue
-            parts = raw.rstrip("\n").split("\t")
-            if len(parts) < 31:
-                continue
-            accession = parts[0]
-            if accession not in accessions:
-                continue
-            rows[accession] = {
-                "species_taxid": parts[6],
-                "genome_size": _parse_int(parts[25]),
-                "contig_count": _parse_int(parts[30]),
-            }
-            if len(rows) == len(accessions):
-                break
-    return rows
-
-
-def _find_assembly_rows(target_path: Path, entries: list[tuple[Path, str]]) -> dict[str, dict[str, int | str]]:
-    accessions = {_accession_from_path(path) for path, _taxid in entries}
-    merged_rows: dict[str, dict[str, int | str]] = {}
-    used_paths: list[Path] = []
-    for candidate in _assembly_summary_candidates(target_path, entries):
-        rows = _load_assembly_rows(candidate, accessions - set(merged_rows))
-        if rows:
-            merged_rows.update(rows)
-            used_paths.append(candidate)
-        if len(merged_rows) == len(accessions):
-            return merged_rows
-    missing = sorted(accessions - set(merged_rows))[:5]
-    raise ValueError(f"assembly summary incomplete for {target_path}; used={used_paths}; missing={missing}")
-
-
-def _reference_db_row(db_name: str, target_path: Path) -> dict[str, Any]:
+def _reference_db_row(db_name: str, target_path: Path, index: ReferenceIndex) -> dict[str, Any]:
     if not target_path.exists():
         raise FileNotFoundError(target_path)
-    entries = _target_entries(target_path)
-    assembly_rows = _find_assembly_rows(target_path, entries)
+    source_id = index.ensure(target_path)
+    genomes = index.genomes(source_id)
+    for genome in genomes:
+        if genome["taxid"] is None:
+            raise ValueError(f"invalid target row: {target_path}: {genome['raw_path']}")
+        if genome["accession"] is None:
+            raise ValueError(f"cannot parse assembly accession from path: {genome['path']}")
+    missing = sorted({genome["accession"] for genome in genomes if genome["species_taxid"] is None})
+    if missing:
+        raise ValueError(
+            f"assembly summary incomplete for {target_path}; used={index.summaries(source_id)}; missing={missing[:5]}"
+        )
     total_size = 0
     total_sequences = 0
     base_pairs = 0
     species: set[str] = set()
-    for path, _taxid in entries:
-        if not path.exists():
-            raise FileNotFoundError(path)
-        accession = _accession_from_path(path)
-        meta = assembly_rows[accession]
-        total_size += path.stat().st_size
-        total_sequences += int(meta["contig_count"])
-        base_pairs += int(meta["genome_size"])
-        species.add(str(meta["species_taxid"]))
+    for genome in genomes:
+        if genome["file_size"] is None:
+            raise FileNotFoundError(genome["path"])
+        total_size += int(genome["file_size"])
+        total_sequences += int(genome["contig_count"])
+        base_pairs += int(genome["genome_size"])
+        species.add(str(genome["species_taxid"]))
     return {
         "db_name": db_name,
         "dataset_name": DB_DISPLAY_NAMES.get(db_name, db_name),
         "total_size_gb": _format_gb(total_size),
         "total_sequences": total_sequences,
         "base_pairs_bp": base_pairs,
-        "assemblies": len(entries),
+        "assemblies": len(genomes),
         "species_count": len(species),
         "source": DB_SOURCE_NAMES.get(db_name, "NCBI assembly summary"),
     }
@@ -898,7 +1404,6 @@ def collect_build_rows(
     cache_path: Path,
     build_db_names: Iterable[str] | None = None,
 ) -> list[dict[str, Any]]:
-    del cache_path
     builds = load_yaml_dir(config_root / "build")
     names = list(build_db_names) if build_db_names is not None else _ordered_build_db_names(builds)
     grouped: dict[str, list[dict[str, Any]]] = {}
@@ -909,12 +1414,15 @@ def collect_build_rows(
         grouped.setdefault(db_name, []).append(dict(build))
 
     rows: list[dict[str, Any]] = []
-    for db_name in names:
-        group = grouped.get(db_name)
-        if not group:
-            continue
-        target_path, _taxonomy_source = _select_build_source(group)
-        rows.append(_reference_db_row(db_name, target_path))
+    # The reference index lives beside the catalog cache and is rebuilt only when a target TSV
+    # or its assembly summaries change.
+    with ReferenceIndex(cache_path.with_name("reference_index.sqlite")) as index:
+        for db_name in names:
+            group = grouped.get(db_name)
+            if not group:
+                continue
+            target_path, _taxonomy_source = _select_build_source(group)
+            rows.append(_reference_db_row(db_name, target_path, index))
     return rows
 
 
@@ -1145,24 +1653,30 @@ def write_results_readme(
             "",
         ]
     )
-    lines.extend(
-        _markdown_table(
-            dataset_rows,
+    dataset_columns = [
+        ("Dataset Name", "dataset_name"),
+        ("Total Size (GB)", "total_size_gb"),
+        ("Samples", "samples"),
+        ("Input Type", "input_type"),
+        ("Reads / Contigs", "reads_or_contigs"),
+        ("Base Pairs (bp)", "base_pairs_bp"),
+        ("Mean Length (bp)", "mean_length_bp"),
+        ("N50 (bp)", "n50_bp"),
+        ("GC (%)", "gc_percent"),
+        ("Q30 (%)", "q30_percent"),
+        ("Truth", "truth"),
+    ]
+    if any(row.get("estimate") for row in dataset_rows):
+        dataset_columns.append(("Estimate", "estimate"))
+    lines.extend(_markdown_table(dataset_rows, dataset_columns))
+    if any(row.get("estimate") for row in dataset_rows):
+        lines.extend(
             [
-                ("Dataset Name", "dataset_name"),
-                ("Total Size (GB)", "total_size_gb"),
-                ("Samples", "samples"),
-                ("Input Type", "input_type"),
-                ("Reads / Contigs", "reads_or_contigs"),
-                ("Base Pairs (bp)", "base_pairs_bp"),
-                ("Mean Length (bp)", "mean_length_bp"),
-                ("N50 (bp)", "n50_bp"),
-                ("GC (%)", "gc_percent"),
-                ("Q30 (%)", "q30_percent"),
-                ("Truth", "truth"),
-            ],
+                "",
+                "`Estimate` 非空的行来自 `catalog --approx` 抽样估计：读段数和碱基数按文件大小外推，`±` 为 95% 误差范围；长度、GC 和 Q30 为样本统计。",
+                "完整扫描（不带 `--approx` 的 `catalog`）会通过缓存自动替换这些估计值。",
+            ]
         )
-    )
     lines.extend(_results_readme_tail())
     results_root.mkdir(parents=True, exist_ok=True)
     (results_root / "README.md").write_text("\n".join(lines))
@@ -1174,12 +1688,20 @@ def write_catalog_outputs(
     results_root: Path,
     resources_root: Path,
     progress: bool = False,
+    jobs: int = 1,
+    fingerprint: str = "sample",
+    approx_records: int | None = None,
+    engine: str = "auto",
 ) -> dict[str, list[dict[str, Any]]]:
-    cache_path = resources_root / "cache" / "catalog_cache.json"
+    cache_path = resources_root / "cache" / "catalog_cache.sqlite"
     dataset_rows = collect_dataset_rows(
         config_root=config_root,
         cache_path=cache_path,
         progress=progress,
+        jobs=jobs,
+        fingerprint=fingerprint,
+        approx_records=approx_records,
+        engine=engine,
     )
     build_rows = collect_build_rows(config_root=config_root, cache_path=cache_path)
     write_tsv(
@@ -1197,6 +1719,7 @@ def write_catalog_outputs(
             "gc_percent",
             "q30_percent",
             "truth",
+            "estimate",
         ],
     )
     write_tsv(
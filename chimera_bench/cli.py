@@ -7,14 +7,19 @@ from pathlib import Path
 import subprocess
 import sys
 
-from .catalog import write_catalog_outputs
+from .catalog import SCAN_ENGINES, write_catalog_outputs
 from .config import expand_dataset_config, load_yaml_dir
 from .dataset_prepare import prepare_dataset_inputs
 from .paper_freeze import write_paper_tables
-from .core.runner import Runner, build_run_metrics
+from .core.batching import batch_groups
+from .core.runner import METRICS_FILENAME, Runner, build_run_metrics, metrics_filename
 from .core.build_runner import BuildRunner
+from .core.confusion import CONFUSION_FILENAME, UNASSIGNED_TAXID, read_confusion_npz, top_confusions
+from .core.metrics import build_name_maps, evaluate_with_truth
+from .core.pr_curve import PR_CURVE_FILENAME, write_pr_curve
 from .core.reporter import write_summary
 from .core.results_readme import write_classify_readme, write_profile_readme
+from .io.fingerprint import FINGERPRINT_MODES
 from .registry import TOOLS
 
 DEFAULT_THREADS = 32
@@ -79,6 +84,8 @@ def run_cmd(args) -> None:
     exp = dict(exps[args.exp])
     exp["name"] = exp.get("name", args.exp)
     exp.setdefault("threads", DEFAULT_THREADS)
+    if args.bootstrap is not None:
+        exp["bootstrap"] = args.bootstrap
     tool_name = exp.get("tool", "chimera")
     tool_cls = TOOLS.get(tool_name)
     tool_config = dict(exp.get("tool_config", {}))
@@ -91,7 +98,13 @@ def run_cmd(args) -> None:
         tool_config.setdefault("bin", args.sylph_bin)
         tool_config.setdefault("env", args.sylph_env)
 
-    runner = Runner(Path(args.runs), Path(args.profile) if args.profile else None)
+    if args.calibrate is not None:
+        exp["calibrate"] = args.calibrate
+    runner = Runner(
+        Path(args.runs),
+        Path(args.profile) if args.profile else None,
+        catalog_cache=Path(args.resources_root) / "cache" / "catalog_cache.sqlite",
+    )
     tool = tool_cls(tool_config)
     executor = _make_executor()
 
@@ -102,12 +115,21 @@ def run_cmd(args) -> None:
         return
 
     failed_datasets = []
-    for dataset in resolved_datasets:
-        dataset = prepare_dataset_inputs(dataset)
-        result = runner.run(exp=exp, dataset=dataset, tool=tool, executor=executor)
+    batch_size = int(exp.get("batch_size") or 1)
+    if batch_size > 1:
+        results = []
+        for group in batch_groups(resolved_datasets, batch_size):
+            group = [prepare_dataset_inputs(dataset) for dataset in group]
+            results.extend(runner.run_batch(exp=exp, datasets=group, tool=tool, executor=executor))
+    else:
+        results = (
+            runner.run(exp=exp, dataset=prepare_dataset_inputs(dataset), tool=tool, executor=executor)
+            for dataset in resolved_datasets
+        )
+    for result in results:
         meta = (result or {}).get("meta") if isinstance(result, dict) else None
         if isinstance(meta, dict) and meta.get("return_code") not in {None, 0}:
-            failed_datasets.append((dataset.get("name", "dataset"), meta.get("return_code")))
+            failed_datasets.append((meta.get("dataset", "dataset"), meta.get("return_code")))
 
     if failed_datasets:
         for dataset_name, return_code in failed_datasets:
@@ -121,6 +143,10 @@ def catalog_cmd(args) -> None:
         results_root=Path(args.results_root),
         resources_root=Path(getattr(args, "resources_root", "resources")),
         progress=True,
+        jobs=args.jobs,
+        fingerprint=args.fingerprint,
+        approx_records=args.approx_records if args.approx else None,
+        engine=args.engine,
     )
 
 
@@ -139,7 +165,7 @@ def _collect_summary_records(runs_root: Path, exp_name: str, selected: list[str]
         meta = json.loads(meta_path.read_text())
         if meta.get("return_code") not in {None, 0}:
             continue
-        metrics_path = meta_path.parent / "metrics.json"
+        metrics_path = meta_path.parent / METRICS_FILENAME
         metrics = json.loads(metrics_path.read_text()) if metrics_path.exists() else {}
         resource = meta.get("resource", {})
         if meta.get("elapsed_seconds") is not None:
@@ -183,6 +209,10 @@ def recompute_cmd(args) -> None:
     exps = load_yaml_dir(cfg_root / "experiments")
     exp = dict(exps[args.exp])
     exp["name"] = exp.get("name", args.exp)
+    if args.approx_fraction is not None:
+        exp["approx_fraction"] = args.approx_fraction
+    if args.bootstrap is not None:
+        exp["bootstrap"] = args.bootstrap
     selected = args.dataset or []
     runs_root = Path(args.runs)
     exp_root = runs_root / args.exp
@@ -196,8 +226,8 @@ def recompute_cmd(args) -> None:
         meta = json.loads(meta_path.read_text())
         if meta.get("return_code") not in {None, 0}:
             continue
-        metrics = build_run_metrics(exp, dataset, meta.get("outputs") or {})
-        (run_dir / "metrics.json").write_text(json.dumps(metrics, indent=2))
+        metrics = build_run_metrics(exp, dataset, meta.get("outputs") or {}, run_dir)
+        (run_dir / metrics_filename(exp)).write_text(json.dumps(metrics, indent=2))
 
     write_classify_readme(runs_root)
     if args.profile:
@@ -208,6 +238,83 @@ def recompute_cmd(args) -> None:
     write_summary(_collect_summary_records(runs_root, args.exp, selected), out)
 
 
+def sweep_cmd(args) -> None:
+    cfg_root = Path(args.config)
+    datasets = load_yaml_dir(cfg_root / "datasets")
+    exps = load_yaml_dir(cfg_root / "experiments")
+    exp = dict(exps[args.exp])
+    exp["name"] = exp.get("name", args.exp)
+    exp["score_sweep"] = [float(t) for t in args.thresholds.split(",")] if args.thresholds else True
+    selected = args.dataset or []
+    exp_root = Path(args.runs) / args.exp
+
+    for dataset in _resolve_datasets(exp, datasets, selected):
+        dataset_name = dataset.get("name", "dataset")
+        run_dir = exp_root / dataset_name
+        meta_path = run_dir / "meta.json"
+        if not meta_path.exists():
+            continue
+        meta = json.loads(meta_path.read_text())
+        if meta.get("return_code") not in {None, 0}:
+            continue
+        rows: list[dict] = []
+        metrics = evaluate_with_truth(
+            exp,
+            dataset,
+            meta.get("outputs") or {},
+            include_profile=False,
+            pr_curve=rows,
+        )
+        if not rows:
+            print(f"[sweep] {dataset_name}: no scored predictions", file=sys.stderr)
+            continue
+        write_pr_curve(run_dir / PR_CURVE_FILENAME, rows)
+        best = ", ".join(
+            f"{rank} f1={metrics[f'sweep_best_f1_{rank}']:.4f}@{metrics[f'sweep_best_threshold_{rank}']:g}"
+            for rank in dict.fromkeys(row["rank"] for row in rows)
+            if f"sweep_best_f1_{rank}" in metrics
+        )
+        print(f"[sweep] {dataset_name}: {best}")
+
+
+def confusion_cmd(args) -> None:
+    path = Path(args.run_dir)
+    if path.is_dir():
+        path = path / CONFUSION_FILENAME
+    if not path.exists():
+        raise FileNotFoundError(f"confusion matrix not found: {path}")
+    confusion_by_rank = read_confusion_npz(path)
+    if args.rank not in confusion_by_rank:
+        raise ValueError(f"rank {args.rank} not in {path} (available: {', '.join(confusion_by_rank)})")
+    names: dict[int, str] = {}
+    if args.names:
+        names, _syn_to_sci, _sci_names = build_name_maps(Path(args.names))
+
+    def _label(taxid: int) -> str:
+        if taxid == UNASSIGNED_TAXID:
+            return "unassigned"
+        return names.get(taxid, "")
+
+    print("\t".join(["true_taxid", "true_name", "pred_taxid", "pred_name", "reads", "fraction_of_true"]))
+    for row in top_confusions(
+        confusion_by_rank[args.rank],
+        args.top,
+        include_unassigned=args.include_unassigned,
+    ):
+        print(
+            "\t".join(
+                [
+                    str(row["true_taxid"]),
+                    _label(row["true_taxid"]),
+                    str(row["pred_taxid"]),
+                    _label(row["pred_taxid"]),
+                    str(row["reads"]),
+                    f"{row['fraction_of_true']:.6f}",
+                ]
+            )
+        )
+
+
 def build_cmd(args) -> None:
     cfg_root = Path(args.config)
     builds = load_yaml_dir(cfg_root / "build")
@@ -258,6 +365,9 @@ def main() -> None:
     run_p.add_argument("--sylph-env", default="sylph")
     run_p.add_argument("--dry-run", action="store_true")
     run_p.add_argument("--dataset", action="append", default=[])
+    run_p.add_argument("--bootstrap", type=int, default=None)
+    run_p.add_argument("--calibrate", type=int, default=None)
+    run_p.add_argument("--resources-root", default="resources")
     run_p.set_defaults(func=run_cmd)
 
     report_p = sub.add_parser("report")
@@ -274,8 +384,26 @@ def main() -> None:
     recompute_p.add_argument("--profile", default="results/profile")
     recompute_p.add_argument("--out", default="resources/reports/summary.tsv")
     recompute_p.add_argument("--dataset", action="append", default=[])
+    recompute_p.add_argument("--approx-fraction", type=float, default=None)
+    recompute_p.add_argument("--bootstrap", type=int, default=None)
     recompute_p.set_defaults(func=recompute_cmd)
 
+    sweep_p = sub.add_parser("sweep")
+    sweep_p.add_argument("--exp", required=True)
+    sweep_p.add_argument("--config", default="configs")
+    sweep_p.add_argument("--runs", default="results/classify")
+    sweep_p.add_argument("--dataset", action="append", default=[])
+    sweep_p.add_argument("--thresholds", default=None)
+    sweep_p.set_defaults(func=sweep_cmd)
+
+    confusion_p = sub.add_parser("confusion")
+    confusion_p.add_argument("--run-dir", required=True)
+    confusion_p.add_argument("--rank", default="species")
+    confusion_p.add_argument("--top", type=int, default=20)
+    confusion_p.add_argument("--names", default=None)
+    confusion_p.add_argument("--include-unassigned", action="store_true")
+    confusion_p.set_defaults(func=confusion_cmd)
+
     build_p = sub.add_parser("build")
     build_p.add_argument("--build", required=True)
     build_p.add_argument("--config", default="configs")
@@ -291,6 +419,11 @@ def main() -> None:
     catalog_p.add_argument("--config", default="configs")
     catalog_p.add_argument("--results-root", default="results")
     catalog_p.add_argument("--resources-root", default="resources")
+    catalog_p.add_argument("--jobs", type=int, default=1)
+    catalog_p.add_argument("--fingerprint", choices=list(FINGERPRINT_MODES), default="sample")
+    catalog_p.add_argument("--approx", action="store_true")
+    catalog_p.add_argument("--approx-records", type=int, default=1000)
+    catalog_p.add_argument("--engine", choices=list(SCAN_ENGINES), default="auto")
     catalog_p.set_defaults(func=catalog_cmd)
 
     paper_p = sub.add_parser("paper-freeze")
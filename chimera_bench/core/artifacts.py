@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable
+
+from ..io.fingerprint import content_fingerprint, stat_signature
+
+ARTIFACTS_DIRNAME = ".artifacts"
+
+
+def input_fingerprint(paths: Iterable[str | Path]) -> list[list[Any]]:
+    """Resolved path and `size:mtime` of each input, so edited inputs never match a stored artifact."""
+    fingerprint = []
+    for raw in paths:
+        path = Path(raw).resolve()
+        try:
+            fingerprint.append([str(path), stat_signature(path)])
+        except OSError:
+            fingerprint.append([str(path), None])
+    return fingerprint
+
+
+def file_identity(paths: Iterable[str | Path]) -> list[str | None]:
+    """`dev:inode:size:mtime` of each file, without its path.
+
+    Hard links and symlinks to one file share an identity, so a DB staged into another
+    directory by linking keys the same as its source; an edited or rebuilt file does not.
+    """
+    identity = []
+    for raw in paths:
+        try:
+            stat = Path(raw).stat()
+        except OSError:
+            identity.append(None)
+            continue
+        identity.append(f"{stat.st_dev}:{stat.st_ino}:{stat.st_size}:{stat.st_mtime_ns}")
+    return identity
+
+
+def input_content_fingerprint(paths: Iterable[str | Path]) -> list[str | None]:
+    """Content fingerprint of each input, independent of where the file lives or its mtime."""
+    fingerprint = []
+    for raw in paths:
+        try:
+            fingerprint.append(content_fingerprint(Path(raw)))
+        except OSError:
+            fingerprint.append(None)
+    return fingerprint
+
+
+def artifact_key(kind: str, fields: Dict[str, Any]) -> str:
+    payload = json.dumps({"kind": kind, **fields}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+class ArtifactStore:
+    """Index of step outputs shared across experiments (e.g. one Kraken2 classification).
+
+    Steps opt in with an `artifact` entry (`{"kind": ..., "fields": {...}, "outputs": [names]}`),
+    where `outputs` names the step outputs that are shared. An optional `content_fields`
+    (the same fields keyed by content fingerprints) gives a second key that still matches
+    after inputs are copied or touched; either key counts. The first successful
+    run records its outputs and step record under `<runs_root>/.artifacts/<kind>/<key>.json`;
+    later steps with the same key in other run directories link those outputs instead of
+    running again. Re-running the owning experiment still executes the step unless the
+    experiment sets `reuse_own_artifacts`, in which case its own recorded outputs are kept.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = Path(root)
+
+    def _path(self, kind: str, key: str) -> Path:
+        return self.root / kind / f"{key}.json"
+
+    def get(self, kind: str, key: str) -> Dict[str, Any] | None:
+        path = self._path(kind, key)
+        if not path.exists():
+            return None
+        try:
+            entry = json.loads(path.read_text())
+        except json.JSONDecodeError:
+            return None
+        outputs = entry.get("outputs") or {}
+        if not outputs or not all(Path(value).exists() for value in outputs.values()):
+            return None
+        return entry
+
+    def put(self, kind: str, key: str, *, run_dir: Path, step: Dict[str, Any], outputs: Dict[str, str]) -> None:
+        path = self._path(kind, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        entry = {
+            "kind": kind,
+            "key": key,
+            "run_dir": str(Path(run_dir).resolve()),
+            "step": step,
+            "outputs": {name: str(Path(value).resolve()) for name, value in outputs.items()},
+        }
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(json.dumps(entry, indent=2))
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def link_outputs(entry: Dict[str, Any], outputs: Dict[str, str]) -> bool:
+        """Symlink stored outputs to the paths this step would have written."""
+        stored = entry.get("outputs") or {}
+        if not set(outputs) <= set(stored):
+            return False
+        for name, target in outputs.items():
+            source = Path(stored[name])
+            target_path = Path(target)
+            if target_path.resolve() == source.resolve():
+                continue
+            target_path.parent.mkdir(parents=True, exist_ok=True)
+            if target_path.is_symlink() or target_path.exists():
+                target_path.unlink()
+            target_path.symlink_to(source)
+        return True
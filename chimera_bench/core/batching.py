@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Any, Dict, List
+
+BATCH_DIRNAME = ".batches"
+_TAG_WIDTH = 7
+
+
+def batch_tag(idx: int) -> str:
+    """Fixed-width read-id prefix for the `idx`-th sample of a batch (e.g. `cb0003_`)."""
+    tag = f"cb{idx:04d}_"
+    if len(tag) != _TAG_WIDTH:
+        raise ValueError(f"too many samples in one batch: {idx + 1}")
+    return tag
+
+
+def batch_groups(datasets: List[Dict], batch_size: int) -> List[List[Dict]]:
+    """Group consecutive samples of the same collection into batches of at most `batch_size`.
+
+    Datasets outside a collection stay on their own.
+    """
+    groups: List[List[Dict]] = []
+    for dataset in datasets:
+        collection = dataset.get("dataset_collection")
+        last = groups[-1] if groups else None
+        if (
+            collection
+            and last is not None
+            and len(last) < batch_size
+            and last[0].get("dataset_collection") == collection
+        ):
+            last.append(dataset)
+        else:
+            groups.append([dataset])
+    return groups
+
+
+def demux_per_read(source: Path, column: int, targets: Dict[str, str]) -> Dict[str, int]:
+    """Split a batched per-read output back into per-sample files by the read-id tag.
+
+    `column` is the read-id column; tags are stripped so each file holds the sample's own ids.
+    Untagged lines before the first read (headers) are copied to every sample; later untagged
+    lines are dropped and counted under `"untagged"`.
+    """
+    counts = {tag: 0 for tag in targets}
+    counts["untagged"] = 0
+    with ExitStack() as stack:
+        outs = {}
+        for tag, target in targets.items():
+            Path(target).parent.mkdir(parents=True, exist_ok=True)
+            outs[tag] = stack.enter_context(Path(target).open("w", encoding="utf-8", errors="surrogateescape"))
+        seen_read = False
+        with source.open("r", encoding="utf-8", errors="surrogateescape") as fh:
+            for line in fh:
+                parts = line.split("\t")
+                field = parts[column] if column < len(parts) else ""
+                out = outs.get(field[:_TAG_WIDTH])
+                if out is None:
+                    if seen_read:
+                        counts["untagged"] += 1
+                        continue
+                    for handle in outs.values():
+                        handle.write(line)
+                    continue
+                seen_read = True
+                counts[field[:_TAG_WIDTH]] += 1
+                parts[column] = field[_TAG_WIDTH:]
+                out.write("\t".join(parts))
+    return counts
+
+
+def apportion_resource(resource: Dict[str, Any], share: float) -> Dict[str, Any]:
+    """Charge a sample `share` of a batched process: CPU and wall time scale, peak memory is kept."""
+    apportioned = dict(resource or {})
+    for key in ("user_time_seconds", "system_time_seconds", "elapsed_wall_seconds"):
+        value = apportioned.get(key)
+        if isinstance(value, (int, float)):
+            apportioned[key] = value * share
+    apportioned.pop("elapsed_wall", None)
+    return apportioned
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import math
+import random
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+DEFAULT_REPLICATES = 1000
+DEFAULT_ALPHA = 0.05
+# Above this expected count the binomial is drawn from its normal approximation.
+_NORMAL_APPROX_MIN_MEAN = 50.0
+
+
+def binomial(rng: random.Random, n: int, p: float) -> int:
+    if n <= 0 or p <= 0:
+        return 0
+    if p >= 1:
+        return n
+    if p > 0.5:
+        return n - binomial(rng, n, 1.0 - p)
+    binomialvariate = getattr(rng, "binomialvariate", None)
+    if binomialvariate is not None:
+        return binomialvariate(n, p)
+    mean = n * p
+    if mean < _NORMAL_APPROX_MIN_MEAN:
+        # Geometric waiting times between successes: O(n * p) draws.
+        log_q = math.log1p(-p)
+        count = 0
+        position = 0
+        while True:
+            position += int(math.log(1.0 - rng.random()) / log_q) + 1
+            if position > n:
+                return count
+            count += 1
+    value = round(rng.gauss(mean, math.sqrt(mean * (1.0 - p))))
+    return min(n, max(0, value))
+
+
+def multinomial(rng: random.Random, n: int, probs: Sequence[float]) -> List[int]:
+    counts = []
+    remaining_n = n
+    remaining_p = 1.0
+    for p in probs[:-1]:
+        if remaining_n <= 0 or remaining_p <= 0:
+            draw = 0
+        else:
+            draw = binomial(rng, remaining_n, min(1.0, p / remaining_p))
+        counts.append(draw)
+        remaining_n -= draw
+        remaining_p -= p
+    counts.append(max(0, remaining_n))
+    return counts
+
+
+def poisson_one(rng: random.Random) -> int:
+    # Inversion for Poisson(1), the weight distribution of the Poisson bootstrap.
+    threshold = rng.random()
+    k = 0
+    term = math.exp(-1.0)
+    cumulative = term
+    while threshold > cumulative:
+        k += 1
+        term /= k
+        cumulative += term
+    return k
+
+
+def percentile_interval(values: Iterable[float], alpha: float = DEFAULT_ALPHA) -> Tuple[float, float]:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0, 0.0
+    last = len(ordered) - 1
+
+    def _at(q: float) -> float:
+        pos = q * last
+        lower = int(math.floor(pos))
+        upper = min(lower + 1, last)
+        return ordered[lower] + (ordered[upper] - ordered[lower]) * (pos - lower)
+
+    return _at(alpha / 2), _at(1 - alpha / 2)
+
+
+def intervals_from_replicates(
+    replicates: Dict[str, List[float]],
+    alpha: float = DEFAULT_ALPHA,
+) -> Dict[str, float]:
+    """Percentile intervals as `<key>_boot_ci_low/high`, distinct from the analytic `<key>_ci_*` bounds."""
+    metrics: Dict[str, float] = {}
+    for key, values in replicates.items():
+        low, high = percentile_interval(values, alpha)
+        metrics[f"{key}_boot_ci_low"] = low
+        metrics[f"{key}_boot_ci_high"] = high
+    return metrics
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from typing import Dict
+
+CALIBRATION_READS_DEFAULT = 1000
+
+
+def calibration_reads(exp: dict) -> int:
+    """Number of calibration reads requested by exp `calibrate` (True -> default, int -> that many)."""
+    value = exp.get("calibrate")
+    if value is None or value is False:
+        return 0
+    if value is True:
+        return CALIBRATION_READS_DEFAULT
+    reads = int(value)
+    if reads < 1:
+        raise ValueError(f"calibrate must be true or a positive read count: {value}")
+    return reads
+
+
+def estimate_throughput(
+    *,
+    run_elapsed: float,
+    run_reads: int,
+    run_bases: int | None,
+    calibration_elapsed: float,
+    calibration_reads: int,
+) -> Dict[str, float]:
+    """Split a run's time into fixed load cost and per-read work.
+
+    Both runs are modelled as `elapsed = load + reads * per_read`; the calibration run on a
+    few reads pins the load term. Throughput is reported over the remaining time.
+    """
+    metrics: Dict[str, float] = {"calibration_elapsed_seconds": calibration_elapsed}
+    if run_reads <= calibration_reads:
+        return metrics
+    per_read = max(0.0, (run_elapsed - calibration_elapsed) / (run_reads - calibration_reads))
+    load = min(max(0.0, calibration_elapsed - per_read * calibration_reads), run_elapsed)
+    work = run_elapsed - load
+    metrics["load_elapsed_seconds"] = load
+    metrics["classify_elapsed_seconds"] = work
+    if work > 0:
+        metrics["reads_per_second"] = run_reads / work
+        if run_bases:
+            metrics["bases_per_second"] = run_bases / work
+    return metrics
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import ast
+import struct
+import sys
+import zipfile
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+from .metrics import _safe_prf
+
+CONFUSION_FILENAME = "confusion.npz"
+PER_TAXON_FILENAME = "per_taxon_metrics.tsv"
+# Predicted column used for reads that are unclassified or not resolvable at the rank.
+UNASSIGNED_TAXID = 0
+
+ConfusionCounts = Dict[Tuple[int, int], int]
+
+_NPY_MAGIC = b"\x93NUMPY"
+
+
+def _npy_bytes(values: Iterable[int]) -> bytes:
+    data = array("q", values)
+    if sys.byteorder != "little":
+        data.byteswap()
+    header = repr({"descr": "<i8", "fortran_order": False, "shape": (len(data),)})
+    # Header is padded so that magic + version + length + header is a multiple of 64.
+    pad = 64 - (len(_NPY_MAGIC) + 2 + 2 + len(header) + 1) % 64
+    header_bytes = (header + " " * (pad % 64) + "\n").encode("latin1")
+    return _NPY_MAGIC + b"\x01\x00" + struct.pack("<H", len(header_bytes)) + header_bytes + data.tobytes()
+
+
+def _npy_values(raw: bytes) -> array:
+    if not raw.startswith(_NPY_MAGIC):
+        raise ValueError("not a .npy array")
+    major = raw[6]
+    if major == 1:
+        (header_len,) = struct.unpack("<H", raw[8:10])
+        offset = 10
+    else:
+        (header_len,) = struct.unpack("<I", raw[8:12])
+        offset = 12
+    header = ast.literal_eval(raw[offset : offset + header_len].decode("latin1"))
+    if header.get("descr") != "<i8" or header.get("fortran_order"):
+        raise ValueError(f"unsupported .npy layout: {header}")
+    data = array("q")
+    data.frombytes(raw[offset + header_len :])
+    if sys.byteorder != "little":
+        data.byteswap()
+    return data
+
+
+def write_confusion_npz(path: Path, confusion_by_rank: Dict[str, ConfusionCounts]) -> None:
+    """Store per-rank confusion counts as COO arrays (`<rank>_true`, `<rank>_pred`, `<rank>_reads`).
+
+    The archive is a regular compressed `.npz`, so `numpy.load` can read it as well.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for rank, counts in confusion_by_rank.items():
+            cells = sorted(counts.items())
+            zf.writestr(f"{rank}_true.npy", _npy_bytes(true for (true, _pred), _reads in cells))
+            zf.writestr(f"{rank}_pred.npy", _npy_bytes(pred for (_true, pred), _reads in cells))
+            zf.writestr(f"{rank}_reads.npy", _npy_bytes(reads for _cell, reads in cells))
+    tmp_path.replace(path)
+
+
+def read_confusion_npz(path: Path) -> Dict[str, ConfusionCounts]:
+    arrays: Dict[str, array] = {}
+    with zipfile.ZipFile(path) as zf:
+        for name in zf.namelist():
+            if name.endswith(".npy"):
+                arrays[name[: -len(".npy")]] = _npy_values(zf.read(name))
+    confusion_by_rank: Dict[str, ConfusionCounts] = {}
+    for key in arrays:
+        if not key.endswith("_true"):
+            continue
+        rank = key[: -len("_true")]
+        true_ids = arrays[key]
+        pred_ids = arrays.get(f"{rank}_pred")
+        reads = arrays.get(f"{rank}_reads")
+        if pred_ids is None or reads is None or not (len(true_ids) == len(pred_ids) == len(reads)):
+            raise ValueError(f"incomplete confusion arrays for rank {rank}: {path}")
+        confusion_by_rank[rank] = {
+            (int(true), int(pred)): int(count) for true, pred, count in zip(true_ids, pred_ids, reads)
+        }
+    return confusion_by_rank
+
+
+def per_taxon_metrics(counts: ConfusionCounts) -> List[Dict[str, float]]:
+    truth_reads: Dict[int, int] = {}
+    pred_reads: Dict[int, int] = {}
+    tp: Dict[int, int] = {}
+    for (true, pred), reads in counts.items():
+        truth_reads[true] = truth_reads.get(true, 0) + reads
+        if pred != UNASSIGNED_TAXID:
+            pred_reads[pred] = pred_reads.get(pred, 0) + reads
+        if true == pred:
+            tp[true] = tp.get(true, 0) + reads
+
+    rows = []
+    for taxid in sorted(set(truth_reads) | set(pred_reads)):
+        hits = tp.get(taxid, 0)
+        n_truth = truth_reads.get(taxid, 0)
+        n_pred = pred_reads.get(taxid, 0)
+        precision, recall, f1 = _safe_prf(hits, n_pred - hits, n_truth - hits)
+        rows.append(
+            {
+                "taxid": taxid,
+                "truth_reads": n_truth,
+                "pred_reads": n_pred,
+                "tp": hits,
+                "precision": precision,
+                "recall": recall,
+                "f1": f1,
+            }
+        )
+    return rows
+
+
+def write_per_taxon_metrics(path: Path, confusion_by_rank: Dict[str, ConfusionCounts]) -> None:
+    columns = ["rank", "taxid", "truth_reads", "pred_reads", "tp", "precision", "recall", "f1"]
+    lines = ["\t".join(columns)]
+    for rank, counts in confusion_by_rank.items():
+        for row in per_taxon_metrics(counts):
+            row = {"rank": rank, **row}
+            lines.append("\t".join(str(row[col]) for col in columns))
+    path.write_text("\n".join(lines) + "\n")
+
+
+def write_confusion_outputs(run_dir: Path, confusion_by_rank: Dict[str, ConfusionCounts]) -> Dict[str, str]:
+    confusion_path = run_dir / CONFUSION_FILENAME
+    per_taxon_path = run_dir / PER_TAXON_FILENAME
+    write_confusion_npz(confusion_path, confusion_by_rank)
+    write_per_taxon_metrics(per_taxon_path, confusion_by_rank)
+    return {"confusion_npz": str(confusion_path), "per_taxon_metrics_tsv": str(per_taxon_path)}
+
+
+def top_confusions(counts: ConfusionCounts, top: int = 20, *, include_unassigned: bool = False):
+    truth_reads: Dict[int, int] = {}
+    for (true, _pred), reads in counts.items():
+        truth_reads[true] = truth_reads.get(true, 0) + reads
+    cells = [
+        (reads, true, pred)
+        for (true, pred), reads in counts.items()
+        if true != pred and (include_unassigned or pred != UNASSIGNED_TAXID)
+    ]
+    cells.sort(key=lambda cell: (-cell[0], cell[1], cell[2]))
+    return [
+        {
+            "true_taxid": true,
+            "pred_taxid": pred,
+            "reads": reads,
+            "fraction_of_true": reads / truth_reads[true] if truth_reads.get(true) else 0.0,
+        }
+        for reads, true, pred in cells[:top]
+    ]
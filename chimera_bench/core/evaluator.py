@@ -1,6 +1,9 @@
 from __future__ import annotations
 
 from pathlib import Path
+from typing import Iterable, Tuple
+
+from .predictions import BinaryPredictions
 
 
 def summarize_classify_tsv(path: Path) -> dict:
@@ -41,6 +44,46 @@ def summarize_classify_tsv(path: Path) -> dict:
     }
 
 
+def summarize_prediction_bin(path: Path) -> dict:
+    preds = BinaryPredictions(path)
+    try:
+        total = len(preds)
+        unclassified = 0
+        taxids: set[int] = set()
+        for taxid in preds.taxids():
+            if taxid == 0:
+                unclassified += 1
+            else:
+                taxids.add(taxid)
+    finally:
+        preds.close()
+    return {
+        "total_reads": total,
+        "unclassified_reads": unclassified,
+        "classified_reads": max(0, total - unclassified),
+        "unique_taxids": len(taxids),
+    }
+
+
+def summarize_prediction_records(records: Iterable[Tuple[str, int | None]]) -> dict:
+    """Summary for raw per-read records from `core.readers` (one record per read line)."""
+    total = 0
+    unclassified = 0
+    taxids: set[int] = set()
+    for _read_id, taxid in records:
+        total += 1
+        if taxid is None:
+            unclassified += 1
+        else:
+            taxids.add(taxid)
+    return {
+        "total_reads": total,
+        "unclassified_reads": unclassified,
+        "classified_reads": max(0, total - unclassified),
+        "unique_taxids": len(taxids),
+    }
+
+
 def summarize_ganon_tre(path: Path) -> dict:
     classified = None
     unclassified = None
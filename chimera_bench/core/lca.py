@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from .taxonomy import CompiledTaxonomy, compile_taxonomy
+
+MULTI_HIT_POLICIES = ("first", "lca", "majority")
+_PENDING_GROUPS = 4096
+
+
+class LcaIndex:
+    """Constant-time lowest-common-ancestor queries over a `CompiledTaxonomy`.
+
+    An Euler tour of every tree in the compiled forest is indexed with a sparse table over
+    node depths, so each query is two table lookups. Nodes in different trees have no LCA.
+    """
+
+    def __init__(self, compiled: CompiledTaxonomy) -> None:
+        self.compiled = compiled
+        size = len(compiled)
+        children: List[List[int]] = [[] for _ in range(size)]
+        roots: List[int] = []
+        # Postorder indexing lists children before parents; reverse so the tour visits them in order.
+        for idx in range(size - 1, -1, -1):
+            parent = compiled.parent[idx]
+            (children[parent] if parent >= 0 else roots).append(idx)
+
+        euler = array("l")
+        first = array("l", [-1]) * size
+        tree = array("l", [-1]) * size
+        for root in roots:
+            stack = [(root, iter(children[root]))]
+            first[root] = len(euler)
+            tree[root] = root
+            euler.append(root)
+            while stack:
+                node, pending = stack[-1]
+                child = next(pending, None)
+                if child is None:
+                    stack.pop()
+                    if stack:
+                        euler.append(stack[-1][0])
+                    continue
+                first[child] = len(euler)
+                tree[child] = root
+                euler.append(child)
+                stack.append((child, iter(children[child])))
+
+        depth = compiled.depth
+        table = [euler]
+        span = 1
+        while 2 * span <= len(euler):
+            prev = table[-1]
+            level = array("l", prev[: len(euler) - 2 * span + 1])
+            for pos in range(len(level)):
+                other = prev[pos + span]
+                if depth[other] < depth[level[pos]]:
+                    level[pos] = other
+            table.append(level)
+            span *= 2
+        self._first = first
+        self._tree = tree
+        self._table = table
+
+    def _lca_index(self, a: int, b: int) -> int | None:
+        if self._tree[a] != self._tree[b]:
+            return None
+        left, right = self._first[a], self._first[b]
+        if left > right:
+            left, right = right, left
+        level = (right - left + 1).bit_length() - 1
+        row = self._table[level]
+        x, y = row[left], row[right - (1 << level) + 1]
+        return x if self.compiled.depth[x] <= self.compiled.depth[y] else y
+
+    def lca(self, a: int, b: int) -> int | None:
+        index = self.compiled.index
+        if a not in index or b not in index:
+            return None
+        found = self._lca_index(index[a], index[b])
+        return self.compiled.taxids[found] if found is not None else None
+
+    def lca_many(self, taxids: Iterable[int]) -> int | None:
+        """LCA of all taxids known to the taxonomy (unknown ones are ignored)."""
+        index = self.compiled.index
+        current = None
+        for taxid in taxids:
+            idx = index.get(taxid)
+            if idx is None:
+                continue
+            current = idx if current is None else self._lca_index(current, idx)
+            if current is None:
+                return None
+        return self.compiled.taxids[current] if current is not None else None
+
+
+# Keyed by id() of the taxonomy; the index keeps its compiled taxonomy, which is checked by identity.
+_LCA_CACHE_SIZE = 16
+_LCA_CACHE: Dict[int, LcaIndex] = {}
+
+
+def lca_index(taxonomy: Dict[int, Tuple[int, str]], taxids: Iterable[int]) -> LcaIndex:
+    """Return an `LcaIndex` covering `taxids`, rebuilt only when the compiled taxonomy grows."""
+    compiled = compile_taxonomy(taxonomy, taxids)
+    cache_key = id(taxonomy)
+    cached = _LCA_CACHE.pop(cache_key, None)
+    if cached is None or cached.compiled is not compiled:
+        cached = LcaIndex(compiled)
+    _LCA_CACHE[cache_key] = cached
+    while len(_LCA_CACHE) > _LCA_CACHE_SIZE:
+        del _LCA_CACHE[next(iter(_LCA_CACHE))]
+    return cached
+
+
+def resolve_hits(hits: Sequence[int | None], policy: str, index: LcaIndex | None) -> int | None:
+    """Collapse the taxids of one read's hits (in output order) to a single assignment.
+
+    `first` keeps the first line as converters do. `lca` and `majority` ignore unclassified
+    lines; `majority` keeps a taxid hit by more than half of the remaining lines and otherwise
+    falls back to the LCA of all of them.
+    """
+    if not hits:
+        return None
+    if policy == "first" or len(hits) == 1:
+        return hits[0]
+    hits = [taxid for taxid in hits if taxid is not None]
+    if not hits:
+        return None
+    if policy == "majority":
+        taxid, count = Counter(hits).most_common(1)[0]
+        if 2 * count > len(hits):
+            return taxid
+    elif policy != "lca":
+        raise ValueError(f"unsupported multi-hit policy: {policy}")
+    if index is None:
+        raise ValueError(f"multi-hit policy {policy} requires a taxonomy")
+    distinct = set(hits)
+    if len(distinct) == 1:
+        return hits[0]
+    return index.lca_many(distinct)
+
+
+def group_hits(records: Iterable[Tuple[str, int | None]]) -> Iterator[Tuple[str, List[int | None]]]:
+    """Group consecutive records of the same read (unclassified hits are kept as None).
+
+    Tools write all hits of a read together, so only the current read is held in memory.
+    """
+    current = None
+    hits: List[int | None] = []
+    for read_id, taxid in records:
+        if read_id != current:
+            if current is not None:
+                yield current, hits
+            current = read_id
+            hits = []
+        hits.append(taxid)
+    if current is not None:
+        yield current, hits
+
+
+def resolve_groups(
+    groups: Iterable[Tuple[str, List[int | None]]],
+    policies: Sequence[str],
+    taxonomy: Dict[int, Tuple[int, str]] | None = None,
+) -> Iterator[Tuple[str, Tuple[int | None, ...]]]:
+    """Yield `(read_id, assignment per policy)` for streamed hit groups.
+
+    Groups with taxids the current `LcaIndex` does not cover are held back and resolved in
+    batches after the compiled taxonomy grows, so the index is rebuilt rarely; output order
+    therefore follows input order only within each batch.
+    """
+    policies = tuple(policies)
+    for policy in policies:
+        if policy not in MULTI_HIT_POLICIES:
+            raise ValueError(f"unsupported multi-hit policy: {policy}")
+    needs_lca = any(policy != "first" for policy in policies)
+    if needs_lca and taxonomy is None:
+        raise ValueError("multi-hit policies other than 'first' require a taxonomy")
+    index = lca_index(taxonomy, ()) if needs_lca else None
+    pending: List[Tuple[str, List[int | None]]] = []
+    missing: set[int] = set()
+
+    def _resolve(read_id: str, hits: List[int | None]) -> Tuple[str, Tuple[int | None, ...]]:
+        return read_id, tuple(resolve_hits(hits, policy, index) for policy in policies)
+
+    for read_id, hits in groups:
+        if index is not None and len(hits) > 1:
+            unknown = [
+                taxid for taxid in hits if taxid is not None and taxid not in index.compiled and taxid in taxonomy
+            ]
+            if unknown:
+                missing.update(unknown)
+                pending.append((read_id, hits))
+                if len(pending) >= _PENDING_GROUPS:
+                    index = lca_index(taxonomy, missing)
+                    missing.clear()
+                    for item in pending:
+                        yield _resolve(*item)
+                    pending.clear()
+                continue
+        yield _resolve(read_id, hits)
+    if pending:
+        index = lca_index(taxonomy, missing)
+        for item in pending:
+            yield _resolve(*item)
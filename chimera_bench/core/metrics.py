@@ -1,10 +1,39 @@
 from __future__ import annotations
 
-import gzip
+import hashlib
+import math
+import random
 import re
+from bisect import bisect_right
 from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Iterable, Tuple, Union
+from typing import Callable, Dict, Iterable, List, Tuple, Union
+
+from ..io.reference_index import ReferenceIndex, accession_from_name
+from .predictions import BinaryPredictions, binary_predictions_path
+from .lca import MULTI_HIT_POLICIES, resolve_groups
+from .readers import (
+    PROFILE_READERS,
+    SCORE_READERS,
+    SCORE_THRESHOLDS_DEFAULT,
+    _open_text,
+    iter_hit_groups,
+    load_native_predictions,
+    multi_hit_source,
+    native_prediction_source,
+    native_profile_source,
+    score_source,
+)
+from .profile_matrix import MOST_SPECIFIC_RANK, ProfileMatrix, batch_profile_metrics
+from .taxonomy import compile_taxonomy
+from .unifrac import unifrac_distance, weighted_unifrac_matrix
+from .bootstrap import (
+    DEFAULT_ALPHA,
+    DEFAULT_REPLICATES,
+    intervals_from_replicates,
+    multinomial,
+    poisson_one,
+)
 
 RANKS_DEFAULT = ("species", "genus")
 PROFILE_RANK_PRIORITY = (
@@ -17,9 +46,12 @@ PROFILE_RANK_PRIORITY = (
     "phylum",
     "superkingdom",
 )
+# Per-read metrics are cheap to emit for every canonical rank once lineages are tabulated.
+PER_READ_RANKS_DEFAULT = PROFILE_RANK_PRIORITY
 METRIC_VERSION = "per-read-descendant-aware-v1+profile-opal-v2"
 
 TaxKey = Union[int, str]
+ReadFilter = Callable[[str], bool]
 
 NAME_CLASSES = {
     "synonym",
@@ -38,12 +70,6 @@ _NAME_MAP_CACHE: dict[
 ] = {}
 
 
-def _open_text(path: Path):
-    if path.suffix == ".gz":
-        return gzip.open(path, "rt", encoding="utf-8", errors="ignore")
-    return path.open("r", encoding="utf-8", errors="ignore")
-
-
 @lru_cache(maxsize=16)
 def load_taxonomy(
     path: Path,
@@ -218,7 +244,9 @@ def build_coverage_sets(
     taxonomy: Dict[int, Tuple[int, str]],
     ranks: Iterable[str],
 ) -> Dict[str, set[int]]:
+    ranks = tuple(ranks)
     covered: Dict[str, set[int]] = {r: set() for r in ranks}
+    seen: set[int] = set()
     with _open_text(target_tsv) as fh:
         for raw in fh:
             line = raw.strip()
@@ -231,8 +259,11 @@ def build_coverage_sets(
                 taxid = int(parts[1])
             except ValueError:
                 continue
-            for rank in ranks:
-                mapped = taxid_to_rank(taxid, rank, taxonomy)
+            if taxid in seen:
+                continue
+            seen.add(taxid)
+            mapped_ranks, _visited = rank_lineage(taxid, taxonomy, ranks)
+            for rank, mapped in zip(ranks, mapped_ranks):
                 if mapped is None:
                     continue
                 covered[rank].add(mapped)
@@ -310,7 +341,7 @@ def collapse_pred_to_truth(
     return out
 
 
-def parse_classify_tsv(path: Path) -> Dict[str, int | None]:
+def parse_classify_tsv(path: Path, keep: ReadFilter | None = None) -> Dict[str, int | None]:
     preds: Dict[str, int | None] = {}
     with _open_text(path) as fh:
         for raw in fh:
@@ -321,6 +352,8 @@ def parse_classify_tsv(path: Path) -> Dict[str, int | None]:
             if len(parts) < 2:
                 continue
             read_id = normalize_read_id(parts[0])
+            if keep is not None and not keep(read_id):
+                continue
             tokens = [t for t in parts[1:] if t]
             if not tokens or tokens[0] == "unclassified":
                 preds[read_id] = None
@@ -338,6 +371,31 @@ def normalize_read_id(read_id: str) -> str:
     return read_id.strip().split()[0] if read_id.strip() else ""
 
 
+def read_sampler(fraction: float | None) -> ReadFilter | None:
+    """Deterministic read subsampler for approximate evaluation.
+
+    A read is kept when the 64-bit hash of its normalized id (mate suffix removed) is below
+    `fraction` of the hash space, so truth, predictions and both mates agree without coordination.
+    """
+    if fraction is None:
+        return None
+    fraction = float(fraction)
+    if not 0 < fraction <= 1:
+        raise ValueError(f"approx_fraction must be in (0, 1]: {fraction}")
+    if fraction == 1:
+        return None
+    threshold = int(fraction * (1 << 64))
+
+    def keep(read_id: str) -> bool:
+        normalized = normalize_read_id(read_id)
+        if normalized.endswith("/1") or normalized.endswith("/2"):
+            normalized = normalized[:-2]
+        digest = hashlib.blake2b(normalized.encode("utf-8", "surrogateescape"), digest_size=8).digest()
+        return int.from_bytes(digest, "little") < threshold
+
+    return keep
+
+
 def _paired_mate_id(read_id: str) -> str | None:
     if read_id.endswith("/1"):
         return f"{read_id[:-2]}/2"
@@ -371,36 +429,12 @@ def _prediction_for_read(
     return None
 
 
-def parse_ganon_one(path: Path, file_to_taxid: Dict[str, int] | None = None) -> Dict[str, int | None]:
-    preds: Dict[str, int] = {}
-    with _open_text(path) as fh:
-        for raw in fh:
-            line = raw.strip()
-            if not line or line.startswith("#"):
-                continue
-            parts = line.split("\t")
-            if len(parts) < 2:
-                continue
-            read_id = parts[0]
-            ref_id = parts[1] if len(parts) > 1 else None
-            if parts[0].startswith("H") and len(parts) >= 3:
-                read_id = parts[1]
-                ref_id = parts[2]
-            taxid = None
-            if ref_id and file_to_taxid:
-                taxid = file_to_taxid.get(ref_id)
-            if taxid is None and ref_id and ref_id.isdigit():
-                taxid = int(ref_id)
-            if taxid is None:
-                tokens = parts[2:] if len(parts) > 2 else parts[1:]
-                for tok in tokens:
-                    tok = tok.split(":", 1)[0]
-                    if tok.isdigit():
-                        taxid = int(tok)
-                        break
-            if read_id and taxid is not None:
-                preds[read_id] = taxid
-    return preds
+def parse_ganon_one(
+    path: Path,
+    file_to_taxid: Dict[str, int] | None = None,
+    keep: ReadFilter | None = None,
+) -> Dict[str, int | None]:
+    return load_native_predictions("ganon_one", path, file_to_taxid, keep)
 
 
 def parse_truth_profile(path: Path) -> Dict[str, float]:
@@ -469,6 +503,7 @@ def load_species_label_mapping(
     name_to_taxid: Dict[str, int],
     syn_to_sci: Dict[str, str],
     sci_names: set[str],
+    keep: ReadFilter | None = None,
 ) -> tuple[Dict[str, int], Dict[int, int], Dict[str, int], int, int]:
     truth_map: Dict[str, int] = {}
     abundance: Dict[int, int] = {}
@@ -503,6 +538,8 @@ def load_species_label_mapping(
                 species_name = parts[name_idx].strip()
                 if not read_id or not species_name:
                     continue
+                if keep is not None and not keep(read_id):
+                    continue
                 taxid = taxid_for_name(species_name, name_to_taxid, syn_to_sci, sci_names)
                 if taxid is None:
                     unmapped.add(species_name)
@@ -535,14 +572,14 @@ def _candidate_genome_ids(raw: str) -> list[str]:
         if base.endswith(ext):
             candidates.append(base[: -len(ext)])
             break
-    match = re.search(r"(GCF|GCA)_\d+\.\d+", base)
-    if match:
-        candidates.append(match.group(0))
+    accession = accession_from_name(base)
+    if accession:
+        candidates.append(accession)
     return candidates
 
 
 def parse_sylph_profile(
-    path: Path, file_to_taxid: Dict[str, int]
+    path: Path, file_to_taxid: Dict[str, int], accession_to_taxid: Dict[str, int] | None = None
 ) -> tuple[Dict[int, float], float, int]:
     entries: Dict[int, float] = {}
     unmapped_mass = 0.0
@@ -581,6 +618,10 @@ def parse_sylph_profile(
                 taxid = file_to_taxid.get(candidate)
                 if taxid is not None:
                     break
+            if taxid is None and accession_to_taxid:
+                accession = accession_from_name(genome)
+                if accession:
+                    taxid = accession_to_taxid.get(accession)
             if taxid is None:
                 unmapped_mass += value
                 unmapped_count += 1
@@ -716,7 +757,7 @@ def map_taxid_profile_to_rank(
     return mapped_by_rank, full_by_rank
 
 
-def load_cami_mapping(paths: Iterable[Path]):
+def load_cami_mapping(paths: Iterable[Path], keep: ReadFilter | None = None):
     truth_map: Dict[str, int] = {}
     abundance: Dict[int, int] = {}
     contig_weight: Dict[str, int] = {}
@@ -730,6 +771,8 @@ def load_cami_mapping(paths: Iterable[Path]):
                 if len(parts) < 4:
                     continue
                 contig_id = parts[0]
+                if keep is not None and not keep(contig_id):
+                    continue
                 try:
                     taxid = int(parts[2])
                 except ValueError:
@@ -804,67 +847,69 @@ def _select_most_specific_profile(profile_by_rank: Dict[str, Dict[int, float]])
     return {}
 
 
-def _taxid_depth(
-    taxid: int,
+def compute_weighted_unifrac(
+    truth: Dict[int, float],
+    preds: Dict[int, float],
     taxonomy: Dict[int, Tuple[int, str]],
-    cache: Dict[int, int],
-) -> int | None:
-    if taxid in cache:
-        return cache[taxid]
-    info = taxonomy.get(taxid)
-    if info is None:
-        return None
-    parent, _rank = info
-    if parent == taxid or parent not in taxonomy:
-        cache[taxid] = 0
-        return 0
-    parent_depth = _taxid_depth(parent, taxonomy, cache)
-    if parent_depth is None:
-        return None
-    cache[taxid] = parent_depth + 1
-    return cache[taxid]
+) -> float:
+    return weighted_unifrac_matrix([truth, preds], taxonomy, [(0, 1)])[(0, 1)]
 
 
-def _accumulate_tree_masses(
-    profile: Dict[int, float],
+def profile_bootstrap_intervals(
+    truth_by_rank: Dict[str, Dict[TaxKey, float]],
+    pred_by_rank: Dict[str, Dict[TaxKey, float]],
+    ranks: Iterable[str],
     taxonomy: Dict[int, Tuple[int, str]],
-) -> Dict[int, float]:
-    masses: Dict[int, float] = {}
-    for taxid, value in _normalize_profile(profile).items():
-        current = taxid
-        seen = set()
-        while current not in seen:
-            info = taxonomy.get(current)
-            if info is None:
-                break
-            masses[current] = masses.get(current, 0.0) + value
-            seen.add(current)
-            parent, _rank = info
-            if parent == current:
-                break
-            current = parent
-    return masses
+    truth_taxid_profile: Dict[int, float] | None = None,
+    pred_taxid_profile: Dict[int, float] | None = None,
+    *,
+    replicates: int = DEFAULT_REPLICATES,
+    seed: int = 0,
+    alpha: float = DEFAULT_ALPHA,
+) -> Dict[str, float]:
+    """Poisson bootstrap over taxa for OPAL metrics and weighted UniFrac.
 
+    Each replicate gives every taxid a Poisson(1) weight, applied to its truth and predicted
+    abundance alike, and recomputes the metrics on the reweighted profiles.
+    """
+    ranks = tuple(ranks)
+    rng = random.Random(seed)
+    truth_vecs = {
+        rank: {k: float(v) for k, v in (truth_by_rank.get(rank) or {}).items() if isinstance(k, int) and v > 0}
+        for rank in ranks
+    }
+    pred_vecs = {
+        rank: {k: float(v) for k, v in (pred_by_rank.get(rank) or {}).items() if isinstance(k, int) and v > 0}
+        for rank in ranks
+    }
+    truth_taxid_profile = truth_taxid_profile or {}
+    pred_taxid_profile = pred_taxid_profile or {}
+    with_unifrac = bool(truth_taxid_profile or pred_taxid_profile)
+    compiled = compile_taxonomy(taxonomy, set(truth_taxid_profile) | set(pred_taxid_profile))
 
-def compute_weighted_unifrac(
-    truth: Dict[int, float],
-    preds: Dict[int, float],
-    taxonomy: Dict[int, Tuple[int, str]],
-) -> float:
-    truth_mass = _accumulate_tree_masses(truth, taxonomy)
-    pred_mass = _accumulate_tree_masses(preds, taxonomy)
-    if not truth_mass and not pred_mass:
-        return 0.0
-
-    depth_cache: Dict[int, int] = {}
-    total = 0.0
-    for taxid in set(truth_mass) | set(pred_mass):
-        depth = _taxid_depth(taxid, taxonomy, depth_cache)
-        if depth is None or depth <= 0:
-            continue
-        branch_length = 1.0 / depth
-        total += branch_length * abs(truth_mass.get(taxid, 0.0) - pred_mass.get(taxid, 0.0))
-    return total
+    taxa: set[int] = set(truth_taxid_profile) | set(pred_taxid_profile)
+    for rank in ranks:
+        taxa.update(truth_vecs[rank])
+        taxa.update(pred_vecs[rank])
+    taxa_order = sorted(taxa)
+
+    samples: Dict[str, List[float]] = {}
+    for _ in range(replicates):
+        weights = {taxid: poisson_one(rng) for taxid in taxa_order}
+        truth_rw = {rank: {k: v * weights[k] for k, v in vec.items()} for rank, vec in truth_vecs.items()}
+        pred_rw = {rank: {k: v * weights[k] for k, v in vec.items()} for rank, vec in pred_vecs.items()}
+        replicate = compute_opal_profile_metrics(truth_rw, pred_rw, ranks)
+        if with_unifrac:
+            truth_mass = compiled.subtree_masses(
+                compiled.sparse_vector({k: v * weights[k] for k, v in truth_taxid_profile.items()})
+            )
+            pred_mass = compiled.subtree_masses(
+                compiled.sparse_vector({k: v * weights[k] for k, v in pred_taxid_profile.items()})
+            )
+            replicate["weighted_unifrac"] = unifrac_distance(truth_mass, pred_mass, compiled.branch_length)
+        for key, value in replicate.items():
+            samples.setdefault(key, []).append(value)
+    return intervals_from_replicates(samples, alpha)
 
 
 def compute_per_read_metrics(
@@ -974,87 +1019,146 @@ def compute_per_read_metrics_exact(
     return metrics
 
 
-def compute_per_read_metrics_combined(
-    truth: Dict[str, int],
-    preds: Dict[str, int | None],
+def rank_lineage(
+    taxid: int,
     taxonomy: Dict[int, Tuple[int, str]],
     ranks: Iterable[str],
-    covered_by_rank: Dict[str, set[int]] | None = None,
-):
+) -> tuple[tuple[int | None, ...], frozenset[int]]:
+    """Resolve one taxid to every requested rank with a single walk to the root.
+
+    Returns the per-rank ancestors (same semantics as `taxid_to_rank`) and the set of
+    taxids visited on the way up (same semantics as `is_descendant`).
+    """
     ranks = tuple(ranks)
-    metrics: Dict[str, float] = {}
-    total = len(truth)
-    classified = 0
-    rank_cache: Dict[tuple[int | None, str], int | None] = {}
-    descendant_cache: Dict[tuple[int | None, int], bool] = {}
-
-    def cached_rank(taxid: int | None, rank: str) -> int | None:
-        key = (taxid, rank)
-        if key not in rank_cache:
-            rank_cache[key] = taxid_to_rank(taxid, rank, taxonomy)
-        return rank_cache[key]
-
-    def cached_descendant(taxid: int | None, ancestor: int) -> bool:
-        key = (taxid, ancestor)
-        if key not in descendant_cache:
-            descendant_cache[key] = is_descendant(taxid, ancestor, taxonomy)
-        return descendant_cache[key]
-
-    desc_counts = {
-        rank: {"tp": 0, "fp": 0, "fn": 0, "truth_mapped": 0, "pred_mapped": 0}
-        for rank in ranks
-    }
-    exact_counts = {
-        rank: {"tp": 0, "fp": 0, "fn": 0, "truth_mapped": 0, "pred_mapped": 0}
-        for rank in ranks
-    }
+    wanted = {rank: idx for idx, rank in enumerate(ranks)}
+    mapped: list[int | None] = [None] * len(ranks)
+    visited: set[int] = set()
+    current = taxid
+    while current not in visited:
+        visited.add(current)
+        info = taxonomy.get(current)
+        if info is None:
+            break
+        parent, cur_rank = info
+        idx = wanted.get(cur_rank)
+        if idx is not None and mapped[idx] is None:
+            mapped[idx] = current
+        if parent == current:
+            break
+        current = parent
+    return tuple(mapped), frozenset(visited)
+
 
+def build_lineage_table(
+    taxids: Iterable[int | None],
+    taxonomy: Dict[int, Tuple[int, str]],
+    ranks: Iterable[str],
+) -> Dict[int, tuple[tuple[int | None, ...], frozenset[int]]]:
+    ranks = tuple(ranks)
+    table: Dict[int, tuple[tuple[int | None, ...], frozenset[int]]] = {}
+    for taxid in taxids:
+        if taxid is None or taxid in table:
+            continue
+        table[taxid] = rank_lineage(taxid, taxonomy, ranks)
+    return table
+
+
+def collect_read_pairs(
+    truth: Dict[str, int],
+    preds: Dict[str, int | None],
+) -> Dict[tuple[int, int | None], int]:
+    """Collapse per-read truth/prediction into `(true_taxid, pred_taxid) -> reads` counts."""
+    pairs: Dict[tuple[int, int | None], int] = {}
     for read_id, true_taxid in truth.items():
-        pred_taxid = _prediction_for_read(preds, read_id, truth)
-        if pred_taxid is not None:
-            classified += 1
-        for rank in ranks:
-            covered = covered_by_rank.get(rank) if covered_by_rank is not None else None
-            true_rank = cached_rank(true_taxid, rank)
-            true_is_mapped = true_rank is not None and (covered is None or true_rank in covered)
+        key = (true_taxid, _prediction_for_read(preds, read_id, truth))
+        pairs[key] = pairs.get(key, 0) + 1
+    return pairs
 
-            pred_rank = cached_rank(pred_taxid, rank) if pred_taxid is not None else None
-            pred_is_mapped = pred_rank is not None and (covered is None or pred_rank in covered)
-            if pred_is_mapped:
-                exact_counts[rank]["pred_mapped"] += 1
 
+def _empty_read_counts() -> Dict[str, int]:
+    return {"tp": 0, "fp": 0, "fn": 0, "truth_mapped": 0, "pred_mapped": 0}
+
+
+def tally_read_pairs(
+    pairs: Dict[tuple[int, int | None], int],
+    taxonomy: Dict[int, Tuple[int, str]],
+    ranks: Iterable[str],
+    covered_by_rank: Dict[str, set[int]] | None = None,
+    confusion_by_rank: Dict[str, Dict[tuple[int, int], int]] | None = None,
+) -> tuple[Dict[str, Dict[str, int]], Dict[str, Dict[str, int]]]:
+    """Count descendant-aware and exact outcomes for all ranks in one pass over read pairs.
+
+    Truth and prediction taxids are resolved once into a taxid x rank lineage table, so the
+    per-rank work is proportional to the number of distinct pairs, not the number of reads.
+    When `confusion_by_rank` is given, it is filled with exact `(true, pred) -> reads` counts
+    for truth-mapped reads; unassigned predictions use taxid 0.
+    """
+    ranks = tuple(ranks)
+    lineages = build_lineage_table(
+        (taxid for pair in pairs for taxid in pair),
+        taxonomy,
+        ranks,
+    )
+    covered = [covered_by_rank.get(rank) if covered_by_rank is not None else None for rank in ranks]
+    desc_counts = {rank: _empty_read_counts() for rank in ranks}
+    exact_counts = {rank: _empty_read_counts() for rank in ranks}
+    no_lineage: tuple[tuple[int | None, ...], frozenset[int]] = ((None,) * len(ranks), frozenset())
+    confusion = None
+    if confusion_by_rank is not None:
+        confusion = [confusion_by_rank.setdefault(rank, {}) for rank in ranks]
+
+    for (true_taxid, pred_taxid), reads in pairs.items():
+        true_lineage, _true_visited = lineages.get(true_taxid, no_lineage)
+        if pred_taxid is None:
+            pred_lineage, pred_visited = no_lineage
+        else:
+            pred_lineage, pred_visited = lineages[pred_taxid]
+        for idx, rank in enumerate(ranks):
+            rank_covered = covered[idx]
+            true_rank = true_lineage[idx]
+            true_is_mapped = true_rank is not None and (rank_covered is None or true_rank in rank_covered)
+            pred_rank = pred_lineage[idx]
+            pred_is_mapped = pred_rank is not None and (rank_covered is None or pred_rank in rank_covered)
+            exact = exact_counts[rank]
+            if pred_is_mapped:
+                exact["pred_mapped"] += reads
             if not true_is_mapped:
                 continue
 
             desc = desc_counts[rank]
-            exact = exact_counts[rank]
-            desc["truth_mapped"] += 1
-            exact["truth_mapped"] += 1
-
-            if pred_taxid is not None:
-                desc["pred_mapped"] += 1
-
+            desc["truth_mapped"] += reads
+            exact["truth_mapped"] += reads
+            if confusion is not None:
+                cell = (true_rank, pred_rank if pred_is_mapped else 0)
+                confusion[idx][cell] = confusion[idx].get(cell, 0) + reads
             if pred_taxid is None:
-                desc["fn"] += 1
-                exact["fn"] += 1
+                desc["fn"] += reads
+                exact["fn"] += reads
                 continue
+            desc["pred_mapped"] += reads
 
-            if true_rank is not None and cached_descendant(pred_taxid, true_rank):
-                desc["tp"] += 1
+            if true_rank in pred_visited:
+                desc["tp"] += reads
             else:
-                desc["fp"] += 1
-                desc["fn"] += 1
+                desc["fp"] += reads
+                desc["fn"] += reads
 
-            if not pred_is_mapped:
-                exact["fp"] += 1
-                exact["fn"] += 1
-                continue
-            if pred_rank is not None and true_rank is not None and pred_rank == true_rank:
-                exact["tp"] += 1
+            if pred_is_mapped and pred_rank == true_rank:
+                exact["tp"] += reads
             else:
-                exact["fp"] += 1
-                exact["fn"] += 1
+                exact["fp"] += reads
+                exact["fn"] += reads
+    return desc_counts, exact_counts
 
+
+def per_read_metrics_from_counts(
+    desc_counts: Dict[str, Dict[str, int]],
+    exact_counts: Dict[str, Dict[str, int]],
+    *,
+    total: int,
+    classified: int,
+) -> Dict[str, float]:
+    metrics: Dict[str, float] = {}
     if total > 0:
         classified_rate = classified / total
         unclassified_rate = (total - classified) / total
@@ -1063,55 +1167,293 @@ def compute_per_read_metrics_combined(
         metrics["exact_per_read_classified_rate"] = classified_rate
         metrics["exact_per_read_unclassified_rate"] = unclassified_rate
 
-    for rank in ranks:
-        desc = desc_counts[rank]
-        if total > 0:
-            metrics[f"per_read_truth_mapped_rate_{rank}"] = desc["truth_mapped"] / total
-            metrics[f"per_read_pred_mapped_rate_{rank}"] = desc["pred_mapped"] / total
-        if desc["truth_mapped"] > 0:
-            precision, recall, f1 = _safe_prf(desc["tp"], desc["fp"], desc["fn"])
-            metrics[f"per_read_precision_{rank}"] = precision
-            metrics[f"per_read_recall_{rank}"] = recall
-            metrics[f"per_read_f1_{rank}"] = f1
+    for rank in desc_counts:
+        for prefix, counts in (("", desc_counts[rank]), ("exact_", exact_counts[rank])):
+            if total > 0:
+                metrics[f"{prefix}per_read_truth_mapped_rate_{rank}"] = counts["truth_mapped"] / total
+                metrics[f"{prefix}per_read_pred_mapped_rate_{rank}"] = counts["pred_mapped"] / total
+            if counts["truth_mapped"] > 0:
+                precision, recall, f1 = _safe_prf(counts["tp"], counts["fp"], counts["fn"])
+                metrics[f"{prefix}per_read_precision_{rank}"] = precision
+                metrics[f"{prefix}per_read_recall_{rank}"] = recall
+                metrics[f"{prefix}per_read_f1_{rank}"] = f1
+    return metrics
 
-        exact = exact_counts[rank]
-        if total > 0:
-            metrics[f"exact_per_read_truth_mapped_rate_{rank}"] = exact["truth_mapped"] / total
-            metrics[f"exact_per_read_pred_mapped_rate_{rank}"] = exact["pred_mapped"] / total
-        if exact["truth_mapped"] > 0:
-            precision, recall, f1 = _safe_prf(exact["tp"], exact["fp"], exact["fn"])
-            metrics[f"exact_per_read_precision_{rank}"] = precision
-            metrics[f"exact_per_read_recall_{rank}"] = recall
-            metrics[f"exact_per_read_f1_{rank}"] = f1
+
+def _wilson_interval(successes: int, trials: int, z: float) -> tuple[float, float]:
+    if trials <= 0:
+        return 0.0, 0.0
+    p = successes / trials
+    denom = 1 + z * z / trials
+    center = (p + z * z / (2 * trials)) / denom
+    half = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denom
+    return max(0.0, center - half), min(1.0, center + half)
+
+
+def _f1_interval(tp: int, wrong: int, truth_mapped: int, z: float) -> tuple[float, float]:
+    # Every truth-mapped read is tp, wrong (fp + fn) or unassigned (fn), so with multinomial
+    # proportions a, w: F1 = 2a / (1 + a + w). The interval uses the delta method on (a, w).
+    if truth_mapped <= 0:
+        return 0.0, 0.0
+    a = tp / truth_mapped
+    w = wrong / truth_mapped
+    denom = 1 + a + w
+    f1 = 2 * a / denom
+    grad_a = 2 * (1 + w) / (denom * denom)
+    grad_w = -2 * a / (denom * denom)
+    variance = (
+        grad_a * grad_a * a * (1 - a)
+        + grad_w * grad_w * w * (1 - w)
+        - 2 * grad_a * grad_w * a * w
+    ) / truth_mapped
+    half = z * math.sqrt(max(variance, 0.0))
+    return max(0.0, f1 - half), min(1.0, f1 + half)
+
+
+def per_read_confidence_intervals(
+    desc_counts: Dict[str, Dict[str, int]],
+    exact_counts: Dict[str, Dict[str, int]],
+    z: float = 1.96,
+) -> Dict[str, float]:
+    """Analytic intervals for subsampled per-read metrics (Wilson for precision/recall)."""
+    metrics: Dict[str, float] = {}
+    for rank in desc_counts:
+        for prefix, counts in (("", desc_counts[rank]), ("exact_", exact_counts[rank])):
+            if counts["truth_mapped"] <= 0:
+                continue
+            tp = counts["tp"]
+            intervals = {
+                "precision": _wilson_interval(tp, tp + counts["fp"], z),
+                "recall": _wilson_interval(tp, tp + counts["fn"], z),
+                "f1": _f1_interval(tp, counts["fp"], counts["truth_mapped"], z),
+            }
+            for name, (low, high) in intervals.items():
+                metrics[f"{prefix}per_read_{name}_{rank}_ci_low"] = low
+                metrics[f"{prefix}per_read_{name}_{rank}_ci_high"] = high
     return metrics
 
 
+def per_read_bootstrap_intervals(
+    desc_counts: Dict[str, Dict[str, int]],
+    exact_counts: Dict[str, Dict[str, int]],
+    *,
+    replicates: int = DEFAULT_REPLICATES,
+    seed: int = 0,
+    alpha: float = DEFAULT_ALPHA,
+) -> Dict[str, float]:
+    """Percentile bootstrap over reads, drawn as multinomial (tp, wrong, unassigned) counts per rank.
+
+    Resampling the outcome counts is equivalent to resampling truth-mapped reads, but each
+    replicate costs two binomial draws instead of a pass over the reads.
+    """
+    rng = random.Random(seed)
+    samples: Dict[str, List[float]] = {}
+    for rank in desc_counts:
+        for prefix, counts in (("", desc_counts[rank]), ("exact_", exact_counts[rank])):
+            n = counts["truth_mapped"]
+            if n <= 0:
+                continue
+            wrong = counts["fp"]
+            probs = (counts["tp"] / n, wrong / n, (counts["fn"] - wrong) / n)
+            precision_key = f"{prefix}per_read_precision_{rank}"
+            recall_key = f"{prefix}per_read_recall_{rank}"
+            f1_key = f"{prefix}per_read_f1_{rank}"
+            for key in (precision_key, recall_key, f1_key):
+                samples[key] = []
+            for _ in range(replicates):
+                tp, wrong_draw, unassigned = multinomial(rng, n, probs)
+                precision, recall, f1 = _safe_prf(tp, wrong_draw, wrong_draw + unassigned)
+                samples[precision_key].append(precision)
+                samples[recall_key].append(recall)
+                samples[f1_key].append(f1)
+    return intervals_from_replicates(samples, alpha)
+
+
+def compute_per_read_metrics_combined(
+    truth: Dict[str, int],
+    preds: Dict[str, int | None],
+    taxonomy: Dict[int, Tuple[int, str]],
+    ranks: Iterable[str],
+    covered_by_rank: Dict[str, set[int]] | None = None,
+    confusion_by_rank: Dict[str, Dict[tuple[int, int], int]] | None = None,
+    *,
+    with_intervals: bool = False,
+    bootstrap: int = 0,
+    bootstrap_seed: int = 0,
+):
+    pairs = collect_read_pairs(truth, preds)
+    desc_counts, exact_counts = tally_read_pairs(
+        pairs,
+        taxonomy,
+        ranks,
+        covered_by_rank,
+        confusion_by_rank,
+    )
+    classified = sum(reads for (_true, pred), reads in pairs.items() if pred is not None)
+    metrics = per_read_metrics_from_counts(desc_counts, exact_counts, total=len(truth), classified=classified)
+    if with_intervals:
+        metrics.update(per_read_confidence_intervals(desc_counts, exact_counts))
+    if bootstrap > 0:
+        metrics.update(
+            per_read_bootstrap_intervals(
+                desc_counts,
+                exact_counts,
+                replicates=bootstrap,
+                seed=bootstrap_seed,
+            )
+        )
+    return metrics
+
+
+def _truth_taxids_for(read_id: str, truth: Dict[str, int]) -> Iterable[int]:
+    """Truth taxids of a streamed prediction id: the read itself or its `/1`/`/2` mates."""
+    for truth_id in (read_id, f"{read_id}/1", f"{read_id}/2"):
+        true_taxid = truth.get(truth_id)
+        if true_taxid is not None:
+            yield true_taxid
+
+
+def _add_missing_truth(
+    pairs: Dict[tuple[int, int | None], int],
+    truth_counts: Dict[int, int],
+    matched: Dict[int, int],
+) -> None:
+    for true_taxid, count in truth_counts.items():
+        missing = count - matched.get(true_taxid, 0)
+        if missing > 0:
+            pairs[(true_taxid, None)] = pairs.get((true_taxid, None), 0) + missing
+
+
+def _truth_counts(truth: Dict[str, int]) -> Dict[int, int]:
+    counts: Dict[int, int] = {}
+    for true_taxid in truth.values():
+        counts[true_taxid] = counts.get(true_taxid, 0) + 1
+    return counts
+
+
+def compare_multi_hit_policies(
+    groups: Iterable[tuple[str, List[int | None]]],
+    truth: Dict[str, int],
+    taxonomy: Dict[int, Tuple[int, str]],
+    ranks: Iterable[str],
+    policies: Iterable[str] = MULTI_HIT_POLICIES,
+    covered_by_rank: Dict[str, set[int]] | None = None,
+) -> Dict[str, float]:
+    """Per-read metrics under each multi-hit policy from one streamed pass over hit groups.
+
+    Only `(true, pred) -> reads` counts are kept per policy. A prediction id matches a truth read
+    directly or through its `/1`/`/2` mates; the mate-agreement fallback of
+    `_prediction_for_read` is not applied.
+    """
+    ranks = tuple(ranks)
+    policies = tuple(policies)
+    pairs: List[Dict[tuple[int, int | None], int]] = [{} for _ in policies]
+    matched: Dict[int, int] = {}
+    multi_hit_reads = 0
+
+    def _counted(stream):
+        nonlocal multi_hit_reads
+        for read_id, hits in stream:
+            if len({taxid for taxid in hits if taxid is not None}) > 1:
+                multi_hit_reads += 1
+            yield read_id, hits
+
+    for read_id, assigned in resolve_groups(_counted(groups), policies, taxonomy):
+        for true_taxid in _truth_taxids_for(read_id, truth):
+            matched[true_taxid] = matched.get(true_taxid, 0) + 1
+            for bucket, pred_taxid in zip(pairs, assigned):
+                key = (true_taxid, pred_taxid)
+                bucket[key] = bucket.get(key, 0) + 1
+
+    truth_counts = _truth_counts(truth)
+    metrics: Dict[str, float] = {"multi_hit_reads": multi_hit_reads}
+    for policy, bucket in zip(policies, pairs):
+        _add_missing_truth(bucket, truth_counts, matched)
+        desc_counts, exact_counts = tally_read_pairs(bucket, taxonomy, ranks, covered_by_rank)
+        classified = sum(reads for (_true, pred), reads in bucket.items() if pred is not None)
+        policy_metrics = per_read_metrics_from_counts(
+            desc_counts, exact_counts, total=len(truth), classified=classified
+        )
+        metrics.update({f"multi_hit_{policy}_{key}": value for key, value in policy_metrics.items()})
+    return metrics
+
+
+def threshold_sweep(
+    ladders: Iterable[tuple[str, List[tuple[int, float]]]],
+    truth: Dict[str, int],
+    taxonomy: Dict[int, Tuple[int, str]],
+    ranks: Iterable[str],
+    thresholds: Iterable[float],
+    covered_by_rank: Dict[str, set[int]] | None = None,
+) -> List[Dict[str, float]]:
+    """Per-read precision/recall/F1 at every threshold from one pass over scored predictions.
+
+    Each read contributes its assignment to a contiguous range of thresholds (see
+    `readers.ScoreLadder`), stored as a difference array per `(true, pred)` pair, so the cost is
+    one pass over reads plus one tally per threshold. Returns one row per threshold and rank.
+    """
+    ranks = tuple(ranks)
+    thresholds = sorted(float(t) for t in thresholds)
+    size = len(thresholds)
+    diffs: Dict[tuple[int, int], List[int]] = {}
+    for read_id, ladder in ladders:
+        true_taxids = list(_truth_taxids_for(normalize_read_id(read_id), truth))
+        if not true_taxids:
+            continue
+        start = 0
+        for pred_taxid, score in ladder:
+            stop = bisect_right(thresholds, score)
+            if stop > start:
+                for true_taxid in true_taxids:
+                    diff = diffs.get((true_taxid, pred_taxid))
+                    if diff is None:
+                        diff = diffs[(true_taxid, pred_taxid)] = [0] * (size + 1)
+                    diff[start] += 1
+                    diff[stop] -= 1
+                start = stop
+            if start >= size:
+                break
+
+    truth_counts = _truth_counts(truth)
+    running = {key: 0 for key in diffs}
+    rows: List[Dict[str, float]] = []
+    for idx, threshold in enumerate(thresholds):
+        pairs: Dict[tuple[int, int | None], int] = {}
+        assigned: Dict[int, int] = {}
+        for key, diff in diffs.items():
+            running[key] += diff[idx]
+            if running[key]:
+                pairs[key] = running[key]
+                assigned[key[0]] = assigned.get(key[0], 0) + running[key]
+        classified = sum(assigned.values())
+        for true_taxid, count in truth_counts.items():
+            missing = count - assigned.get(true_taxid, 0)
+            if missing > 0:
+                pairs[(true_taxid, None)] = missing
+        desc_counts, exact_counts = tally_read_pairs(pairs, taxonomy, ranks, covered_by_rank)
+        for rank in ranks:
+            row: Dict[str, float] = {"rank": rank, "threshold": threshold}
+            for prefix, counts in (("", desc_counts[rank]), ("exact_", exact_counts[rank])):
+                precision, recall, f1 = _safe_prf(counts["tp"], counts["fp"], counts["fn"])
+                row[f"{prefix}precision"] = precision
+                row[f"{prefix}recall"] = recall
+                row[f"{prefix}f1"] = f1
+            row["classified_rate"] = classified / len(truth) if truth else 0.0
+            rows.append(row)
+    return rows
+
+
 def compute_opal_profile_metrics(
     truth: Dict[str, Dict[TaxKey, float]],
     preds: Dict[str, Dict[TaxKey, float]],
     ranks: Iterable[str],
 ):
-    metrics: Dict[str, float] = {}
-    for rank in ranks:
-        truth_rank = truth.get(rank)
-        pred_rank = preds.get(rank)
-        if not truth_rank and not pred_rank:
-            continue
-        truth_vec = {k: float(v) for k, v in (truth_rank or {}).items() if isinstance(k, int) and v > 0}
-        pred_vec = {k: float(v) for k, v in (pred_rank or {}).items() if isinstance(k, int) and v > 0}
-        truth_rel = _normalize_profile(truth_vec)
-        pred_rel = _normalize_profile(pred_vec)
-        keys = set(truth_rel) | set(pred_rel)
-        metrics[f"l1_norm_{rank}"] = sum(abs(pred_rel.get(k, 0.0) - truth_rel.get(k, 0.0)) for k in keys)
-
-        tp = len(set(truth_rel) & set(pred_rel))
-        fp = len(set(pred_rel) - set(truth_rel))
-        fn = len(set(truth_rel) - set(pred_rel))
-        purity = tp / (tp + fp) if (tp + fp) > 0 else 0.0
-        completeness = tp / (tp + fn) if (tp + fn) > 0 else 0.0
-        metrics[f"purity_{rank}"] = purity
-        metrics[f"completeness_{rank}"] = completeness
-    return metrics
+    ranks = [rank for rank in ranks if truth.get(rank) or preds.get(rank)]
+    if not ranks:
+        return {}
+    truth_matrix = {rank: ProfileMatrix.from_rows(["sample"], [truth.get(rank) or {}]) for rank in ranks}
+    pred_matrix = {rank: ProfileMatrix.from_rows(["sample"], [preds.get(rank) or {}]) for rank in ranks}
+    return batch_profile_metrics(truth_matrix, pred_matrix, ranks, require_ranks=True)[0]
 
 
 def map_named_profile_to_taxids(
@@ -1215,6 +1557,23 @@ def _resolve_coverage_target(exp: dict) -> Path | None:
     return None
 
 
+def _reference_accession_taxids(exp: dict) -> Dict[str, int]:
+    """`{accession: taxid}` from the coverage target TSV through the persistent reference index."""
+    index_path = exp.get("reference_index")
+    target = _resolve_coverage_target(exp)
+    if not index_path or target is None:
+        return {}
+    with ReferenceIndex(Path(index_path)) as index:
+        mapping = index.accession_map(index.ensure(target, sizes=False), "taxid")
+    accession_to_taxid: Dict[str, int] = {}
+    for accession, taxid in mapping.items():
+        try:
+            accession_to_taxid[accession] = int(taxid)
+        except ValueError:
+            continue
+    return accession_to_taxid
+
+
 def _resolve_mapping_paths(dataset: dict) -> list[Path]:
     direct = dataset.get("truth_map") or dataset.get("truth_mapping") or dataset.get("truth_maps")
     if direct:
@@ -1284,8 +1643,29 @@ def evaluate_with_truth(
     *,
     include_per_read: bool = True,
     include_profile: bool = True,
+    confusion_by_rank: Dict[str, Dict[tuple[int, int], int]] | None = None,
+    profile_vectors: Dict[str, Dict[str, Dict[TaxKey, float]]] | None = None,
+    pr_curve: List[Dict[str, float]] | None = None,
 ) -> Dict[str, float]:
     ranks = tuple(exp.get("ranks", RANKS_DEFAULT))
+    per_read_ranks = tuple(
+        dict.fromkeys((*ranks, *exp.get("per_read_ranks", PER_READ_RANKS_DEFAULT)))
+    )
+    keep = read_sampler(exp.get("approx_fraction"))
+    bootstrap = exp.get("bootstrap") or 0
+    if bootstrap is True:
+        bootstrap = DEFAULT_REPLICATES
+    bootstrap = int(bootstrap)
+    bootstrap_seed = int(exp.get("bootstrap_seed", 0))
+    multi_hit_policy = exp.get("multi_hit_policy", "first")
+    if multi_hit_policy not in MULTI_HIT_POLICIES:
+        raise ValueError(f"unsupported multi_hit_policy: {multi_hit_policy}")
+    multi_hit_compare = exp.get("multi_hit_compare") or ()
+    if multi_hit_compare is True:
+        multi_hit_compare = MULTI_HIT_POLICIES
+    if keep is not None:
+        # Profiles are not subsampled consistently with reads, so approximate mode is per-read only.
+        include_profile = False
     taxonomy_path = _resolve_taxonomy(exp)
     if taxonomy_path is None:
         return {}
@@ -1300,7 +1680,7 @@ def evaluate_with_truth(
     if use_coverage_filter:
         target_tsv = _resolve_coverage_target(exp)
         if target_tsv is not None:
-            covered_by_rank = build_coverage_sets(target_tsv, taxonomy, ranks)
+            covered_by_rank = build_coverage_sets(target_tsv, taxonomy, per_read_ranks)
 
     names_path = _resolve_names_path(exp, nodes_path)
     name_to_taxid: Dict[str, int] = {}
@@ -1333,17 +1713,20 @@ def evaluate_with_truth(
                 name_to_taxid,
                 syn_to_sci,
                 sci_names,
+                keep,
             )
             metrics["truth_map_species_label_mapped_rows"] = len(truth_reads)
             metrics["truth_map_species_label_unmapped_rows"] = unmapped_rows
             metrics["truth_map_species_label_unmapped_names"] = unmapped_names
         elif truth_format == "cami":
-            truth_reads, truth_abundance, contig_weight = load_cami_mapping(mapping_paths)
+            truth_reads, truth_abundance, contig_weight = load_cami_mapping(mapping_paths, keep)
         else:
             raise ValueError(f"unsupported truth_map_format: {truth_format}")
 
     classify_path = outputs.get("classify_tsv")
-    classify_one = outputs.get("classify_one")
+    native_source = native_prediction_source(outputs)
+    multi_hit = multi_hit_source(outputs)
+    classify_bin = binary_predictions_path(outputs)
     preds: Dict[str, int | None] | None = None
     preds_loaded = False
 
@@ -1352,25 +1735,97 @@ def evaluate_with_truth(
         if preds_loaded:
             return preds
         preds_loaded = True
+        if multi_hit_policy != "first" and multi_hit is not None and multi_hit[1].exists():
+            # Resolve every hit of a read instead of the first one the converter kept.
+            fmt, path = multi_hit
+            preds = load_native_predictions(
+                fmt,
+                path,
+                file_to_taxid,
+                keep,
+                policy=multi_hit_policy,
+                taxonomy=taxonomy,
+            )
+            return preds
+        if classify_bin is not None:
+            # Memory-mapped and looked up by read-id hash; no parsing needed.
+            preds = BinaryPredictions(classify_bin)
+            return preds
         if classify_path:
             path = Path(classify_path)
             if path.exists():
-                preds = parse_classify_tsv(path)
+                preds = parse_classify_tsv(path, keep)
             else:
                 metrics["classify_tsv_missing"] = 1
             return preds
-        if classify_one:
-            path = Path(classify_one)
+        if native_source is not None:
+            # Raw tool output (ganon `.one`/`.all`, or a tool run with `convert: false`).
+            key, fmt, path = native_source
             if path.exists():
-                preds = parse_ganon_one(path, file_to_taxid)
+                preds = load_native_predictions(fmt, path, file_to_taxid, keep)
             else:
-                metrics["classify_one_missing"] = 1
+                metrics[f"{key}_missing"] = 1
         return preds
 
     if include_per_read and truth_reads:
         preds = _load_preds()
-    if include_per_read and preds is not None and truth_reads:
-        metrics.update(compute_per_read_metrics_combined(truth_reads, preds, taxonomy, ranks, covered_by_rank))
+    try:
+        if include_per_read and preds is not None and truth_reads:
+            metrics.update(
+                compute_per_read_metrics_combined(
+                    truth_reads,
+                    preds,
+                    taxonomy,
+                    per_read_ranks,
+                    covered_by_rank,
+                    confusion_by_rank,
+                    with_intervals=keep is not None,
+                    bootstrap=bootstrap,
+                    bootstrap_seed=bootstrap_seed,
+                )
+            )
+    finally:
+        if isinstance(preds, BinaryPredictions):
+            # Release the mmap and file handle; predictions are not used past this point.
+            preds.close()
+    if include_per_read and truth_reads and multi_hit_compare and multi_hit is not None and multi_hit[1].exists():
+        fmt, path = multi_hit
+        metrics.update(
+            compare_multi_hit_policies(
+                iter_hit_groups(fmt, path, file_to_taxid, keep),
+                truth_reads,
+                taxonomy,
+                per_read_ranks,
+                multi_hit_compare,
+                covered_by_rank,
+            )
+        )
+    score_sweep = exp.get("score_sweep")
+    scored = score_source(outputs) if score_sweep else None
+    if include_per_read and truth_reads and scored is not None and scored[1].exists():
+        fmt, path = scored
+        thresholds = SCORE_THRESHOLDS_DEFAULT[fmt] if score_sweep is True else score_sweep
+        rows = threshold_sweep(
+            SCORE_READERS[fmt](path, taxonomy),
+            truth_reads,
+            taxonomy,
+            per_read_ranks,
+            thresholds,
+            covered_by_rank,
+        )
+        for rank in per_read_ranks:
+            best = max((row for row in rows if row["rank"] == rank), key=lambda row: row["f1"], default=None)
+            if best is not None:
+                metrics[f"sweep_best_f1_{rank}"] = best["f1"]
+                metrics[f"sweep_best_threshold_{rank}"] = best["threshold"]
+        if pr_curve is not None:
+            pr_curve.extend(rows)
+    if bootstrap > 0:
+        metrics["bootstrap_replicates"] = bootstrap
+    if keep is not None:
+        metrics["approximate"] = 1
+        metrics["approx_fraction"] = float(exp["approx_fraction"])
+        metrics["approx_truth_reads"] = len(truth_reads)
 
     truth_by_rank: Dict[str, Dict[TaxKey, float]] = {r: {} for r in ranks}
     truth_taxid_profile: Dict[int, float] = {}
@@ -1447,7 +1902,7 @@ def evaluate_with_truth(
             if profile_path.exists():
                 explicit_profile_seen = True
                 pred_taxid_profile, _unmapped_mass, _unmapped_count = parse_sylph_profile(
-                    profile_path, file_to_taxid
+                    profile_path, file_to_taxid, _reference_accession_taxids(exp)
                 )
                 if pred_taxid_profile:
                     _pred_by_rank_mapped, pred_by_rank = map_taxid_profile_to_rank(
@@ -1458,11 +1913,18 @@ def evaluate_with_truth(
                     )
         else:
             cami_profile_path_str = outputs.get("cami_profile_tsv") or outputs.get("taxor_profile_tsv")
+            profile_reader = parse_cami_profile
+            if not cami_profile_path_str:
+                # e.g. Bracken run with `convert: false`: read its TSV directly.
+                native_profile = native_profile_source(outputs)
+                if native_profile is not None:
+                    profile_key, cami_profile_path_str = native_profile
+                    profile_reader = PROFILE_READERS[profile_key]
             if cami_profile_path_str:
                 cami_path = Path(cami_profile_path_str)
                 if cami_path.exists():
                     explicit_profile_seen = True
-                    cami_by_rank = parse_cami_profile(cami_path)
+                    cami_by_rank = profile_reader(cami_path)
                     if cami_by_rank:
                         pred_taxid_profile = _select_most_specific_profile(cami_by_rank)
                         if pred_taxid_profile:
@@ -1506,6 +1968,22 @@ def evaluate_with_truth(
             pred_taxid_profile,
             taxonomy,
         )
+        if profile_vectors is not None:
+            profile_vectors["truth"] = {**truth_by_rank, MOST_SPECIFIC_RANK: dict(truth_taxid_profile)}
+            profile_vectors["pred"] = {**pred_by_rank, MOST_SPECIFIC_RANK: dict(pred_taxid_profile)}
+        if bootstrap > 0:
+            metrics.update(
+                profile_bootstrap_intervals(
+                    truth_by_rank,
+                    pred_by_rank,
+                    ranks,
+                    taxonomy,
+                    truth_taxid_profile,
+                    pred_taxid_profile,
+                    replicates=bootstrap,
+                    seed=bootstrap_seed,
+                )
+            )
         metrics["profile_metric_version"] = METRIC_VERSION
 
     if metrics:
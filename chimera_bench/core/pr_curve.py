@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, List
+
+PR_CURVE_FILENAME = "pr_curve.tsv"
+PR_CURVE_COLUMNS = [
+    "rank",
+    "threshold",
+    "precision",
+    "recall",
+    "f1",
+    "exact_precision",
+    "exact_recall",
+    "exact_f1",
+    "classified_rate",
+]
+
+
+def write_pr_curve(path: Path, rows: List[Dict[str, float]]) -> None:
+    lines = ["\t".join(PR_CURVE_COLUMNS)]
+    for row in rows:
+        lines.append("\t".join(str(row[col]) for col in PR_CURVE_COLUMNS))
+    path.write_text("\n".join(lines) + "\n")
+
+
+def read_pr_curve(path: Path) -> List[Dict[str, float | str]]:
+    rows: List[Dict[str, float | str]] = []
+    with path.open("r", encoding="utf-8") as fh:
+        header = next(fh, "").rstrip("\n").split("\t")
+        for raw in fh:
+            parts = raw.rstrip("\n").split("\t")
+            if len(parts) != len(header):
+                continue
+            rows.append({col: value if col == "rank" else float(value) for col, value in zip(header, parts)})
+    return rows
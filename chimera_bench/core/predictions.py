@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import mmap
+import sys
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Iterator
+
+from ..tools.predbin import (
+    PREDBIN_SUFFIX,
+    UNCLASSIFIED_TAXID,
+    column_offsets,
+    read_header,
+    read_id_hash,
+)
+
+
+class BinaryPredictions(Mapping):
+    """Read-only `read_id -> taxid | None` view over a memory-mapped `.predbin` file.
+
+    Lookups hash the read id and binary-search the sorted hash column, so nothing is parsed
+    up front. Iteration yields hashes, not read ids; evaluation only needs lookups.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        with self.path.open("rb") as fh:
+            self._count, self._flags = read_header(fh)
+        hashes_at, taxids_at, scores_at = column_offsets(self._count, self._flags)
+        self._fh = self.path.open("rb")
+        self._mmap = None
+        self._last_id: str | None = None
+        self._last_pos: int | None = None
+        if self._count == 0:
+            self._hashes: object = array("Q")
+            self._taxids: object = array("I")
+            self._scores: object | None = array("f") if scores_at is not None else None
+            return
+        self._mmap = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+        if sys.byteorder == "little":
+            self._hashes = view[hashes_at:taxids_at].cast("Q")
+            self._taxids = view[taxids_at : taxids_at + 4 * self._count].cast("I")
+            self._scores = view[scores_at : scores_at + 4 * self._count].cast("f") if scores_at is not None else None
+        else:
+            self._hashes = self._swapped("Q", view[hashes_at:taxids_at])
+            self._taxids = self._swapped("I", view[taxids_at : taxids_at + 4 * self._count])
+            self._scores = (
+                self._swapped("f", view[scores_at : scores_at + 4 * self._count]) if scores_at is not None else None
+            )
+
+    @staticmethod
+    def _swapped(typecode: str, raw: memoryview) -> array:
+        values = array(typecode)
+        values.frombytes(raw)
+        values.byteswap()
+        return values
+
+    def _position(self, read_id: str) -> int | None:
+        # `_prediction_for_read` asks `in` and then `[]` for the same id; reuse the last search.
+        if read_id == self._last_id:
+            return self._last_pos
+        key = read_id_hash(read_id)
+        pos = bisect_left(self._hashes, key)
+        found = pos if pos < self._count and self._hashes[pos] == key else None
+        self._last_id = read_id
+        self._last_pos = found
+        return found
+
+    def __getitem__(self, read_id: str) -> int | None:
+        pos = self._position(read_id)
+        if pos is None:
+            raise KeyError(read_id)
+        taxid = self._taxids[pos]
+        return None if taxid == UNCLASSIFIED_TAXID else taxid
+
+    def __contains__(self, read_id: object) -> bool:
+        return isinstance(read_id, str) and self._position(read_id) is not None
+
+    def score(self, read_id: str) -> float | None:
+        if self._scores is None:
+            return None
+        pos = self._position(read_id)
+        if pos is None:
+            return None
+        value = self._scores[pos]
+        return None if value != value else value
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._hashes)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def taxids(self) -> Iterator[int]:
+        return iter(self._taxids)
+
+    def close(self) -> None:
+        for name in ("_hashes", "_taxids", "_scores"):
+            value = getattr(self, name, None)
+            if isinstance(value, memoryview):
+                value.release()
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._fh.close()
+
+
+def binary_predictions_path(outputs: dict) -> Path | None:
+    """Locate a `.predbin` for a run: explicit `classify_bin` output, else a sibling of `classify_tsv`."""
+    explicit = outputs.get("classify_bin")
+    if explicit:
+        path = Path(explicit)
+        return path if path.exists() else None
+    classify_tsv = outputs.get("classify_tsv")
+    if classify_tsv:
+        sibling = Path(classify_tsv).with_suffix(PREDBIN_SUFFIX)
+        if sibling.exists():
+            return sibling
+    return None
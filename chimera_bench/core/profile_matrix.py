@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence, Tuple, Union
+
+from .taxonomy import compile_taxonomy
+from .unifrac import weighted_unifrac_matrix
+
+TaxKey = Union[int, str]
+
+PROFILE_VECTORS_FILENAME = "profile_vectors.tsv"
+# Pseudo-rank holding the most specific taxid profile used for UniFrac.
+MOST_SPECIFIC_RANK = "most_specific"
+
+
+class ProfileMatrix:
+    """Sample x taxon abundances for one rank, stored as CSR arrays over sorted taxid columns."""
+
+    def __init__(
+        self,
+        samples: List[str],
+        taxids: List[int],
+        indptr: array,
+        indices: array,
+        data: array,
+    ) -> None:
+        self.samples = samples
+        self.taxids = taxids
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+
+    @classmethod
+    def from_rows(cls, samples: Sequence[str], rows: Sequence[Dict[TaxKey, float]]) -> "ProfileMatrix":
+        """Build from per-sample dicts, keeping integer taxids with positive abundance."""
+        cleaned = [
+            {taxid: float(value) for taxid, value in row.items() if isinstance(taxid, int) and value > 0}
+            for row in rows
+        ]
+        taxids = sorted({taxid for row in cleaned for taxid in row})
+        column = {taxid: idx for idx, taxid in enumerate(taxids)}
+        indptr = array("q", [0])
+        indices = array("q")
+        data = array("d")
+        for row in cleaned:
+            for taxid in sorted(row):
+                indices.append(column[taxid])
+                data.append(row[taxid])
+            indptr.append(len(indices))
+        return cls(list(samples), taxids, indptr, indices, data)
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+    def row(self, idx: int) -> Dict[int, float]:
+        start, end = self.indptr[idx], self.indptr[idx + 1]
+        return {self.taxids[self.indices[pos]]: self.data[pos] for pos in range(start, end)}
+
+    def row_sums(self) -> List[float]:
+        return [sum(self.data[self.indptr[i] : self.indptr[i + 1]]) for i in range(len(self.samples))]
+
+    def normalized(self) -> "ProfileMatrix":
+        data = array("d", self.data)
+        for i, total in enumerate(self.row_sums()):
+            if total <= 0:
+                continue
+            for pos in range(self.indptr[i], self.indptr[i + 1]):
+                data[pos] /= total
+        return ProfileMatrix(self.samples, self.taxids, self.indptr, self.indices, data)
+
+    def collapse(self, column_map: Dict[int, int | None]) -> "ProfileMatrix":
+        """Sum columns into new taxids (e.g. their ancestor at a rank); unmapped columns are dropped."""
+        rows = []
+        for i in range(len(self.samples)):
+            collapsed: Dict[TaxKey, float] = {}
+            for pos in range(self.indptr[i], self.indptr[i + 1]):
+                target = column_map.get(self.taxids[self.indices[pos]])
+                if target is not None:
+                    collapsed[target] = collapsed.get(target, 0.0) + self.data[pos]
+            rows.append(collapsed)
+        return ProfileMatrix.from_rows(self.samples, rows)
+
+    def collapse_to_rank(self, taxonomy: Dict[int, Tuple[int, str]], rank: str) -> "ProfileMatrix":
+        compiled = compile_taxonomy(taxonomy, self.taxids)
+        return self.collapse({taxid: compiled.ancestor_at_rank(taxid, rank) for taxid in self.taxids})
+
+
+def _row_metrics(
+    truth: ProfileMatrix,
+    pred: ProfileMatrix,
+    i: int,
+) -> Dict[str, float]:
+    # Both matrices are normalized; walk the two sorted rows as a merge-join on taxid.
+    t_pos, t_end = truth.indptr[i], truth.indptr[i + 1]
+    p_pos, p_end = pred.indptr[i], pred.indptr[i + 1]
+    l1 = 0.0
+    total = 0.0
+    tp = fp = fn = 0
+    while t_pos < t_end or p_pos < p_end:
+        t_taxid = truth.taxids[truth.indices[t_pos]] if t_pos < t_end else None
+        p_taxid = pred.taxids[pred.indices[p_pos]] if p_pos < p_end else None
+        if p_taxid is None or (t_taxid is not None and t_taxid < p_taxid):
+            value = truth.data[t_pos]
+            l1 += value
+            total += value
+            fn += 1
+            t_pos += 1
+        elif t_taxid is None or p_taxid < t_taxid:
+            value = pred.data[p_pos]
+            l1 += value
+            total += value
+            fp += 1
+            p_pos += 1
+        else:
+            t_value = truth.data[t_pos]
+            p_value = pred.data[p_pos]
+            l1 += abs(p_value - t_value)
+            total += p_value + t_value
+            tp += 1
+            t_pos += 1
+            p_pos += 1
+    return {
+        "l1_norm": l1,
+        "purity": tp / (tp + fp) if (tp + fp) > 0 else 0.0,
+        "completeness": tp / (tp + fn) if (tp + fn) > 0 else 0.0,
+        "bray_curtis": l1 / total if total > 0 else 0.0,
+    }
+
+
+def batch_profile_metrics(
+    truth_by_rank: Dict[str, ProfileMatrix],
+    pred_by_rank: Dict[str, ProfileMatrix],
+    ranks: Iterable[str],
+    *,
+    taxonomy: Dict[int, Tuple[int, str]] | None = None,
+    truth_taxid: ProfileMatrix | None = None,
+    pred_taxid: ProfileMatrix | None = None,
+    require_ranks: bool = False,
+) -> List[Dict[str, float]]:
+    """OPAL-style metrics (plus Bray-Curtis and weighted UniFrac) for every sample at once.
+
+    Truth and prediction matrices must list the same samples in the same order. A rank is
+    reported for a sample when either side has abundance there (or always with `require_ranks`).
+    """
+    ranks = tuple(ranks)
+    sample_count = max(
+        [len(matrix) for matrix in (*truth_by_rank.values(), *pred_by_rank.values())] or [0]
+    )
+    results: List[Dict[str, float]] = [{} for _ in range(sample_count)]
+    for rank in ranks:
+        truth = truth_by_rank.get(rank)
+        pred = pred_by_rank.get(rank)
+        if truth is None and pred is None:
+            continue
+        empty = ProfileMatrix.from_rows([""] * sample_count, [{}] * sample_count)
+        truth = (truth or empty).normalized()
+        pred = (pred or empty).normalized()
+        for i in range(sample_count):
+            has_values = truth.indptr[i + 1] > truth.indptr[i] or pred.indptr[i + 1] > pred.indptr[i]
+            if not has_values and not require_ranks:
+                continue
+            for name, value in _row_metrics(truth, pred, i).items():
+                results[i][f"{name}_{rank}"] = value
+
+    if taxonomy is not None and truth_taxid is not None and pred_taxid is not None:
+        profiles = [truth_taxid.row(i) for i in range(len(truth_taxid))]
+        profiles += [pred_taxid.row(i) for i in range(len(pred_taxid))]
+        offset = len(truth_taxid)
+        distances = weighted_unifrac_matrix(profiles, taxonomy, [(i, offset + i) for i in range(offset)])
+        for i in range(offset):
+            results[i]["weighted_unifrac"] = distances[(i, offset + i)]
+    return results
+
+
+def write_profile_vectors(
+    path: Path,
+    truth_by_rank: Dict[str, Dict[TaxKey, float]],
+    pred_by_rank: Dict[str, Dict[TaxKey, float]],
+) -> None:
+    lines = ["source\trank\ttaxid\tvalue"]
+    for source, by_rank in (("truth", truth_by_rank), ("pred", pred_by_rank)):
+        for rank, profile in by_rank.items():
+            for taxid in sorted(k for k in profile if isinstance(k, int)):
+                value = float(profile[taxid])
+                if value > 0:
+                    lines.append(f"{source}\t{rank}\t{taxid}\t{value!r}")
+    path.write_text("\n".join(lines) + "\n")
+
+
+def read_profile_vectors(path: Path) -> tuple[Dict[str, Dict[TaxKey, float]], Dict[str, Dict[TaxKey, float]]]:
+    truth_by_rank: Dict[str, Dict[TaxKey, float]] = {}
+    pred_by_rank: Dict[str, Dict[TaxKey, float]] = {}
+    with path.open("r", encoding="utf-8") as fh:
+        next(fh, None)
+        for raw in fh:
+            parts = raw.rstrip("\n").split("\t")
+            if len(parts) < 4:
+                continue
+            source, rank, taxid, value = parts[:4]
+            target = truth_by_rank if source == "truth" else pred_by_rank
+            bucket = target.setdefault(rank, {})
+            bucket[int(taxid)] = bucket.get(int(taxid), 0.0) + float(value)
+    return truth_by_rank, pred_by_rank
@@ -0,0 +1,330 @@
+"""Readers for raw tool outputs, so evaluation does not need a separate convert step.
+
+Prediction readers yield `(read_id, taxid | None)` records; profile readers return
+`{rank: {taxid: value}}` like `parse_cami_profile`. Tools that skip conversion point evaluation
+at their raw output with the `classify_native` / `classify_native_format` outputs.
+"""
+
+from __future__ import annotations
+
+import gzip
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Tuple
+
+from ..tools.bracken_to_cami import iter_bracken_rows
+from ..tools.centrifuger_convert import iter_centrifuger_lines, iter_centrifuger_records
+from ..tools.kraken2_convert import iter_kraken2_records
+from ..tools.predbin import normalize_read_id
+from .lca import group_hits, resolve_groups
+
+PredictionRecords = Iterator[Tuple[str, int | None]]
+PredictionReader = Callable[[Path, Dict[str, int] | None], PredictionRecords]
+ProfileReader = Callable[[Path], Dict[str, Dict[int, float]]]
+# `[(taxid, score), ...]` with non-decreasing scores: at threshold t a read is assigned the first
+# taxid whose score is >= t, and is unclassified when none is.
+ScoreLadder = List[Tuple[int, float]]
+ScoreReader = Callable[[Path, Dict[int, Tuple[int, str]] | None], Iterator[Tuple[str, ScoreLadder]]]
+
+
+def _open_text(path: Path):
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8", errors="ignore")
+    return path.open("r", encoding="utf-8", errors="ignore")
+
+
+def _ganon_taxid(parts: list[str], ref_id: str | None, file_to_taxid: Dict[str, int] | None) -> int | None:
+    taxid = None
+    if ref_id and file_to_taxid:
+        taxid = file_to_taxid.get(ref_id)
+    if taxid is None and ref_id and ref_id.isdigit():
+        taxid = int(ref_id)
+    if taxid is None:
+        tokens = parts[2:] if len(parts) > 2 else parts[1:]
+        for tok in tokens:
+            tok = tok.split(":", 1)[0]
+            if tok.isdigit():
+                taxid = int(tok)
+                break
+    return taxid
+
+
+def iter_ganon_records(path: Path, file_to_taxid: Dict[str, int] | None = None) -> PredictionRecords:
+    """Yield every assigned ganon line (`.one` or `.all`); reads without a taxid are skipped."""
+    with _open_text(path) as fh:
+        for raw in fh:
+            line = raw.strip()
+            if not line or line.startswith("#"):
+                continue
+            parts = line.split("\t")
+            if len(parts) < 2:
+                continue
+            read_id = parts[0]
+            ref_id = parts[1] if len(parts) > 1 else None
+            if parts[0].startswith("H") and len(parts) >= 3:
+                read_id = parts[1]
+                ref_id = parts[2]
+            taxid = _ganon_taxid(parts, ref_id, file_to_taxid)
+            if read_id and taxid is not None:
+                yield read_id, taxid
+
+
+def iter_ganon_all_records(path: Path, file_to_taxid: Dict[str, int] | None = None) -> PredictionRecords:
+    """First hit per read from ganon `--output-all`, whose lines are grouped by read."""
+    for read_id, hits in group_hits(iter_ganon_records(path, file_to_taxid)):
+        yield read_id, hits[0]
+
+
+def _kraken2_records(path: Path, _file_to_taxid: Dict[str, int] | None = None) -> PredictionRecords:
+    return iter_kraken2_records(path)
+
+
+def _centrifuger_records(path: Path, _file_to_taxid: Dict[str, int] | None = None) -> PredictionRecords:
+    return ((read_id, taxid) for read_id, taxid, _score in iter_centrifuger_records(path))
+
+
+def _centrifuger_hits(path: Path, _file_to_taxid: Dict[str, int] | None = None) -> PredictionRecords:
+    return ((read_id, taxid) for read_id, taxid, _score in iter_centrifuger_lines(path))
+
+
+def read_bracken_profile(path: Path) -> Dict[str, Dict[int, float]]:
+    buckets: Dict[str, Dict[int, float]] = {}
+    for taxid, rank, value in iter_bracken_rows(path):
+        if not rank or rank == "unclassified":
+            continue
+        bucket = buckets.setdefault(rank, {})
+        bucket[taxid] = bucket.get(taxid, 0.0) + value
+    return buckets
+
+
+def iter_centrifuger_scores(path: Path, _taxonomy: Dict[int, Tuple[int, str]] | None = None):
+    """Centrifuger `score` of the first hit of every read."""
+    for read_id, taxid, score in iter_centrifuger_records(path):
+        yield read_id, [(taxid, score)] if taxid is not None and score is not None else []
+
+
+def iter_classify_tsv_scores(path: Path, _taxonomy: Dict[int, Tuple[int, str]] | None = None):
+    """Scores written as `taxid:score` in the first prediction column of a classify TSV."""
+    with _open_text(path) as fh:
+        for raw in fh:
+            parts = raw.strip().split("\t")
+            if len(parts) < 2 or not parts[0]:
+                continue
+            tokens = [t for t in parts[1:] if t]
+            ladder: ScoreLadder = []
+            if tokens and ":" in tokens[0]:
+                taxid_text, score_text = tokens[0].split(":", 1)
+                try:
+                    ladder = [(int(taxid_text), float(score_text))]
+                except ValueError:
+                    ladder = []
+            yield parts[0], ladder
+
+
+def _kraken2_kmer_counts(mapping: str) -> tuple[Dict[int, int], int]:
+    counts: Dict[int, int] = {}
+    total = 0
+    for token in mapping.split():
+        taxid_text, _sep, count_text = token.partition(":")
+        if taxid_text in {"A", "|"} or not count_text.isdigit():
+            continue
+        count = int(count_text)
+        total += count
+        if taxid_text.isdigit() and taxid_text != "0":
+            taxid = int(taxid_text)
+            counts[taxid] = counts.get(taxid, 0) + count
+    return counts, total
+
+
+def iter_kraken2_scores(path: Path, taxonomy: Dict[int, Tuple[int, str]] | None = None):
+    """Kraken2 confidence ladder rebuilt from the per-read k-mer column.
+
+    As with `--confidence`, the score of a taxon is the fraction of non-ambiguous k-mers that
+    fall in its clade; a read that misses the threshold at its call moves up to the first
+    ancestor that meets it. Without a taxonomy only the called taxon is scored.
+    """
+    paths: Dict[int, tuple[List[int], Dict[int, int]]] = {}
+    positions: Dict[tuple[int, int], int | None] = {}
+
+    def _path(taxid: int) -> tuple[List[int], Dict[int, int]]:
+        cached = paths.get(taxid)
+        if cached is None:
+            lineage = [taxid]
+            current = taxid
+            while taxonomy is not None and current in taxonomy:
+                parent = taxonomy[current][0]
+                if parent == current or parent in lineage:
+                    break
+                lineage.append(parent)
+                current = parent
+            cached = (lineage, {node: idx for idx, node in enumerate(lineage)})
+            paths[taxid] = cached
+        return cached
+
+    def _position(hit: int, call: int) -> int | None:
+        key = (hit, call)
+        if key not in positions:
+            _lineage, index = _path(call)
+            found = None
+            for node in _path(hit)[0]:
+                if node in index:
+                    found = index[node]
+                    break
+            positions[key] = found
+        return positions[key]
+
+    with path.open("r", encoding="utf-8", errors="ignore") as fin:
+        for raw in fin:
+            parts = raw.rstrip("\n").split("\t")
+            if len(parts) < 3 or not parts[1].strip():
+                continue
+            read_id = parts[1].strip()
+            call_text = parts[2].strip()
+            if parts[0].strip() == "U" or not call_text.isdigit() or call_text == "0" or len(parts) < 5:
+                yield read_id, []
+                continue
+            call = int(call_text)
+            counts, total = _kraken2_kmer_counts(parts[4])
+            if total <= 0:
+                yield read_id, []
+                continue
+            lineage, _index = _path(call)
+            clade = [0] * len(lineage)
+            for hit, count in counts.items():
+                pos = _position(hit, call)
+                if pos is not None:
+                    clade[pos] += count
+            ladder: ScoreLadder = []
+            running = 0
+            for node, count in zip(lineage, clade):
+                running += count
+                score = running / total
+                if not ladder or score > ladder[-1][1]:
+                    ladder.append((node, score))
+            yield read_id, ladder
+
+
+PREDICTION_READERS: Dict[str, PredictionReader] = {
+    "kraken2": _kraken2_records,
+    "centrifuger": _centrifuger_records,
+    "ganon_one": iter_ganon_records,
+    "ganon_all": iter_ganon_all_records,
+}
+
+# Every hit line of formats that can report several hits per read, for multi-hit resolution.
+MULTI_HIT_READERS: Dict[str, PredictionReader] = {
+    "centrifuger": _centrifuger_hits,
+    "ganon_all": iter_ganon_records,
+}
+
+# Per-tool score extractors for threshold sweeps, with their default threshold grids.
+SCORE_READERS: Dict[str, ScoreReader] = {
+    "kraken2": iter_kraken2_scores,
+    "centrifuger": iter_centrifuger_scores,
+    "classify_tsv": iter_classify_tsv_scores,
+}
+SCORE_THRESHOLDS_DEFAULT: Dict[str, Tuple[float, ...]] = {
+    "kraken2": tuple(step / 20 for step in range(21)),
+    "centrifuger": (0, 50, 100, 150, 200, 300, 400, 500, 750, 1000, 1500, 2000, 3000, 5000),
+    "classify_tsv": tuple(step / 20 for step in range(21)),
+}
+
+# Outputs that always hold raw per-read predictions, checked after `classify_native`.
+NATIVE_PREDICTION_OUTPUTS = {"classify_one": "ganon_one", "classify_all": "ganon_all"}
+
+PROFILE_READERS: Dict[str, ProfileReader] = {
+    "bracken_tsv": read_bracken_profile,
+}
+
+
+def native_prediction_source(outputs: dict) -> Tuple[str, str, Path] | None:
+    """Return `(output key, format, path)` for the raw per-read predictions of a run, if any."""
+    native = outputs.get("classify_native")
+    if native:
+        fmt = outputs.get("classify_native_format")
+        if fmt not in PREDICTION_READERS:
+            raise ValueError(f"unsupported classify_native_format: {fmt}")
+        return "classify_native", fmt, Path(native)
+    for key, fmt in NATIVE_PREDICTION_OUTPUTS.items():
+        if outputs.get(key):
+            return key, fmt, Path(outputs[key])
+    return None
+
+
+def multi_hit_source(outputs: dict) -> Tuple[str, Path] | None:
+    """Return `(format, path)` of a raw output with all hits per read (even if it was converted)."""
+    source = native_prediction_source(outputs)
+    if source is not None and source[1] in MULTI_HIT_READERS:
+        return source[1], source[2]
+    if outputs.get("classify_all"):
+        return "ganon_all", Path(outputs["classify_all"])
+    if outputs.get("centrifuger_tsv"):
+        return "centrifuger", Path(outputs["centrifuger_tsv"])
+    return None
+
+
+def score_source(outputs: dict) -> Tuple[str, Path] | None:
+    """Return `(score format, path)` of the run output that carries per-read scores."""
+    native = outputs.get("classify_native")
+    if native and outputs.get("classify_native_format") in SCORE_READERS:
+        return outputs["classify_native_format"], Path(native)
+    if outputs.get("centrifuger_tsv"):
+        return "centrifuger", Path(outputs["centrifuger_tsv"])
+    if outputs.get("kraken2_out"):
+        return "kraken2", Path(outputs["kraken2_out"])
+    if outputs.get("classify_tsv"):
+        return "classify_tsv", Path(outputs["classify_tsv"])
+    return None
+
+
+def native_profile_source(outputs: dict) -> Tuple[str, Path] | None:
+    for key in PROFILE_READERS:
+        if outputs.get(key):
+            return key, Path(outputs[key])
+    return None
+
+
+def iter_native_predictions(
+    fmt: str,
+    path: Path,
+    file_to_taxid: Dict[str, int] | None = None,
+) -> PredictionRecords:
+    return PREDICTION_READERS[fmt](path, file_to_taxid)
+
+
+def iter_hit_groups(
+    fmt: str,
+    path: Path,
+    file_to_taxid: Dict[str, int] | None = None,
+    keep: Callable[[str], bool] | None = None,
+) -> Iterator[Tuple[str, List[int | None]]]:
+    """Stream `(read_id, hit taxids)` groups of a multi-hit output with normalized read ids."""
+    records = (
+        (normalize_read_id(read_id), taxid) for read_id, taxid in MULTI_HIT_READERS[fmt](path, file_to_taxid)
+    )
+    if keep is not None:
+        records = ((read_id, taxid) for read_id, taxid in records if keep(read_id))
+    return group_hits(records)
+
+
+def load_native_predictions(
+    fmt: str,
+    path: Path,
+    file_to_taxid: Dict[str, int] | None = None,
+    keep: Callable[[str], bool] | None = None,
+    *,
+    policy: str = "first",
+    taxonomy: Dict[int, Tuple[int, str]] | None = None,
+) -> Dict[str, int | None]:
+    """Load raw predictions; multi-hit formats are resolved with `policy` (see `core.lca`)."""
+    preds: Dict[str, int | None] = {}
+    if policy != "first" and fmt in MULTI_HIT_READERS:
+        groups = iter_hit_groups(fmt, path, file_to_taxid, keep)
+        for read_id, (taxid,) in resolve_groups(groups, (policy,), taxonomy):
+            preds[read_id] = taxid
+        return preds
+    for read_id, taxid in iter_native_predictions(fmt, path, file_to_taxid):
+        read_id = normalize_read_id(read_id)
+        if keep is not None and not keep(read_id):
+            continue
+        preds[read_id] = taxid
+    return preds
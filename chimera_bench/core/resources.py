@@ -98,3 +98,17 @@ def aggregate_resources(step_records: Iterable[dict]) -> Dict[str, Any]:
     if saw_sys:
         aggregated["system_time_seconds"] = sys_total
     return aggregated
+
+
+def combine_parallel_resources(resources: Iterable[dict]) -> Dict[str, Any]:
+    """Resources of processes that ran side by side: memory and CPU add up, wall time is the longest."""
+    combined: Dict[str, Any] = {}
+    for resource in resources:
+        for key in ("max_rss_kb", "user_time_seconds", "system_time_seconds"):
+            value = (resource or {}).get(key)
+            if isinstance(value, (int, float)):
+                combined[key] = combined.get(key, 0) + value
+        wall = (resource or {}).get("elapsed_wall_seconds")
+        if isinstance(wall, (int, float)):
+            combined["elapsed_wall_seconds"] = max(combined.get("elapsed_wall_seconds", 0.0), float(wall))
+    return combined
@@ -5,7 +5,7 @@ import os
 from pathlib import Path
 from typing import Dict, List
 
-from .metrics import METRIC_VERSION
+from .metrics import METRIC_VERSION, PER_READ_RANKS_DEFAULT
 
 
 TOOL_DISPLAY_NAMES = {
@@ -32,8 +32,15 @@ BUILD_COLUMNS = [
     "Finished At",
 ]
 
+THROUGHPUT_COLUMNS = [
+    ("Load (s)", "load_elapsed_seconds"),
+    ("Reads/s", "reads_per_second"),
+    ("Bases/s", "bases_per_second"),
+]
+
 PER_READ_COLUMNS = [
     ("Elapsed (s)", "run_elapsed_seconds"),
+    *THROUGHPUT_COLUMNS,
     ("Max RSS (GB)", "resource_max_rss_gb"),
     ("Total Reads", "total_reads"),
     ("Classified Reads", "classified_reads"),
@@ -94,6 +101,7 @@ ABUNDANCE_UNK_COLUMNS = [
 
 PER_READ_MAIN_COLUMNS = [
     ("Elapsed (s)", "run_elapsed_seconds"),
+    *THROUGHPUT_COLUMNS,
     ("Max RSS (GB)", "resource_max_rss_gb"),
     ("Truth Mapped Rate (species)", "per_read_truth_mapped_rate_species"),
     ("Pred Mapped Rate (species)", "per_read_pred_mapped_rate_species"),
@@ -122,16 +130,11 @@ ABUNDANCE_MAIN_COLUMNS = [
 PUBLIC_METRIC_ALIASES = {
     "per_read_classified_rate": "exact_per_read_classified_rate",
     "per_read_unclassified_rate": "exact_per_read_unclassified_rate",
-    "per_read_truth_mapped_rate_species": "exact_per_read_truth_mapped_rate_species",
-    "per_read_truth_mapped_rate_genus": "exact_per_read_truth_mapped_rate_genus",
-    "per_read_pred_mapped_rate_species": "exact_per_read_pred_mapped_rate_species",
-    "per_read_pred_mapped_rate_genus": "exact_per_read_pred_mapped_rate_genus",
-    "per_read_precision_species": "exact_per_read_precision_species",
-    "per_read_recall_species": "exact_per_read_recall_species",
-    "per_read_f1_species": "exact_per_read_f1_species",
-    "per_read_precision_genus": "exact_per_read_precision_genus",
-    "per_read_recall_genus": "exact_per_read_recall_genus",
-    "per_read_f1_genus": "exact_per_read_f1_genus",
+    **{
+        f"per_read_{metric}_{rank}": f"exact_per_read_{metric}_{rank}"
+        for rank in PER_READ_RANKS_DEFAULT
+        for metric in ("truth_mapped_rate", "pred_mapped_rate", "precision", "recall", "f1")
+    },
 }
 
 CLASSIFY_PUBLIC_NOTE = [
@@ -140,6 +143,7 @@ CLASSIFY_PUBLIC_NOTE = [
     "原始真值若为 `strain/subspecies/isolate`，只要能提升到对应 rank，就进入该 rank 分母；原始真值若只有 `family/order/class`，则不进入更细层级分母。",
     "Truth Mapped Rate / Pred Mapped Rate 会同时展示；F1 必须结合映射率一起解读，不能脱离分母单独引用。",
     "跨数据集汇总见 `results/classify/summary.tsv`；本表按数据集展开各工具的详细结果。",
+    "`Load (s)` 为用少量校准 reads 估计的固定启动/加载开销，`Reads/s`、`Bases/s` 为扣除该开销后的吞吐量；未开启校准（`calibrate`）的运行留空。",
 ]
 
 PROFILE_PUBLIC_NOTE = [
@@ -1,23 +1,61 @@
 from __future__ import annotations
 
 import json
+import shutil
+import sqlite3
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-from .evaluator import summarize_classify_tsv, summarize_ganon_tre
+from .artifacts import ARTIFACTS_DIRNAME, ArtifactStore, artifact_key
+from .batching import BATCH_DIRNAME, apportion_resource, batch_tag, demux_per_read
+from .calibration import calibration_reads, estimate_throughput
+from .confusion import write_confusion_outputs
+from .evaluator import (
+    summarize_classify_tsv,
+    summarize_ganon_tre,
+    summarize_prediction_bin,
+    summarize_prediction_records,
+)
 from .metrics import evaluate_with_truth
+from .pr_curve import PR_CURVE_FILENAME, write_pr_curve
+from .profile_matrix import PROFILE_VECTORS_FILENAME, write_profile_vectors
+from .readers import iter_native_predictions
 from .results_readme import write_classify_readme, write_profile_readme
-from .resources import aggregate_resources, parse_time_log
+from .resources import aggregate_resources, combine_parallel_resources, parse_time_log
+from .scatter import gather_outputs
+from ..catalog import dataset_read_stats
 from ..io.layout import ensure_profile_dirs, ensure_run_dirs
+from ..io.shards import split_reads, write_read_head, write_tagged_batch
 
+METRICS_FILENAME = "metrics.json"
+# Hash-subsampled metrics live beside the exact ones and never replace them.
+APPROX_METRICS_FILENAME = "metrics.approx.json"
 
-def build_run_metrics(exp: dict, dataset: dict, outputs: dict) -> dict:
+
+def metrics_filename(exp: dict) -> str:
+    """Where `recompute` writes an experiment's metrics; `run` always writes the exact file."""
+    return APPROX_METRICS_FILENAME if exp.get("approx_fraction") else METRICS_FILENAME
+
+
+def build_run_metrics(exp: dict, dataset: dict, outputs: dict, run_dir: Path | None = None) -> dict:
     metrics = {}
     classify_path_str = outputs.get("classify_tsv")
-    if classify_path_str:
+    classify_bin = outputs.get("classify_bin")
+    if classify_bin and not classify_path_str:
+        classify_bin_path = Path(classify_bin)
+        if classify_bin_path.exists():
+            metrics = summarize_prediction_bin(classify_bin_path)
+    elif classify_path_str:
         classify_path = Path(classify_path_str)
         if classify_path.exists():
             metrics = summarize_classify_tsv(classify_path)
+    elif outputs.get("classify_native"):
+        native_path = Path(outputs["classify_native"])
+        if native_path.exists():
+            metrics = summarize_prediction_records(
+                iter_native_predictions(outputs.get("classify_native_format"), native_path)
+            )
     else:
         tre_path_str = outputs.get("report_reads_tre") or outputs.get("reads_tre")
         if tre_path_str:
@@ -25,63 +63,352 @@ def build_run_metrics(exp: dict, dataset: dict, outputs: dict) -> dict:
             if tre_path.exists():
                 metrics = summarize_ganon_tre(tre_path)
 
-    truth_metrics = evaluate_with_truth(exp, dataset, outputs)
+    # An approximate pass leaves confusion.npz, profile vectors and PR curves of the exact pass alone.
+    write_artifacts = run_dir is not None and not exp.get("approx_fraction")
+    confusion_by_rank = {} if write_artifacts and exp.get("confusion", True) else None
+    profile_vectors = {} if write_artifacts else None
+    pr_curve = [] if write_artifacts else None
+    truth_metrics = evaluate_with_truth(
+        exp,
+        dataset,
+        outputs,
+        confusion_by_rank=confusion_by_rank,
+        profile_vectors=profile_vectors,
+        pr_curve=pr_curve,
+    )
     if truth_metrics:
         metrics.update(truth_metrics)
+    if confusion_by_rank:
+        write_confusion_outputs(run_dir, confusion_by_rank)
+    if write_artifacts:
+        vectors_path = run_dir / PROFILE_VECTORS_FILENAME
+        if profile_vectors:
+            write_profile_vectors(vectors_path, profile_vectors["truth"], profile_vectors["pred"])
+        elif vectors_path.exists():
+            # Keep the stored vectors in sync with metrics.json when profile metrics are dropped.
+            vectors_path.unlink()
+        pr_curve_path = run_dir / PR_CURVE_FILENAME
+        if pr_curve:
+            write_pr_curve(pr_curve_path, pr_curve)
+        elif pr_curve_path.exists():
+            pr_curve_path.unlink()
     return metrics
 
 
 class Runner:
-    def __init__(self, runs_root: Path, profile_root: Path | None = None) -> None:
+    def __init__(self, runs_root: Path, profile_root: Path | None = None, catalog_cache: Path | None = None) -> None:
         self.runs_root = runs_root
         self.profile_root = profile_root
+        self.catalog_cache = catalog_cache
+        self.artifacts = ArtifactStore(runs_root / ARTIFACTS_DIRNAME)
 
     def run(self, *, exp: dict, dataset: dict, tool, executor) -> dict:
+        context = self._run_context(exp=exp, dataset=dataset, tool=tool)
+        run_dir = context["run_dir"]
+        steps = context["steps"]
+        state = self._new_state()
+        total_start = time.time()
+        self._execute_steps(
+            steps,
+            state,
+            exp=exp,
+            dataset=dataset,
+            tool=tool,
+            run_dir=run_dir,
+            executor=executor,
+        )
+        executed_elapsed = time.time() - total_start
+        calibration = None
+        succeeded = bool(state["steps"]) and state["steps"][-1]["return_code"] == 0
+        if calibration_reads(exp) and succeeded:
+            # After the measured run, so the calibration cannot warm the page cache for it.
+            calibration = self._calibrate(tool, exp=exp, dataset=dataset, run_dir=run_dir, executor=executor)
+        return self._finish_run(
+            state,
+            exp=exp,
+            dataset=dataset,
+            tool=tool,
+            run_dir=run_dir,
+            profile_dir=context["profile_dir"],
+            executed_elapsed=executed_elapsed,
+            calibration=calibration,
+        )
+
+    def _calibrate(self, tool, *, exp: dict, dataset: dict, run_dir: Path, executor) -> dict:
+        """Run the pipeline on the first few reads to measure fixed startup and index-load cost.
+
+        It runs after the measured run (recorded as `order: after_run`), so its index load is
+        as warm as the page cache left it.
+        """
+        calibration_dir = run_dir / "calibration"
+        (calibration_dir / "logs").mkdir(parents=True, exist_ok=True)
+        (calibration_dir / "outputs").mkdir(parents=True, exist_ok=True)
+        head, reads, bases = write_read_head(dataset, calibration_reads(exp), calibration_dir / "reads")
+        steps = self._build_steps(
+            tool,
+            dataset=head,
+            exp=exp,
+            out_prefix=str((calibration_dir / "outputs" / getattr(tool, "output_basename", tool.name)).resolve()),
+            profile_dir=None,
+            profile_out_prefix=None,
+        )
+        state = self._new_state()
+        start = time.time()
+        self._execute_steps(
+            steps,
+            state,
+            exp={**exp, "reuse_artifacts": False},
+            dataset=head,
+            tool=tool,
+            run_dir=calibration_dir,
+            executor=executor,
+        )
+        elapsed = time.time() - start
+        shutil.rmtree(calibration_dir / "reads", ignore_errors=True)
+        return {
+            "order": "after_run",
+            "reads": reads,
+            "bases": bases,
+            "elapsed_seconds": elapsed,
+            "return_code": state["steps"][-1]["return_code"] if state["steps"] else None,
+            "steps": state["steps"],
+        }
+
+    def _run_context(self, *, exp: dict, dataset: dict, tool) -> dict:
+        if exp.get("approx_fraction"):
+            # A run replaces meta.json and outputs, so it must also leave exact metrics behind.
+            raise ValueError("approx_fraction is evaluation-only; use `recompute --approx-fraction` on an existing run")
         exp_name = exp.get("name", "exp")
         dataset_name = dataset.get("name", "dataset")
         run_dir = ensure_run_dirs(self.runs_root, exp_name, tool.name, dataset_name)
         basename = getattr(tool, "output_basename", tool.name)
-        out_prefix = str((run_dir / "outputs" / basename).resolve())
         profile_dir = None
         profile_out_prefix = None
         if self.profile_root is not None:
             profile_dir = ensure_profile_dirs(self.profile_root, exp_name, tool.name, dataset_name)
             profile_out_prefix = str((profile_dir / "outputs" / f"{basename}_abundance").resolve())
+        steps = self._build_steps(
+            tool,
+            dataset=dataset,
+            exp=exp,
+            out_prefix=str((run_dir / "outputs" / basename).resolve()),
+            profile_dir=profile_dir,
+            profile_out_prefix=profile_out_prefix,
+        )
+        return {"dataset": dataset, "run_dir": run_dir, "profile_dir": profile_dir, "steps": steps}
 
-        steps = None
-        build_steps = getattr(tool, "build_steps", None)
-        if callable(build_steps):
-            try:
-                steps = build_steps(
-                    dataset=dataset,
+    def run_batch(self, *, exp: dict, datasets: list, tool, executor) -> list:
+        """Run several samples through one tool invocation and demultiplex them into per-sample runs.
+
+        Reads are concatenated with a per-sample read-id tag and the tool's `per_read` step runs
+        once on the batch. Its per-read outputs are split back by tag, and the remaining steps
+        run per sample. Batched step time and CPU are charged to samples by read share.
+        """
+        if len(datasets) == 1:
+            return [self.run(exp=exp, dataset=datasets[0], tool=tool, executor=executor)]
+        if int(exp.get("scatter") or 1) > 1:
+            raise ValueError("scatter and batch_size cannot be combined")
+        if calibration_reads(exp):
+            raise ValueError("calibrate and batch_size cannot be combined")
+        samples = [self._run_context(exp=exp, dataset=dataset, tool=tool) for dataset in datasets]
+        batched_idx = next((idx for idx, step in enumerate(samples[0]["steps"]) if step.get("per_read")), None)
+        if batched_idx is None:
+            raise ValueError(f"{tool.name} does not support batching (no step declares `per_read`)")
+        batched_steps = samples[0]["steps"][: batched_idx + 1]
+        per_read = batched_steps[-1]["per_read"]
+
+        first, last = datasets[0], datasets[-1]
+        batch_name = f"{first.get('name', 'dataset')}..{last.get('sample_id') or last.get('name', 'dataset')}"
+        batch_dir = ensure_run_dirs(self.runs_root, exp.get("name", "exp"), tool.name, f"{BATCH_DIRNAME}/{batch_name}")
+        tags = [batch_tag(idx) for idx in range(len(datasets))]
+        batch_start = time.time()
+        batch_dataset, counts = write_tagged_batch(datasets, tags, batch_dir / "reads")
+        batch_steps = self._build_steps(
+            tool,
+            dataset=batch_dataset,
+            exp=exp,
+            out_prefix=str((batch_dir / "outputs" / getattr(tool, "output_basename", tool.name)).resolve()),
+            profile_dir=None,
+            profile_out_prefix=None,
+        )[: batched_idx + 1]
+        batch_state = self._new_state()
+        batch_state["steps"].append(
+            {"name": "batch_reads", "cmd": [], "return_code": 0, "elapsed_seconds": time.time() - batch_start, "resource": {}}
+        )
+        # The batch is measured as a whole, so shared artifacts are neither reused nor recorded.
+        self._execute_steps(
+            batch_steps,
+            batch_state,
+            exp={**exp, "reuse_artifacts": False},
+            dataset=batch_dataset,
+            tool=tool,
+            run_dir=batch_dir,
+            executor=executor,
+        )
+        batch_rc = batch_state["steps"][-1]["return_code"]
+        demux_counts = {}
+        if batch_rc == 0:
+            demux_start = time.time()
+            for output, column in per_read.items():
+                if output not in batch_state["outputs"]:
+                    continue
+                targets = {tag: sample["steps"][batched_idx]["outputs"][output] for tag, sample in zip(tags, samples)}
+                demux_counts[output] = demux_per_read(Path(batch_state["outputs"][output]), int(column), targets)
+            batch_state["steps"].append(
+                {"name": "demux", "cmd": [], "return_code": 0, "elapsed_seconds": time.time() - demux_start, "resource": {}}
+            )
+        if not exp.get("keep_shards", False):
+            shutil.rmtree(batch_dir / "reads", ignore_errors=True)
+
+        total_reads = sum(counts)
+        sample_outputs = [
+            self._batched_sample_outputs(batch_state["outputs"], per_read, sample["steps"][: batched_idx + 1])
+            for sample in samples
+        ]
+        shared_outputs = {
+            name: path for name, path in batch_state["outputs"].items() if name not in sample_outputs[0]
+        }
+        results = []
+        for idx, sample in enumerate(samples):
+            share = counts[idx] / total_reads if total_reads else 1.0 / len(samples)
+            state = self._new_state()
+            for record in batch_state["steps"]:
+                state["steps"].append(
+                    {
+                        **record,
+                        "elapsed_seconds": record["elapsed_seconds"] * share,
+                        "batch_elapsed_seconds": record["elapsed_seconds"],
+                        "resource": apportion_resource(record.get("resource"), share),
+                    }
+                )
+            start = time.time()
+            if batch_rc == 0:
+                state["outputs"].update(sample_outputs[idx])
+                self._execute_steps(
+                    sample["steps"][batched_idx + 1 :],
+                    state,
                     exp=exp,
-                    out_prefix=out_prefix,
-                    profile_dir=profile_dir,
-                    profile_out_prefix=profile_out_prefix,
+                    dataset=sample["dataset"],
+                    tool=tool,
+                    run_dir=sample["run_dir"],
+                    executor=executor,
                 )
-            except TypeError:
-                steps = build_steps(dataset=dataset, exp=exp, out_prefix=out_prefix)
-        if steps is None:
-            try:
-                cmd, outputs = tool.build_cmd(
-                    dataset=dataset,
+            executed_elapsed = (time.time() - start) + sum(
+                record["elapsed_seconds"] for record in state["steps"][: len(batch_state["steps"])]
+            )
+            batch_meta = {
+                "id": batch_name,
+                "factor": len(samples),
+                "samples": [dataset.get("name", "dataset") for dataset in datasets],
+                "read_count": counts[idx],
+                "read_share": share,
+                "dir": str(batch_dir),
+                "demux": {output: tallies.get(tags[idx], 0) for output, tallies in demux_counts.items()},
+                "shared_outputs": shared_outputs,
+            }
+            results.append(
+                self._finish_run(
+                    state,
                     exp=exp,
-                    out_prefix=out_prefix,
-                    profile_dir=profile_dir,
-                    profile_out_prefix=profile_out_prefix,
+                    dataset=sample["dataset"],
+                    tool=tool,
+                    run_dir=sample["run_dir"],
+                    profile_dir=sample["profile_dir"],
+                    executed_elapsed=executed_elapsed,
+                    extra_meta={"batch": batch_meta},
                 )
-            except TypeError:
-                cmd, outputs = tool.build_cmd(dataset=dataset, exp=exp, out_prefix=out_prefix)
-            steps = [{"name": "run", "cmd": cmd, "outputs": outputs}]
+            )
+        return results
 
-        outputs_all = {}
-        step_records = []
-        total_start = time.time()
+    @staticmethod
+    def _batched_sample_outputs(batch_outputs: dict, per_read: dict, sample_steps: list) -> dict:
+        """One sample's view of the batched steps' outputs.
+
+        Outputs pointing at a demultiplexed per-read file (the `per_read` outputs themselves and
+        aliases such as `classify_native`) take the sample's own path; values the sample's steps
+        declare identically (e.g. `classify_native_format`) pass through. Batch-only files are left out.
+        """
+        own: dict = {}
+        for step in sample_steps:
+            own.update(step.get("outputs", {}))
+        demuxed = {batch_outputs[output]: output for output in per_read if output in batch_outputs}
+        outputs = {}
+        for name, value in batch_outputs.items():
+            if isinstance(value, str) and value in demuxed:
+                outputs[name] = own[demuxed[value]]
+            elif own.get(name) == value:
+                outputs[name] = value
+        return outputs
+
+    @staticmethod
+    def _new_state() -> dict:
+        return {"outputs": {}, "variant_outputs": {}, "variants": {}, "steps": [], "dependencies": []}
+
+    def _execute_steps(self, steps: list, state: dict, *, exp: dict, dataset: dict, tool, run_dir: Path, executor) -> None:
+        """Run `steps` in order, appending step records and outputs to `state`; stops at the first failure."""
+        outputs_all = state["outputs"]
+        step_records = state["steps"]
+        dependencies = state["dependencies"]
+        scatter = int(exp.get("scatter") or 1)
+        if scatter > 1 and not any(step.get("merge") for step in steps):
+            raise ValueError(f"{tool.name} does not support scatter (no step declares `merge`)")
+        shard_plan = None
+        reuse_artifacts = exp.get("reuse_artifacts", True)
+        # By default the owning run re-executes its step; opt in to keep its existing outputs.
+        reuse_own = bool(exp.get("reuse_own_artifacts", False))
         for idx, step in enumerate(steps):
             name = step.get("name") or f"step{idx + 1}"
             stdout_path = run_dir / "logs" / f"{name}.stdout.log"
             stderr_path = run_dir / "logs" / f"{name}.stderr.log"
             resource_path = run_dir / "logs" / f"{name}.time.log"
+            if scatter > 1 and step.get("merge"):
+                # Sharded runs are measured, not reused, so artifacts are skipped here.
+                if shard_plan is None:
+                    shard_plan = self._plan_shards(tool, exp=exp, dataset=dataset, run_dir=run_dir, shards=scatter)
+                    step_records.append(shard_plan["record"])
+                record = self._run_scattered(step, name, shard_plan, executor)
+                step_records.append(record)
+                if record["return_code"] != 0:
+                    break
+                outputs_all.update(step.get("outputs", {}))
+                continue
+            artifact = step.get("artifact") if reuse_artifacts else None
+            if artifact:
+                kind = artifact["kind"]
+                keys = [artifact_key(kind, artifact.get("fields", {}))]
+                if artifact.get("content_fields"):
+                    keys.append(artifact_key(kind, artifact["content_fields"]))
+                shared_outputs = {output: step["outputs"][output] for output in artifact.get("outputs", [])}
+                entry = None
+                for key in keys:
+                    entry = self.artifacts.get(kind, key)
+                    if entry is not None:
+                        break
+                if (
+                    entry is not None
+                    and (reuse_own or entry.get("run_dir") != str(run_dir.resolve()))
+                    and ArtifactStore.link_outputs(entry, shared_outputs)
+                ):
+                    # Reused step: not executed here, but its cost is attributed to this pipeline.
+                    original = entry.get("step") or {}
+                    dependency = {"kind": kind, "key": key, "run_dir": entry["run_dir"], "step": original.get("name")}
+                    dependencies.append(dependency)
+                    step_records.append(
+                        {
+                            "name": name,
+                            "cmd": step["cmd"],
+                            "return_code": 0,
+                            "elapsed_seconds": 0.0,
+                            "attributed_elapsed_seconds": original.get("elapsed_seconds") or 0.0,
+                            "stdout": original.get("stdout"),
+                            "stderr": original.get("stderr"),
+                            "resource_log": original.get("resource_log"),
+                            "resource": original.get("resource") or {},
+                            "reused_from": dependency,
+                        }
+                    )
+                    outputs_all.update(step.get("outputs", {}))
+                    continue
             start = time.time()
             rc = executor(
                 step["cmd"],
@@ -106,10 +433,44 @@ class Runner:
             )
             if rc == 0:
                 outputs_all.update(step.get("outputs", {}))
+                state["variant_outputs"].update(step.get("variant_outputs", {}))
+                state["variants"].update(step.get("variants", {}))
+                if artifact:
+                    for key in keys:
+                        self.artifacts.put(
+                            kind,
+                            key,
+                            run_dir=run_dir,
+                            step=step_records[-1],
+                            outputs=shared_outputs,
+                        )
             if rc != 0:
                 break
 
-        total_elapsed = time.time() - total_start
+        if shard_plan is not None and not exp.get("keep_shards", False):
+            shutil.rmtree(shard_plan["reads_dir"], ignore_errors=True)
+
+    def _finish_run(
+        self,
+        state: dict,
+        *,
+        exp: dict,
+        dataset: dict,
+        tool,
+        run_dir: Path,
+        profile_dir: Path | None,
+        executed_elapsed: float,
+        extra_meta: dict | None = None,
+        calibration: dict | None = None,
+    ) -> dict:
+        """Write meta.json, metrics.json and variant sibling runs, then refresh the READMEs."""
+        exp_name = exp.get("name", "exp")
+        dataset_name = dataset.get("name", "dataset")
+        step_records = state["steps"]
+        outputs_all = state["outputs"]
+        total_elapsed = executed_elapsed + sum(
+            record.get("attributed_elapsed_seconds", 0.0) for record in step_records
+        )
         db_path = exp.get("db") or exp.get("db_prefix")
         db_name = None
         if db_path:
@@ -129,16 +490,227 @@ class Runner:
             "steps": step_records,
             "return_code": step_records[-1]["return_code"] if step_records else None,
             "elapsed_seconds": total_elapsed,
+            "executed_elapsed_seconds": executed_elapsed,
+            "dependencies": state["dependencies"],
             "resource": aggregate_resources(step_records),
             "outputs": outputs_all,
+            **(extra_meta or {}),
         }
+        throughput = {}
+        if calibration is not None:
+            meta["calibration"] = calibration
+            if calibration["return_code"] == 0 and meta["return_code"] == 0:
+                # Cache only: a full catalog scan does not belong in metric writing, and a failed
+                # lookup only costs the throughput fields, never the run's meta and metrics.
+                try:
+                    stats = dataset_read_stats(dataset, cache_path=self.catalog_cache, scan=False)
+                except (OSError, ValueError, KeyError, TypeError, sqlite3.Error) as exc:
+                    stats = None
+                    calibration["read_stats"] = f"unavailable ({exc})"
+                else:
+                    if stats is None:
+                        calibration["read_stats"] = "missing (run `catalog` to fill the cache)"
+                if stats:
+                    throughput = estimate_throughput(
+                        run_elapsed=total_elapsed,
+                        run_reads=stats["reads"],
+                        run_bases=stats["bases"],
+                        calibration_elapsed=calibration["elapsed_seconds"],
+                        calibration_reads=calibration["reads"],
+                    )
         (run_dir / "meta.json").write_text(json.dumps(meta, indent=2))
 
-        metrics = build_run_metrics(exp, dataset, outputs_all)
-        (run_dir / "metrics.json").write_text(json.dumps(metrics, indent=2))
+        metrics = build_run_metrics(exp, dataset, outputs_all, run_dir)
+        metrics.update(throughput)
+        (run_dir / METRICS_FILENAME).write_text(json.dumps(metrics, indent=2))
+
+        variant_runs = self._write_variant_runs(
+            exp=exp,
+            dataset=dataset,
+            tool=tool,
+            meta=meta,
+            run_dir=run_dir,
+            variants=state["variants"],
+            variant_outputs=state["variant_outputs"],
+        )
+        if variant_runs:
+            meta["variant_runs"] = variant_runs
+            (run_dir / "meta.json").write_text(json.dumps(meta, indent=2))
 
         write_classify_readme(self.runs_root)
         if self.profile_root is not None:
             write_profile_readme(self.profile_root, self.runs_root)
 
         return {"run_dir": str(run_dir), "metrics": metrics, "meta": meta}
+
+    @staticmethod
+    def _build_steps(tool, *, dataset: dict, exp: dict, out_prefix: str, profile_dir, profile_out_prefix) -> list:
+        steps = None
+        build_steps = getattr(tool, "build_steps", None)
+        if callable(build_steps):
+            try:
+                steps = build_steps(
+                    dataset=dataset,
+                    exp=exp,
+                    out_prefix=out_prefix,
+                    profile_dir=profile_dir,
+                    profile_out_prefix=profile_out_prefix,
+                )
+            except TypeError:
+                steps = build_steps(dataset=dataset, exp=exp, out_prefix=out_prefix)
+        if steps is None:
+            try:
+                cmd, outputs = tool.build_cmd(
+                    dataset=dataset,
+                    exp=exp,
+                    out_prefix=out_prefix,
+                    profile_dir=profile_dir,
+                    profile_out_prefix=profile_out_prefix,
+                )
+            except TypeError:
+                cmd, outputs = tool.build_cmd(dataset=dataset, exp=exp, out_prefix=out_prefix)
+            steps = [{"name": "run", "cmd": cmd, "outputs": outputs}]
+        return steps
+
+    def _plan_shards(self, tool, *, exp: dict, dataset: dict, run_dir: Path, shards: int) -> dict:
+        """Split the reads into `shards` record-aligned shards and build each shard's steps.
+
+        Each shard gets `threads // shards` threads and its own `shards/shardNN` directory.
+        """
+        if not exp.get("threads"):
+            raise ValueError("scatter requires exp.threads so it can be divided between shards")
+        shards_root = run_dir / "shards"
+        reads_dir = shards_root / "reads"
+        start = time.time()
+        shard_datasets, counts = split_reads(dataset, shards, reads_dir)
+        split_elapsed = time.time() - start
+        shard_exp = {**exp, "threads": max(1, int(exp["threads"]) // shards)}
+        basename = getattr(tool, "output_basename", tool.name)
+        shard_dirs = []
+        shard_steps = []
+        for idx, shard_dataset in enumerate(shard_datasets):
+            shard_dir = shards_root / f"shard{idx:02d}"
+            (shard_dir / "logs").mkdir(parents=True, exist_ok=True)
+            (shard_dir / "outputs").mkdir(parents=True, exist_ok=True)
+            steps = self._build_steps(
+                tool,
+                dataset=shard_dataset,
+                exp=shard_exp,
+                out_prefix=str((shard_dir / "outputs" / basename).resolve()),
+                profile_dir=None,
+                profile_out_prefix=None,
+            )
+            shard_dirs.append(shard_dir)
+            shard_steps.append({step.get("name"): step for step in steps})
+        record = {
+            "name": "scatter_reads",
+            "cmd": [],
+            "return_code": 0,
+            "elapsed_seconds": split_elapsed,
+            "shards": shards,
+            "shard_reads": counts,
+            "resource": {},
+        }
+        return {
+            "reads_dir": reads_dir,
+            "dirs": shard_dirs,
+            "steps": shard_steps,
+            "counts": counts,
+            "threads": shard_exp["threads"],
+            "record": record,
+        }
+
+    @staticmethod
+    def _run_scattered(step: dict, name: str, plan: dict, executor) -> dict:
+        """Run one step on every shard in parallel, then merge the shard outputs into the step's outputs."""
+        shard_steps = []
+        for steps in plan["steps"]:
+            if name not in steps:
+                raise ValueError(f"shard steps do not include {name}")
+            shard_steps.append(steps[name])
+
+        def _run_shard(idx: int) -> dict:
+            shard_dir = plan["dirs"][idx]
+            shard_step = shard_steps[idx]
+            stdout_path = shard_dir / "logs" / f"{name}.stdout.log"
+            stderr_path = shard_dir / "logs" / f"{name}.stderr.log"
+            resource_path = shard_dir / "logs" / f"{name}.time.log"
+            start = time.time()
+            rc = executor(
+                shard_step["cmd"],
+                cwd=shard_dir,
+                stdout_path=stdout_path,
+                stderr_path=stderr_path,
+                resource_path=resource_path,
+            )
+            return {
+                "shard": idx,
+                "reads": plan["counts"][idx],
+                "cmd": shard_step["cmd"],
+                "return_code": rc,
+                "elapsed_seconds": time.time() - start,
+                "stdout": str(stdout_path),
+                "stderr": str(stderr_path),
+                "resource_log": str(resource_path),
+                "resource": parse_time_log(resource_path),
+            }
+
+        start = time.time()
+        with ThreadPoolExecutor(max_workers=len(shard_steps)) as pool:
+            shard_records = list(pool.map(_run_shard, range(len(shard_steps))))
+        rc = next((record["return_code"] for record in shard_records if record["return_code"] != 0), 0)
+        gather_elapsed = 0.0
+        if rc == 0:
+            gather_start = time.time()
+            shard_outputs = [shard_step.get("outputs", {}) for shard_step in shard_steps]
+            gather_outputs(step["merge"], shard_outputs, step.get("outputs", {}), plan["counts"])
+            gather_elapsed = time.time() - gather_start
+            for outputs in shard_outputs:
+                for output in step["merge"]:
+                    if output in outputs:
+                        Path(outputs[output]).unlink(missing_ok=True)
+        return {
+            "name": name,
+            "cmd": step["cmd"],
+            "return_code": rc,
+            "elapsed_seconds": time.time() - start,
+            "gather_elapsed_seconds": gather_elapsed,
+            "scatter": len(shard_records),
+            "shard_threads": plan["threads"],
+            "shards": shard_records,
+            "resource": combine_parallel_resources(record["resource"] for record in shard_records),
+        }
+
+    def _write_variant_runs(
+        self,
+        *,
+        exp: dict,
+        dataset: dict,
+        tool,
+        meta: dict,
+        run_dir: Path,
+        variants: dict,
+        variant_outputs: dict,
+    ) -> list:
+        """Evaluate each variant output set (e.g. Bracken settings) as a sibling run `<exp>_<tag>`.
+
+        Variants come from one pipeline, so each sibling carries the parent's steps and timing.
+        """
+        sibling_dirs = []
+        for tag, outputs in variant_outputs.items():
+            sibling_name = f"{exp.get('name', 'exp')}_{tag}"
+            sibling_dir = ensure_run_dirs(self.runs_root, sibling_name, tool.name, meta["dataset"])
+            sibling_exp = {**exp, "name": sibling_name}
+            sibling_meta = {
+                **meta,
+                "exp": sibling_name,
+                "profile_dir": None,
+                "variant": {"tag": tag, **variants.get(tag, {})},
+                "parent_run": str(run_dir),
+                "outputs": outputs,
+            }
+            (sibling_dir / "meta.json").write_text(json.dumps(sibling_meta, indent=2))
+            metrics = build_run_metrics(sibling_exp, dataset, outputs, sibling_dir)
+            (sibling_dir / METRICS_FILENAME).write_text(json.dumps(metrics, indent=2))
+            sibling_dirs.append(str(sibling_dir))
+        return sibling_dirs
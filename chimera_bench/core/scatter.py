@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import shutil
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence, Tuple
+
+
+def _concat(sources: Sequence[Path], target: Path, weights: Sequence[int]) -> None:
+    with target.open("wb") as out:
+        for source in sources:
+            with source.open("rb") as fh:
+                shutil.copyfileobj(fh, out, 1 << 20)
+
+
+def _concat_header(sources: Sequence[Path], target: Path, weights: Sequence[int]) -> None:
+    """Concatenate, keeping a header line only once (shards repeat the first shard's first line)."""
+    header = None
+    with target.open("wb") as out:
+        for idx, source in enumerate(sources):
+            with source.open("rb") as fh:
+                first = fh.readline()
+                if idx == 0:
+                    header = first
+                    out.write(first)
+                elif first != header:
+                    out.write(first)
+                shutil.copyfileobj(fh, out, 1 << 20)
+
+
+def _kraken2_report(sources: Sequence[Path], target: Path, weights: Sequence[int]) -> None:
+    """Sum Kraken2 reports and rewrite them in Kraken2's tree order.
+
+    Clade and direct counts add up; percentages are recomputed. With minimizer columns,
+    minimizer counts are summed and distinct minimizers take the per-shard maximum (a lower bound).
+    """
+    counts: Dict[int, List[int]] = {}
+    info: Dict[int, Tuple[str, str, int]] = {}
+    children: Dict[int, List[int]] = {}
+    minimizer_columns = False
+    for source in sources:
+        stack: List[Tuple[int, int]] = []
+        with source.open("r", encoding="utf-8", errors="surrogateescape") as fh:
+            for raw in fh:
+                parts = raw.rstrip("\n").split("\t")
+                if len(parts) not in {6, 8}:
+                    continue
+                extra = len(parts) == 8
+                minimizer_columns = minimizer_columns or extra
+                name_field = parts[-1]
+                name = name_field.lstrip(" ")
+                depth = (len(name_field) - len(name)) // 2
+                try:
+                    taxid = int(parts[-2])
+                    values = [int(parts[1]), int(parts[2])]
+                    values += [int(parts[3]), int(parts[4])] if extra else [0, 0]
+                except ValueError:
+                    continue
+                entry = counts.setdefault(taxid, [0, 0, 0, 0])
+                entry[0] += values[0]
+                entry[1] += values[1]
+                entry[2] += values[2]
+                entry[3] = max(entry[3], values[3])
+                while stack and stack[-1][0] >= depth:
+                    stack.pop()
+                parent = stack[-1][1] if stack else None
+                if taxid not in info:
+                    info[taxid] = (parts[-3], name, depth)
+                    if taxid != 0:
+                        children.setdefault(parent, []).append(taxid)
+                stack.append((depth, taxid))
+
+    total = sum(counts[taxid][0] for taxid in children.get(None, [])) + counts.get(0, [0])[0]
+    lines: List[str] = []
+
+    def _line(taxid: int) -> str:
+        clade, direct, minimizers, distinct = counts[taxid]
+        rank, name, depth = info[taxid]
+        pct = 100.0 * clade / total if total else 0.0
+        fields = [f"{pct:6.2f}", str(clade), str(direct)]
+        if minimizer_columns:
+            fields += [str(minimizers), str(distinct)]
+        fields += [rank, str(taxid), "  " * depth + name]
+        return "\t".join(fields)
+
+    if 0 in counts:
+        lines.append(_line(0))
+    pending = sorted(children.get(None, []), key=lambda taxid: -counts[taxid][0])[::-1]
+    while pending:
+        taxid = pending.pop()
+        lines.append(_line(taxid))
+        pending.extend(sorted(children.get(taxid, []), key=lambda child: -counts[child][0])[::-1])
+    target.write_text("".join(f"{line}\n" for line in lines), encoding="utf-8", errors="surrogateescape")
+
+
+def _ganon_rep(sources: Sequence[Path], target: Path, weights: Sequence[int]) -> None:
+    """Sum ganon `.rep` match counts per (hierarchy, target) and the `#total_*` lines."""
+    rows: Dict[Tuple[str, ...], List[int]] = {}
+    totals: Dict[str, int] = {}
+    for source in sources:
+        with source.open("r", encoding="utf-8", errors="surrogateescape") as fh:
+            for raw in fh:
+                parts = raw.rstrip("\n").split("\t")
+                if parts[0].startswith("#") and len(parts) >= 2:
+                    try:
+                        totals[parts[0]] = totals.get(parts[0], 0) + int(parts[1])
+                    except ValueError:
+                        continue
+                    continue
+                if len(parts) < 5:
+                    continue
+                try:
+                    values = [int(value) for value in parts[2:5]]
+                except ValueError:
+                    continue
+                key = (parts[0], parts[1], *parts[5:])
+                entry = rows.setdefault(key, [0, 0, 0])
+                for idx, value in enumerate(values):
+                    entry[idx] += value
+    with target.open("w", encoding="utf-8", errors="surrogateescape") as out:
+        for key, values in rows.items():
+            out.write("\t".join([key[0], key[1], *map(str, values), *key[2:]]) + "\n")
+        for name, value in totals.items():
+            out.write(f"{name}\t{value}\n")
+
+
+def _weighted_profile(sources: Sequence[Path], target: Path, weights: Sequence[int]) -> None:
+    """Average abundance profiles (CAMI or `name<TAB>value`) weighted by shard read counts.
+
+    Header and comment lines come from the first shard. The value column is CAMI's
+    PERCENTAGE when declared, else the last column; the other columns identify the row.
+    """
+    header: List[str] = []
+    rows: Dict[Tuple[str, ...], float] = {}
+    total_weight = float(sum(weights)) or float(len(sources))
+    for idx, source in enumerate(sources):
+        weight = (weights[idx] if sum(weights) else 1) / total_weight
+        value_idx = None
+        with source.open("r", encoding="utf-8", errors="surrogateescape") as fh:
+            for raw in fh:
+                line = raw.rstrip("\n")
+                if not line.strip() or line.startswith("#") or line.startswith("@"):
+                    if line.startswith("@@"):
+                        upper = [token.strip().lstrip("@").upper() for token in line.split("\t")]
+                        value_idx = upper.index("PERCENTAGE") if "PERCENTAGE" in upper else None
+                    if idx == 0 and line.strip():
+                        header.append(line)
+                    continue
+                parts = line.split("\t")
+                pos = value_idx if value_idx is not None and value_idx < len(parts) else len(parts) - 1
+                try:
+                    value = float(parts[pos])
+                except ValueError:
+                    if idx == 0 and not rows:
+                        header.append(line)
+                    continue
+                key = tuple(parts[:pos] + ["\0"] + parts[pos + 1 :])
+                rows[key] = rows.get(key, 0.0) + value * weight
+    with target.open("w", encoding="utf-8", errors="surrogateescape") as out:
+        for line in header:
+            out.write(line + "\n")
+        for key, value in sorted(rows.items(), key=lambda item: -item[1]):
+            out.write("\t".join(f"{value:.6f}" if part == "\0" else part for part in key) + "\n")
+
+
+MERGERS: Dict[str, Callable[[Sequence[Path], Path, Sequence[int]], None]] = {
+    "concat": _concat,
+    "concat_header": _concat_header,
+    "kraken2_report": _kraken2_report,
+    "ganon_rep": _ganon_rep,
+    "weighted_profile": _weighted_profile,
+}
+
+
+def gather_outputs(
+    merge: Dict[str, str],
+    shard_outputs: Sequence[Dict[str, str]],
+    outputs: Dict[str, str],
+    weights: Sequence[int],
+) -> None:
+    """Merge each shard's outputs into the unsharded output paths using the step's `merge` map."""
+    for name, merger in merge.items():
+        if name not in outputs:
+            continue
+        if merger not in MERGERS:
+            raise ValueError(f"unsupported shard merger for {name}: {merger}")
+        sources = [Path(shard[name]) for shard in shard_outputs]
+        missing = [str(path) for path in sources if not path.exists()]
+        if missing:
+            raise FileNotFoundError(f"missing shard outputs for {name}: {', '.join(missing)}")
+        target = Path(outputs[name])
+        target.parent.mkdir(parents=True, exist_ok=True)
+        MERGERS[merger](sources, target, weights)
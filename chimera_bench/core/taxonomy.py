@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Tuple
+
+
+class CompiledTaxonomy:
+    """Array view of the taxonomy restricted to a set of taxids and all of their ancestors.
+
+    Nodes are indexed in postorder (every child before its parent), so subtree sums are a single
+    forward pass over `parent`. A node whose parent is itself or missing from the taxonomy is a
+    root with depth 0; `branch_length` is `1 / depth` (0 for roots).
+    """
+
+    def __init__(self, taxonomy: Dict[int, Tuple[int, str]], taxids: Iterable[int]) -> None:
+        depth: Dict[int, int] = {}
+        parent_of: Dict[int, int | None] = {}
+        for taxid in taxids:
+            if taxid in depth or taxid not in taxonomy:
+                continue
+            path: List[int] = []
+            current = taxid
+            seen = set()
+            while current not in depth and current not in seen:
+                seen.add(current)
+                path.append(current)
+                parent, _rank = taxonomy[current]
+                if parent == current or parent not in taxonomy:
+                    parent_of[current] = None
+                    depth[current] = 0
+                    path.pop()
+                    break
+                parent_of[current] = parent
+                current = parent
+            for node in reversed(path):
+                parent = parent_of[node]
+                depth[node] = depth.get(parent, -1) + 1 if parent is not None else 0
+
+        self.taxids: List[int] = sorted(depth, key=lambda node: (-depth[node], node))
+        self.index: Dict[int, int] = {taxid: idx for idx, taxid in enumerate(self.taxids)}
+        self.depth: List[int] = [depth[taxid] for taxid in self.taxids]
+        self.parent: List[int] = [
+            self.index[parent_of[taxid]] if parent_of[taxid] is not None else -1 for taxid in self.taxids
+        ]
+        self.rank: List[str] = [taxonomy[taxid][1] for taxid in self.taxids]
+        self.branch_length: List[float] = [1.0 / d if d > 0 else 0.0 for d in self.depth]
+
+    def __len__(self) -> int:
+        return len(self.taxids)
+
+    def __contains__(self, taxid: object) -> bool:
+        return taxid in self.index
+
+    def covers(self, taxids: Iterable[int], taxonomy: Dict[int, Tuple[int, str]]) -> bool:
+        return all(taxid in self.index or taxid not in taxonomy for taxid in taxids)
+
+    def ancestor_at_rank(self, taxid: int, rank: str) -> int | None:
+        """Nearest node at `rank` on the path to the root, including `taxid` itself."""
+        idx = self.index.get(taxid)
+        while idx is not None and idx >= 0:
+            if self.rank[idx] == rank:
+                return self.taxids[idx]
+            idx = self.parent[idx]
+        return None
+
+    def sparse_vector(self, profile: Dict[int, float]) -> Dict[int, float]:
+        """Normalize a taxid profile to relative abundance keyed by node index.
+
+        Taxa missing from the taxonomy still count towards the total, as in `_normalize_profile`.
+        """
+        cleaned = {taxid: float(value) for taxid, value in profile.items() if value > 0}
+        total = sum(cleaned.values())
+        if total <= 0:
+            return {}
+        vector: Dict[int, float] = {}
+        for taxid, value in cleaned.items():
+            idx = self.index.get(taxid)
+            if idx is not None:
+                vector[idx] = vector.get(idx, 0.0) + value / total
+        return vector
+
+    def subtree_masses(self, vector: Dict[int, float]) -> List[float]:
+        masses = [0.0] * len(self.taxids)
+        for idx, value in vector.items():
+            masses[idx] += value
+        parent = self.parent
+        for idx in range(len(masses)):
+            mass = masses[idx]
+            if mass:
+                up = parent[idx]
+                if up >= 0:
+                    masses[up] += mass
+        return masses
+
+
+# Keyed by id() but holding the taxonomy itself, so a reused id of an evicted dict never matches.
+# Bounded like the `load_taxonomy` caches that produce these dicts.
+_COMPILED_CACHE_SIZE = 16
+_COMPILED_CACHE: Dict[int, Tuple[Dict[int, Tuple[int, str]], CompiledTaxonomy]] = {}
+
+
+def compile_taxonomy(taxonomy: Dict[int, Tuple[int, str]], taxids: Iterable[int]) -> CompiledTaxonomy:
+    """Return a compiled view that covers `taxids`, reusing (and growing) the cached one."""
+    taxids = set(taxids)
+    cache_key = id(taxonomy)
+    cached = _COMPILED_CACHE.pop(cache_key, None)
+    compiled = cached[1] if cached is not None and cached[0] is taxonomy else None
+    if compiled is None or not compiled.covers(taxids, taxonomy):
+        if compiled is not None:
+            taxids.update(compiled.taxids)
+        compiled = CompiledTaxonomy(taxonomy, taxids)
+    # Re-inserted last, so the first entry is the least recently used.
+    _COMPILED_CACHE[cache_key] = (taxonomy, compiled)
+    while len(_COMPILED_CACHE) > _COMPILED_CACHE_SIZE:
+        del _COMPILED_CACHE[next(iter(_COMPILED_CACHE))]
+    return compiled
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from .taxonomy import CompiledTaxonomy, compile_taxonomy
+
+
+def _profile_taxids(profiles: Iterable[Dict[int, float]]) -> set[int]:
+    taxids: set[int] = set()
+    for profile in profiles:
+        taxids.update(taxid for taxid, value in profile.items() if value > 0)
+    return taxids
+
+
+def unifrac_distance(left: List[float], right: List[float], branch_length: List[float]) -> float:
+    return sum((bl * abs(a - b) for bl, a, b in zip(branch_length, left, right) if a != b), 0.0)
+
+
+def weighted_unifrac_masses(
+    profiles: Sequence[Dict[int, float]],
+    taxonomy: Dict[int, Tuple[int, str]],
+) -> tuple[CompiledTaxonomy, List[List[float]]]:
+    compiled = compile_taxonomy(taxonomy, _profile_taxids(profiles))
+    return compiled, [compiled.subtree_masses(compiled.sparse_vector(profile)) for profile in profiles]
+
+
+def weighted_unifrac_matrix(
+    profiles: Sequence[Dict[int, float]],
+    taxonomy: Dict[int, Tuple[int, str]],
+    pairs: Iterable[Tuple[int, int]] | None = None,
+) -> Dict[Tuple[int, int], float]:
+    """Weighted UniFrac (branch length 1/depth) for many profiles at once.
+
+    Subtree masses are computed once per profile over the shared compiled taxonomy, so each
+    requested pair costs one pass over the node array. Without `pairs` every i < j pair is returned.
+    """
+    compiled, masses = weighted_unifrac_masses(profiles, taxonomy)
+    if pairs is None:
+        pairs = ((i, j) for i in range(len(profiles)) for j in range(i + 1, len(profiles)))
+    return {(i, j): unifrac_distance(masses[i], masses[j], compiled.branch_length) for i, j in pairs}
+
+
+def weighted_unifrac_against(
+    truth: Dict[int, float],
+    predictions: Sequence[Dict[int, float]],
+    taxonomy: Dict[int, Tuple[int, str]],
+) -> List[float]:
+    pairs = [(0, j) for j in range(1, len(predictions) + 1)]
+    distances = weighted_unifrac_matrix([truth, *predictions], taxonomy, pairs)
+    return [distances[pair] for pair in pairs]
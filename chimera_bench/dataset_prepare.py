@@ -2,38 +2,61 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
-from typing import Dict, Iterable, Iterator, Tuple
+from typing import Dict, Iterable, List
 
+from .io.fingerprint import fingerprint_entry, fingerprint_matches
+from .io.records import format_fastq, iter_fastq_blocks
 
-def _iter_fastq_records(path: Path) -> Iterator[Tuple[str, str, str, str]]:
-    with path.open("r", encoding="utf-8", errors="strict") as fh:
-        while True:
-            header = fh.readline()
-            if not header:
-                return
-            seq = fh.readline()
-            plus = fh.readline()
-            qual = fh.readline()
-            if not seq or not plus or not qual:
-                raise ValueError(f"FASTQ record truncated: {path}")
-            yield header, seq, plus, qual
 
+def _read_name(header: bytes) -> bytes:
+    fields = header[1:].split(None, 1)
+    if not fields:
+        raise ValueError(f"Invalid FASTQ header: {header.decode('utf-8', 'replace')}")
+    return fields[0]
 
-def _read_name(header: str, prefix: str) -> str:
-    if not header.startswith(prefix):
-        raise ValueError(f"Invalid FASTQ header: {header.rstrip()}")
-    return header[1:].strip().split()[0]
 
+def _pair_base(name: bytes) -> tuple[bytes, bytes]:
+    if name.endswith((b"/1", b"/2")):
+        return name[:-2], name[-2:]
+    raise ValueError(f"FASTQ read does not end with /1 or /2: {name.decode('utf-8', 'replace')}")
 
-def _pair_base(name: str) -> tuple[str, str]:
-    if name.endswith("/1"):
-        return name[:-2], "/1"
-    if name.endswith("/2"):
-        return name[:-2], "/2"
-    raise ValueError(f"FASTQ read does not end with /1 or /2: {name}")
+
+def _check_pairs(source_path: Path, headers: List[bytes]) -> None:
+    """Raise unless the headers alternate `<name>/1`, `<name>/2` (an even count of them)."""
+    if len(headers) % 2:
+        raise ValueError(f"paired FASTQ mate missing in {source_path}")
+    try:
+        names = [header[1:].split(None, 1)[0] for header in headers]
+    except IndexError:
+        names = []
+    if names:
+        first, second = names[0::2], names[1::2]
+        # Names hold no whitespace, so `/1\n` can only match at the end of a name.
+        if (
+            (b"\n".join(first) + b"\n").count(b"/1\n") == len(first)
+            and (b"\n".join(second) + b"\n").count(b"/2\n") == len(second)
+            and [name[:-2] for name in first] == [name[:-2] for name in second]
+        ):
+            return
+    # Slow path, only to report the first bad pair.
+    for header1, header2 in zip(headers[0::2], headers[1::2]):
+        name1 = _read_name(header1)
+        name2 = _read_name(header2)
+        base1, suffix1 = _pair_base(name1)
+        base2, suffix2 = _pair_base(name2)
+        if suffix1 != b"/1" or suffix2 != b"/2" or base1 != base2:
+            raise ValueError(
+                f"invalid interleaved pair order in {source_path}: "
+                f"{name1.decode('utf-8', 'replace')} then {name2.decode('utf-8', 'replace')}"
+            )
 
 
 def _manifest_is_current(manifest_path: Path, outputs: Iterable[Path], inputs: Iterable[Path]) -> bool:
+    """Outputs exist and the inputs match the manifest.
+
+    Inputs match on their recorded stat signature or content fingerprint, so a copied or
+    re-mounted input tree still counts; older manifests without fingerprints compare paths.
+    """
     if not manifest_path.exists():
         return False
     if not all(path.exists() and path.stat().st_size > 0 for path in outputs):
@@ -42,6 +65,10 @@ def _manifest_is_current(manifest_path: Path, outputs: Iterable[Path], inputs: I
         manifest = json.loads(manifest_path.read_text())
     except json.JSONDecodeError:
         return False
+    inputs = list(inputs)
+    recorded = manifest.get("input_fingerprints")
+    if isinstance(recorded, list) and len(recorded) == len(inputs):
+        return all(fingerprint_matches(entry, path) for entry, path in zip(recorded, inputs))
     return manifest.get("inputs") == [str(path) for path in inputs]
 
 
@@ -52,8 +79,10 @@ def _write_manifest(
     outputs: Iterable[Path],
     records: int,
 ) -> None:
+    inputs = list(inputs)
     payload = {
         "inputs": [str(path) for path in inputs],
+        "input_fingerprints": [fingerprint_entry(path) for path in inputs],
         "outputs": [str(path) for path in outputs],
         "records": records,
     }
@@ -123,35 +152,16 @@ def prepare_dataset_inputs(dataset: Dict, *, force: bool = False) -> Dict:
     records = 0
     try:
         with (
-            tmp_outputs[0].open("w", encoding="utf-8") as r1_out,
-            tmp_outputs[1].open("w", encoding="utf-8") as r2_out,
+            tmp_outputs[0].open("wb") as r1_out,
+            tmp_outputs[1].open("wb") as r2_out,
         ):
             for source_path in interleaved:
-                record_iter = _iter_fastq_records(source_path)
-                while True:
-                    try:
-                        rec1 = next(record_iter)
-                    except StopIteration:
-                        break
-                    try:
-                        rec2 = next(record_iter)
-                    except StopIteration as exc:
-                        raise ValueError(f"paired FASTQ mate missing in {source_path}") from exc
-
-                    name1 = _read_name(rec1[0], "@")
-                    name2 = _read_name(rec2[0], "@")
-                    base1, suffix1 = _pair_base(name1)
-                    base2, suffix2 = _pair_base(name2)
-                    if suffix1 != "/1" or suffix2 != "/2" or base1 != base2:
-                        raise ValueError(
-                            f"invalid interleaved pair order in {source_path}: {name1} then {name2}"
-                        )
-                    if not rec1[2].startswith("+") or not rec2[2].startswith("+"):
-                        raise ValueError(f"invalid FASTQ plus line in {source_path}")
-
-                    r1_out.write("".join(rec1))
-                    r2_out.write("".join(rec2))
-                    records += 2
+                # Records are validated by the reader and split a block at a time; blocks keep mates together.
+                for headers, seqs, pluses, quals in iter_fastq_blocks(source_path, group=2):
+                    _check_pairs(source_path, headers)
+                    r1_out.write(format_fastq(headers[0::2], seqs[0::2], pluses[0::2], quals[0::2]))
+                    r2_out.write(format_fastq(headers[1::2], seqs[1::2], pluses[1::2], quals[1::2]))
+                    records += len(headers)
 
         for tmp, final in zip(tmp_outputs, paired):
             tmp.replace(final)
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import zlib
+from array import array
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict
+
+from .length_sketch import LengthSketch
+
+# 1: stats JSON plus the exact length histogram as (length, count) int64 pairs.
+# 2: adds the content `fingerprint` column.
+# 3: histograms are `LengthSketch`es (exact below SKETCH_EXACT_CUTOFF, binned above), packed
+#    as int64s: number of exact entries, (length, count) pairs, then (bin start, count, bases).
+SCHEMA_VERSION = 3
+# Version of the old `catalog_cache.json` payload that can be imported.
+LEGACY_JSON_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS files (
+    key TEXT PRIMARY KEY,
+    signature TEXT NOT NULL,
+    stats TEXT NOT NULL,
+    length_counts BLOB,
+    updated_at TEXT NOT NULL,
+    fingerprint TEXT
+);
+"""
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _pack_sketch(sketch: LengthSketch) -> bytes:
+    values = array("q", [len(sketch.exact)])
+    for length, count in sketch.exact.items():
+        values.extend((length, count))
+    for start, (count, bases) in sketch.bins.items():
+        values.extend((start, count, bases))
+    return zlib.compress(values.tobytes(), 6)
+
+
+def _unpack_sketch(blob: bytes) -> LengthSketch:
+    values = array("q")
+    values.frombytes(zlib.decompress(blob))
+    sketch = LengthSketch()
+    end = 1 + 2 * values[0]
+    for idx in range(1, end, 2):
+        sketch.exact[values[idx]] = values[idx + 1]
+    for idx in range(end, len(values), 3):
+        sketch.bins[values[idx]] = [values[idx + 1], values[idx + 2]]
+    return sketch
+
+
+def _unpack_v1_histogram(blob: bytes) -> Dict[int, int]:
+    values = array("q")
+    values.frombytes(zlib.decompress(blob))
+    return {values[idx]: values[idx + 1] for idx in range(0, len(values), 2)}
+
+
+class CatalogCache:
+    """Scan results keyed by file path (or `group:` key), stored in SQLite.
+
+    Every `put` commits on its own, so an interrupted catalog keeps what it scanned and
+    several processes can share one cache (WAL journal, waits on locks). Length sketches
+    are stored packed and compressed beside the JSON stats. Entries may carry a content
+    fingerprint (`io/fingerprint.py`, computed with `fingerprint_mode`) so copied or touched
+    files can still be found. A `catalog_cache.json` next to the database is imported once
+    when the database is created.
+    """
+
+    def __init__(self, path: Path, *, fingerprint_mode: str = "sample", timeout: float = 60.0) -> None:
+        self.path = Path(path)
+        self.fingerprint_mode = fingerprint_mode
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=timeout)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.executescript(_SCHEMA)
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+            if row is None:
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO meta (key, value) VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),)
+                )
+            elif int(row[0]) != SCHEMA_VERSION:
+                version = int(row[0])
+                if version == 1:
+                    self._conn.execute("ALTER TABLE files ADD COLUMN fingerprint TEXT")
+                if version in {1, 2}:
+                    self._convert_histograms()
+                else:
+                    self._conn.execute("DELETE FROM files")
+                self._conn.execute("UPDATE meta SET value = ? WHERE key = 'schema_version'", (str(SCHEMA_VERSION),))
+            self._conn.execute("CREATE INDEX IF NOT EXISTS files_fingerprint ON files (fingerprint)")
+        self._migrate_json(self.path.with_suffix(".json"))
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "CatalogCache":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    @staticmethod
+    def _entry(row: tuple) -> Dict[str, Any] | None:
+        key, signature, stats_json, blob, updated_at, fingerprint = row
+        try:
+            stats = json.loads(stats_json)
+        except json.JSONDecodeError:
+            return None
+        if blob is not None:
+            stats["length_sketch"] = _unpack_sketch(blob).to_dict()
+        return {"key": key, "signature": signature, "stats": stats, "updated_at": updated_at, "fingerprint": fingerprint}
+
+    def get(self, key: str) -> Dict[str, Any] | None:
+        """`{"key", "signature", "stats", "updated_at", "fingerprint"}` for `key`, or None."""
+        row = self._conn.execute(
+            "SELECT key, signature, stats, length_counts, updated_at, fingerprint FROM files WHERE key = ?", (key,)
+        ).fetchone()
+        return self._entry(row) if row is not None else None
+
+    def find_fingerprint(self, fingerprint: str) -> list[Dict[str, Any]]:
+        """Entries recorded with this content fingerprint, newest first (under any path)."""
+        rows = self._conn.execute(
+            "SELECT key, signature, stats, length_counts, updated_at, fingerprint FROM files "
+            "WHERE fingerprint = ? ORDER BY updated_at DESC",
+            (fingerprint,),
+        ).fetchall()
+        return [entry for entry in map(self._entry, rows) if entry is not None]
+
+    def get_meta(self, key: str) -> str | None:
+        """Free-form cache metadata, e.g. per-host scan engine calibrations."""
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row is not None else None
+
+    def set_meta(self, key: str, value: str) -> None:
+        with self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def put(self, key: str, *, signature: str, stats: Dict[str, Any], fingerprint: str | None = None) -> None:
+        with self._conn:
+            self._write(key, signature, stats, _now_iso(), fingerprint)
+
+    def _write(
+        self, key: str, signature: str, stats: Dict[str, Any], updated_at: str, fingerprint: str | None = None
+    ) -> None:
+        stats = dict(stats)
+        sketch = stats.pop("length_sketch", None)
+        length_counts = stats.pop("length_counts", None)
+        if isinstance(sketch, dict):
+            blob = _pack_sketch(LengthSketch.from_dict(sketch))
+        elif isinstance(length_counts, dict):
+            blob = _pack_sketch(LengthSketch.from_counts(length_counts))
+        else:
+            blob = None
+        self._conn.execute(
+            "INSERT OR REPLACE INTO files (key, signature, stats, length_counts, updated_at, fingerprint) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (key, signature, json.dumps(stats, sort_keys=True), blob, updated_at, fingerprint),
+        )
+
+    def _convert_histograms(self) -> None:
+        """Rewrite exact (schema 1/2) histograms as length sketches."""
+        rows = self._conn.execute("SELECT key, length_counts FROM files WHERE length_counts IS NOT NULL").fetchall()
+        for key, blob in rows:
+            sketch = LengthSketch.from_counts(_unpack_v1_histogram(blob))
+            self._conn.execute("UPDATE files SET length_counts = ? WHERE key = ?", (_pack_sketch(sketch), key))
+
+    def _migrate_json(self, json_path: Path) -> None:
+        with self._conn:
+            # BEGIN IMMEDIATE so two processes opening a fresh cache do not both import it.
+            self._conn.execute("BEGIN IMMEDIATE")
+            done = self._conn.execute("SELECT value FROM meta WHERE key = 'json_migrated'").fetchone()
+            if done is not None:
+                return
+            self._conn.execute("INSERT INTO meta (key, value) VALUES ('json_migrated', ?)", (_now_iso(),))
+            if not json_path.exists():
+                return
+            try:
+                payload = json.loads(json_path.read_text())
+            except (OSError, json.JSONDecodeError):
+                return
+            if not isinstance(payload, dict) or payload.get("version") != LEGACY_JSON_VERSION:
+                return
+            files = payload.get("files")
+            if not isinstance(files, dict):
+                return
+            for key, entry in files.items():
+                if not isinstance(entry, dict) or not isinstance(entry.get("stats"), dict):
+                    continue
+                self._write(str(key), str(entry.get("signature", "")), entry["stats"], str(entry.get("updated_at") or _now_iso()))
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+
+FINGERPRINT_MODES = ("none", "sample", "full")
+_SAMPLE_BLOCK = 1 << 16
+_SAMPLE_STRIDES = 14
+
+
+def stat_signature(path: Path) -> str:
+    """`size:mtime_ns`; cheap, but changes when a file is copied or touched."""
+    stat = Path(path).stat()
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def content_fingerprint(path: Path, mode: str = "sample") -> str | None:
+    """Fingerprint of a file's bytes that survives copies, re-mounts and `touch`.
+
+    `sample` hashes the size plus 64 KiB blocks at the head, the tail and evenly spaced
+    offsets in between (the whole file when it is small); `full` hashes every byte.
+    `none` returns None. Fingerprints from different modes never compare equal.
+    """
+    if mode == "none":
+        return None
+    if mode not in FINGERPRINT_MODES:
+        raise ValueError(f"unknown fingerprint mode: {mode}")
+    path = Path(path)
+    size = path.stat().st_size
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(size).encode("ascii"))
+    with path.open("rb") as fh:
+        if mode == "full" or size <= _SAMPLE_BLOCK * (_SAMPLE_STRIDES + 2):
+            for block in iter(lambda: fh.read(1 << 20), b""):
+                digest.update(block)
+        else:
+            offsets = [0, *(size * idx // (_SAMPLE_STRIDES + 1) for idx in range(1, _SAMPLE_STRIDES + 1))]
+            offsets.append(size - _SAMPLE_BLOCK)
+            for offset in offsets:
+                fh.seek(offset)
+                digest.update(fh.read(_SAMPLE_BLOCK))
+    return f"{mode}:{size}:{digest.hexdigest()}"
+
+
+def fingerprint_entry(path: Path, mode: str = "sample") -> dict[str, str | None]:
+    """Both fingerprints of a file, as recorded in manifests and caches."""
+    return {"signature": stat_signature(path), "content": content_fingerprint(path, mode)}
+
+
+def fingerprint_matches(recorded: dict | None, path: Path) -> bool:
+    """True when `path` matches a `fingerprint_entry` on either its stat signature or its content."""
+    if not isinstance(recorded, dict) or not Path(path).exists():
+        return False
+    if recorded.get("signature") == stat_signature(path):
+        return True
+    content = recorded.get("content")
+    return bool(content) and content == content_fingerprint(path, str(content).split(":", 1)[0])
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from collections import Counter
+from typing import Any, Dict, Iterable, List
+
+# Lengths below the cutoff are counted exactly. Longer lengths fall into bins whose width is
+# a power of two at most 2**-SKETCH_SUB_BITS of their lower bound (< 0.1%), each keeping its
+# read count and exact base sum. Changing either constant requires a catalog cache version bump.
+SKETCH_EXACT_CUTOFF = 1 << 14
+SKETCH_SUB_BITS = 10
+
+
+def _bin_start(length: int) -> int:
+    shift = length.bit_length() - 1 - SKETCH_SUB_BITS
+    return (length >> shift) << shift
+
+
+def bin_width(start: int) -> int:
+    return 1 << (start.bit_length() - 1 - SKETCH_SUB_BITS)
+
+
+class LengthSketch:
+    """Mergeable read-length histogram with bounded size.
+
+    Record counts, total bases, min and max are tracked by the scanners, so mean, min and max
+    stay exact. `n50` is exact when it falls below the cutoff and otherwise within one bin
+    (relative error < 2**-SKETCH_SUB_BITS).
+    """
+
+    def __init__(self) -> None:
+        self.exact: Dict[int, int] = {}
+        self.bins: Dict[int, List[int]] = {}
+
+    def add(self, length: int, count: int = 1) -> None:
+        if length < SKETCH_EXACT_CUTOFF:
+            self.exact[length] = self.exact.get(length, 0) + count
+            return
+        entry = self.bins.setdefault(_bin_start(length), [0, 0])
+        entry[0] += count
+        entry[1] += length * count
+
+    def update(self, lengths: Iterable[int]) -> None:
+        for length, count in Counter(lengths).items():
+            self.add(length, count)
+
+    def merge(self, other: "LengthSketch") -> None:
+        for length, count in other.exact.items():
+            self.exact[length] = self.exact.get(length, 0) + count
+        for start, (count, bases) in other.bins.items():
+            entry = self.bins.setdefault(start, [0, 0])
+            entry[0] += count
+            entry[1] += bases
+
+    def n50(self, total_bases: int) -> int:
+        if total_bases <= 0:
+            return 0
+        threshold = total_bases / 2
+        running = 0
+        for start in sorted(self.bins, reverse=True):
+            count, bases = self.bins[start]
+            running += bases
+            if running >= threshold:
+                # Inside a bin only the mean length is known; it lies within the bin's bounds.
+                return min(max(round(bases / count), start), start + bin_width(start) - 1)
+        for length in sorted(self.exact, reverse=True):
+            running += length * self.exact[length]
+            if running >= threshold:
+                return length
+        return 0
+
+    def scaled(self, factor: float) -> "LengthSketch":
+        """Copy with counts and bases multiplied by `factor` (rounded), e.g. to extrapolate a sample."""
+        sketch = LengthSketch()
+        sketch.exact = {length: round(count * factor) for length, count in self.exact.items()}
+        sketch.bins = {start: [round(count * factor), round(bases * factor)] for start, (count, bases) in self.bins.items()}
+        return sketch
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, LengthSketch) and self.exact == other.exact and self.bins == other.bins
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "exact": {str(length): count for length, count in self.exact.items()},
+            "bins": {str(start): list(entry) for start, entry in self.bins.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LengthSketch":
+        sketch = cls()
+        for length, count in (data.get("exact") or {}).items():
+            sketch.exact[int(length)] = int(count)
+        for start, (count, bases) in (data.get("bins") or {}).items():
+            sketch.bins[int(start)] = [int(count), int(bases)]
+        return sketch
+
+    @classmethod
+    def from_counts(cls, length_counts: Dict[Any, Any]) -> "LengthSketch":
+        """Sketch of an exact `{length: count}` histogram (the pre-sketch cache format)."""
+        sketch = cls()
+        for length, count in length_counts.items():
+            sketch.add(int(length), int(count))
+        return sketch
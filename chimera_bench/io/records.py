@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import gzip
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Tuple
+
+BLOCK_BYTES = 1 << 22
+
+Decompressor = Callable[[Path], BinaryIO]
+
+
+def _open_gzip(path: Path) -> BinaryIO:
+    return gzip.open(path, "rb")
+
+
+# Binary opener per file suffix. Callers may pass their own `decompressor` (e.g. a pigz or
+# zstd pipe) instead; anything returning a readable binary file object works.
+DECOMPRESSORS: Dict[str, Decompressor] = {".gz": _open_gzip}
+
+
+# Four parallel column lists: headers, sequences, plus lines and qualities.
+FastqColumns = Tuple[List[bytes], List[bytes], List[bytes], List[bytes]]
+
+
+def open_sequence_bytes(path: Path, *, decompressor: Decompressor | None = None) -> BinaryIO:
+    """Binary stream of the decompressed content of `path`."""
+    path = Path(path)
+    if decompressor is None:
+        decompressor = DECOMPRESSORS.get(path.suffix)
+    return decompressor(path) if decompressor is not None else path.open("rb")
+
+
+def _strip_cr(lines: List[bytes]) -> List[bytes]:
+    return [line[:-1] if line.endswith(b"\r") else line for line in lines]
+
+
+def iter_line_blocks(
+    path: Path,
+    start: int = 0,
+    end: int | None = None,
+    *,
+    decompressor: Decompressor | None = None,
+    block_bytes: int = BLOCK_BYTES,
+) -> Iterator[List[bytes]]:
+    """Complete lines (without `\\n` or `\\r\\n`) in large blocks, optionally for a byte range."""
+    remaining = None if end is None else end - start
+    tail = b""
+    with open_sequence_bytes(path, decompressor=decompressor) as fh:
+        if start:
+            fh.seek(start)
+        while True:
+            size = block_bytes if remaining is None else min(block_bytes, remaining)
+            data = fh.read(size) if size > 0 else b""
+            if not data:
+                break
+            if remaining is not None:
+                remaining -= len(data)
+            buf = tail + data
+            lines = buf.split(b"\n")
+            tail = lines.pop()
+            if lines:
+                yield _strip_cr(lines) if b"\r" in buf else lines
+    if tail:
+        yield _strip_cr([tail])
+
+
+def _all_start_with(lines: List[bytes], prefix: bytes) -> bool:
+    # Lines hold no newline, so counting `\n<prefix>` checks every line in one C-level pass.
+    return (b"\n" + b"\n".join(lines)).count(b"\n" + prefix) == len(lines)
+
+
+def _check_fastq_block(
+    path: Path, headers: List[bytes], seqs: List[bytes], pluses: List[bytes], quals: List[bytes]
+) -> None:
+    if not all(seqs) or not all(quals):
+        raise ValueError(f"FASTQ record truncated: {path}")
+    if not _all_start_with(headers, b"@") or not _all_start_with(pluses, b"+"):
+        raise ValueError(f"invalid FASTQ record: {path}")
+    if list(map(len, seqs)) != list(map(len, quals)):
+        raise ValueError(f"FASTQ sequence/quality length mismatch: {path}")
+
+
+def iter_fastq_blocks(
+    path: Path,
+    start: int = 0,
+    end: int | None = None,
+    *,
+    decompressor: Decompressor | None = None,
+    block_bytes: int = BLOCK_BYTES,
+    group: int = 1,
+) -> Iterator[FastqColumns]:
+    """Validated FASTQ records as column lists (headers, seqs, pluses, quals), one block at a time.
+
+    Lines are bytes without their line endings. Suited to bulk work: each column can be
+    joined, counted or rewritten without a Python loop per record. Blocks hold a multiple
+    of `group` records (2 keeps interleaved mates together) except possibly the last one.
+    `start` must be a record start.
+    """
+    step = 4 * group
+    pending: List[bytes] = []
+    for block in iter_line_blocks(path, start, end, decompressor=decompressor, block_bytes=block_bytes):
+        lines = pending + block if pending else block
+        usable = len(lines) - len(lines) % step
+        pending = lines[usable:]
+        if not usable:
+            continue
+        columns = (lines[0:usable:4], lines[1:usable:4], lines[2:usable:4], lines[3:usable:4])
+        _check_fastq_block(path, *columns)
+        yield columns
+    if len(pending) % 4:
+        raise ValueError(f"FASTQ record truncated: {path}")
+    if pending:
+        columns = (pending[0::4], pending[1::4], pending[2::4], pending[3::4])
+        _check_fastq_block(path, *columns)
+        yield columns
+
+
+def iter_fastq(
+    path: Path, *, decompressor: Decompressor | None = None, block_bytes: int = BLOCK_BYTES
+) -> Iterator[Tuple[bytes, bytes, bytes, bytes]]:
+    """Validated FASTQ records as (header, seq, plus, qual) bytes, read in large blocks."""
+    for columns in iter_fastq_blocks(path, decompressor=decompressor, block_bytes=block_bytes):
+        yield from zip(*columns)
+
+
+def format_fastq(
+    headers: Iterable[bytes], seqs: Iterable[bytes], pluses: Iterable[bytes], quals: Iterable[bytes]
+) -> bytes:
+    """FASTQ text for parallel columns, every line ending in `\\n`; empty for no records."""
+    headers = list(headers)
+    if not headers:
+        return b""
+    # Interleaving by slice assignment is much cheaper than chaining per-record tuples.
+    lines = [b""] * (4 * len(headers))
+    lines[0::4] = headers
+    lines[1::4] = seqs
+    lines[2::4] = pluses
+    lines[3::4] = quals
+    return b"\n".join(lines) + b"\n"
+
+
+def sniff_format(path: Path, *, decompressor: Decompressor | None = None) -> str | None:
+    """`fastq` or `fasta` from the first non-blank byte; None for an empty file."""
+    with open_sequence_bytes(path, decompressor=decompressor) as fh:
+        while True:
+            chunk = fh.read(1 << 16)
+            if not chunk:
+                return None
+            stripped = chunk.lstrip()
+            if stripped:
+                break
+    if stripped.startswith(b"@"):
+        return "fastq"
+    if stripped.startswith(b">"):
+        return "fasta"
+    raise ValueError(f"unrecognized read file format: {path}")
+
+
+def iter_fasta_blocks(
+    path: Path, *, decompressor: Decompressor | None = None, block_bytes: int = BLOCK_BYTES
+) -> Iterator[List[Tuple[bytes, List[bytes]]]]:
+    """FASTA records as (header, sequence lines) lists, one block at a time; blank lines are dropped."""
+    header: bytes | None = None
+    seq_lines: List[bytes] = []
+    for block in iter_line_blocks(path, decompressor=decompressor, block_bytes=block_bytes):
+        records: List[Tuple[bytes, List[bytes]]] = []
+        for line in block:
+            if line.startswith(b">"):
+                if header is not None:
+                    records.append((header, seq_lines))
+                header = line
+                seq_lines = []
+            elif header is not None:
+                if line.strip():
+                    seq_lines.append(line)
+            elif line.strip():
+                raise ValueError(f"invalid FASTA record: {path}")
+        if records:
+            yield records
+    if header is not None:
+        yield [(header, seq_lines)]
+
+
+def iter_record_blocks(
+    path: Path, *, decompressor: Decompressor | None = None, block_bytes: int = BLOCK_BYTES
+) -> Iterator[Tuple[str, List[bytes]]]:
+    """(format, records) per block of a FASTQ or FASTA file, each record its lines joined by `\\n`.
+
+    For code that moves whole records around (sharding, batching) without looking inside them;
+    records lack the final newline, so `b"\\n".join(records) + b"\\n"` writes a block back.
+    """
+    fmt = sniff_format(path, decompressor=decompressor)
+    if fmt == "fastq":
+        for columns in iter_fastq_blocks(path, decompressor=decompressor, block_bytes=block_bytes):
+            yield fmt, list(map(b"\n".join, zip(*columns)))
+    elif fmt == "fasta":
+        for records in iter_fasta_blocks(path, decompressor=decompressor, block_bytes=block_bytes):
+            yield fmt, [b"\n".join([header, *lines]) for header, lines in records]
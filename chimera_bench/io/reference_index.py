@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import re
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from .fingerprint import stat_signature
+
+_ACCESSION_RE = re.compile(r"(GC[AF]_\d+\.\d+)")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    source_id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    signature TEXT NOT NULL,
+    summaries TEXT NOT NULL,
+    built_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS genomes (
+    source_id INTEGER NOT NULL,
+    ord INTEGER NOT NULL,
+    accession TEXT,
+    taxid TEXT,
+    species_taxid TEXT,
+    genome_size INTEGER,
+    contig_count INTEGER,
+    raw_path TEXT NOT NULL,
+    path TEXT NOT NULL,
+    file_size INTEGER,
+    PRIMARY KEY (source_id, ord)
+);
+CREATE INDEX IF NOT EXISTS genomes_accession ON genomes (source_id, accession);
+"""
+_GENOME_COLUMNS = (
+    "accession",
+    "taxid",
+    "species_taxid",
+    "genome_size",
+    "contig_count",
+    "raw_path",
+    "path",
+    "file_size",
+)
+
+
+def accession_from_name(name: str | Path) -> str | None:
+    """`GCF_/GCA_<digits>.<version>` from a genome file name, or None."""
+    match = _ACCESSION_RE.search(Path(name).name)
+    return match.group(1) if match else None
+
+
+def read_target_entries(target_path: Path, limit: int | None = None) -> List[Tuple[str, Path, str | None]]:
+    """(path as written, resolved path, taxid or None) for each row (or the first `limit`) of a target TSV."""
+    entries: List[Tuple[str, Path, str | None]] = []
+    with target_path.open("r", encoding="utf-8", errors="ignore") as fh:
+        for raw in fh:
+            line = raw.strip()
+            if not line or line.startswith("#"):
+                continue
+            parts = line.split("\t")
+            path = Path(parts[0])
+            if not path.is_absolute():
+                path = (target_path.parent / path).resolve()
+            entries.append((parts[0], path, parts[1] if len(parts) >= 2 else None))
+            if limit is not None and len(entries) >= limit:
+                break
+    return entries
+
+
+def assembly_summary_candidates(target_path: Path, genome_paths: List[Path]) -> List[Path]:
+    """`assembly_summary*.txt` next to the target TSV or above the first genome, nearest first."""
+    roots = [target_path.parent, *(genome_paths[0].parents if genome_paths else [])]
+    candidates: List[Path] = []
+    seen: set[Path] = set()
+    for root in roots:
+        for path in sorted(root.glob("assembly_summary*.txt")):
+            if path not in seen:
+                seen.add(path)
+                candidates.append(path)
+    return candidates
+
+
+def _parse_int(value: str) -> int:
+    return int(value.strip().replace(",", ""))
+
+
+def _load_assembly_rows(summary_path: Path, accessions: set[str]) -> Dict[str, Tuple[str, int, int]]:
+    rows: Dict[str, Tuple[str, int, int]] = {}
+    with summary_path.open("r", encoding="utf-8", errors="ignore") as fh:
+        for raw in fh:
+            if not raw.strip() or raw.startswith("#"):
+                continue
+            parts = raw.rstrip("\n").split("\t")
+            if len(parts) < 31 or parts[0] not in accessions or parts[0] in rows:
+                continue
+            try:
+                rows[parts[0]] = (parts[6], _parse_int(parts[25]), _parse_int(parts[30]))
+            except ValueError:
+                continue
+            if len(rows) == len(accessions):
+                break
+    return rows
+
+
+def _file_size(path: Path) -> int | None:
+    try:
+        return path.stat().st_size
+    except OSError:
+        return None
+
+
+class ReferenceIndex:
+    """Per-genome metadata of reference target TSVs, stored in SQLite.
+
+    A source is one target TSV plus the assembly summaries it is resolved against; it is
+    rebuilt only when the signature of any of those files changes. Rows keep the target
+    order and hold the accession, target taxid, species taxid, genome size, contig count,
+    path and file size (None where the summary or the file is missing). Genome files are
+    not part of the signature, so file sizes are re-checked with a stat pass on every
+    `ensure(sizes=True)` rather than trusted from the build. `:memory:` gives a throwaway index.
+    """
+
+    def __init__(self, path: Path | str = ":memory:", *, timeout: float = 60.0) -> None:
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), timeout=timeout)
+        if str(path) != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._conn:
+            self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "ReferenceIndex":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def ensure(
+        self, target_tsv: Path, assembly_summaries: List[Path] | None = None, *, jobs: int = 16, sizes: bool = True
+    ) -> int:
+        """Source id for `target_tsv`, (re)building it when the inputs changed.
+
+        Without explicit `assembly_summaries`, candidates are discovered as the catalog does;
+        earlier summaries win for accessions listed in several. `sizes=False` skips the stat
+        pass over the genome files for callers that only need taxids; `file_size` may then be
+        stale or None.
+        """
+        target_tsv = Path(target_tsv).resolve()
+        if assembly_summaries is None:
+            # Discovery only looks above the first genome, so the signature check needs one row.
+            first = read_target_entries(target_tsv, limit=1)
+            summaries = assembly_summary_candidates(target_tsv, [path for _raw, path, _taxid in first])
+        else:
+            summaries = [Path(path).resolve() for path in assembly_summaries]
+        key = "|".join([str(target_tsv), *map(str, summaries)]) if assembly_summaries is not None else str(target_tsv)
+        signature = "|".join(f"{path}:{stat_signature(path)}" for path in [target_tsv, *summaries])
+        row = self._conn.execute("SELECT source_id, signature FROM sources WHERE key = ?", (key,)).fetchone()
+        if row is not None and row[1] == signature:
+            source_id = int(row[0])
+            if sizes:
+                self._refresh_file_sizes(source_id, jobs=jobs)
+            return source_id
+
+        entries = read_target_entries(target_tsv)
+        accessions = [accession_from_name(path) for _raw, path, _taxid in entries]
+        wanted = {accession for accession in accessions if accession}
+        assembly_rows: Dict[str, Tuple[str, int, int]] = {}
+        used: List[str] = []
+        for summary in summaries:
+            if len(assembly_rows) == len(wanted):
+                break
+            rows = _load_assembly_rows(summary, wanted - set(assembly_rows))
+            if rows:
+                assembly_rows.update(rows)
+                used.append(str(summary))
+        with self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            if row is not None:
+                source_id = int(row[0])
+                self._conn.execute("DELETE FROM genomes WHERE source_id = ?", (source_id,))
+                self._conn.execute(
+                    "UPDATE sources SET signature = ?, summaries = ?, built_at = ? WHERE source_id = ?",
+                    (signature, "|".join(used), datetime.now(timezone.utc).isoformat(), source_id),
+                )
+            else:
+                cursor = self._conn.execute(
+                    "INSERT INTO sources (key, signature, summaries, built_at) VALUES (?, ?, ?, ?)",
+                    (key, signature, "|".join(used), datetime.now(timezone.utc).isoformat()),
+                )
+                source_id = int(cursor.lastrowid)
+            self._conn.executemany(
+                "INSERT INTO genomes (source_id, ord, accession, taxid, species_taxid, genome_size, contig_count, "
+                "raw_path, path, file_size) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        source_id,
+                        idx,
+                        accession,
+                        taxid,
+                        *(assembly_rows.get(accession) or (None, None, None)),
+                        raw_path,
+                        str(path),
+                        None,
+                    )
+                    for idx, ((raw_path, path, taxid), accession) in enumerate(zip(entries, accessions))
+                ],
+            )
+        if sizes:
+            self._refresh_file_sizes(source_id, jobs=jobs)
+        return source_id
+
+    def _refresh_file_sizes(self, source_id: int, *, jobs: int) -> None:
+        rows = self._conn.execute(
+            "SELECT ord, path, file_size FROM genomes WHERE source_id = ? ORDER BY ord", (source_id,)
+        ).fetchall()
+        with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+            sizes = list(pool.map(_file_size, [Path(path) for _ord, path, _size in rows]))
+        # A missing file stores None, which the catalog reports as FileNotFoundError.
+        changed = [(size, source_id, ord_) for (ord_, _path, old), size in zip(rows, sizes) if size != old]
+        if changed:
+            with self._conn:
+                self._conn.executemany("UPDATE genomes SET file_size = ? WHERE source_id = ? AND ord = ?", changed)
+
+    def summaries(self, source_id: int) -> List[str]:
+        """Assembly summaries that contributed rows to a source."""
+        row = self._conn.execute("SELECT summaries FROM sources WHERE source_id = ?", (source_id,)).fetchone()
+        return [value for value in (row[0] if row else "").split("|") if value]
+
+    def genomes(self, source_id: int) -> List[Dict[str, Any]]:
+        rows = self._conn.execute(
+            f"SELECT {', '.join(_GENOME_COLUMNS)} FROM genomes WHERE source_id = ? ORDER BY ord", (source_id,)
+        ).fetchall()
+        return [dict(zip(_GENOME_COLUMNS, row)) for row in rows]
+
+    def lookup(self, source_id: int, accession: str) -> Dict[str, Any] | None:
+        row = self._conn.execute(
+            f"SELECT {', '.join(_GENOME_COLUMNS)} FROM genomes WHERE source_id = ? AND accession = ? ORDER BY ord",
+            (source_id, accession),
+        ).fetchone()
+        return dict(zip(_GENOME_COLUMNS, row)) if row is not None else None
+
+    def accession_map(self, source_id: int, field: str = "taxid") -> Dict[str, str]:
+        """`{accession: field}` for every row with both set (first row wins), for bulk lookups."""
+        if field not in _GENOME_COLUMNS:
+            raise ValueError(f"unknown reference index field: {field}")
+        mapping: Dict[str, str] = {}
+        for accession, value in self._conn.execute(
+            f"SELECT accession, {field} FROM genomes WHERE source_id = ? ORDER BY ord", (source_id,)
+        ):
+            if accession and value is not None and accession not in mapping:
+                mapping[accession] = value
+        return mapping
@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+from contextlib import ExitStack
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Tuple
+
+from .records import format_fastq, iter_fastq_blocks, iter_record_blocks, sniff_format
+
+
+def _deal_records(path: Path, handles: List[BinaryIO], pos: int) -> int:
+    """Write the records of `path` round-robin to `handles`, the first to `handles[pos % n]`.
+
+    Returns the position after the last record.
+    """
+    shards = len(handles)
+    for _fmt, records in iter_record_blocks(path):
+        for idx, handle in enumerate(handles):
+            part = records[(idx - pos) % shards :: shards]
+            if part:
+                handle.write(b"\n".join(part) + b"\n")
+        pos += len(records)
+    return pos
+
+
+def _shard_name(path: Path, file_idx: int, idx: int) -> str:
+    name = path.name[: -len(".gz")] if path.name.endswith(".gz") else path.name
+    return f"shard{idx:02d}.{file_idx}.{name}"
+
+
+def split_reads(dataset: Dict, shards: int, out_dir: Path) -> Tuple[List[Dict], List[int]]:
+    """Split a dataset's read files into `shards` record-aligned datasets under `out_dir`.
+
+    Records are dealt round-robin, so mates of paired files stay in the same shard and at
+    the same position. Returns the shard datasets and the number of records (or pairs) in each.
+    """
+    if shards < 1:
+        raise ValueError(f"shards must be >= 1: {shards}")
+    if "reads" in dataset:
+        key = "reads"
+    elif "paired" in dataset:
+        key = "paired"
+    else:
+        raise ValueError("dataset must define reads or paired")
+    inputs = [Path(path) for path in dataset[key]]
+    out_dir = Path(out_dir).resolve()
+    out_dir.mkdir(parents=True, exist_ok=True)
+    shard_files: List[List[str]] = [[] for _ in range(shards)]
+
+    with ExitStack() as stack:
+        totals = []
+        pos = 0
+        for file_idx, path in enumerate(inputs):
+            handles = []
+            for idx in range(shards):
+                shard_path = out_dir / _shard_name(path, file_idx, idx)
+                shard_files[idx].append(str(shard_path))
+                handles.append(stack.enter_context(shard_path.open("wb")))
+            # Mates are dealt from position 0 in every paired file, so they land side by side.
+            start = 0 if key == "paired" else pos
+            pos = _deal_records(path, handles, start)
+            totals.append(pos - start)
+    if key == "paired" and len(set(totals)) > 1:
+        raise ValueError("paired read files have different record counts")
+    total = totals[0] if key == "paired" else sum(totals)
+    counts = [len(range(idx, total, shards)) for idx in range(shards)]
+
+    shard_datasets = []
+    for idx in range(shards):
+        shard = {name: value for name, value in dataset.items() if name not in {"reads", "paired"}}
+        shard[key] = shard_files[idx]
+        shard["name"] = f"{dataset.get('name', 'dataset')}.shard{idx:02d}"
+        shard_datasets.append(shard)
+    return shard_datasets, counts
+
+
+def _write_tagged(path: Path, tag: bytes, out: BinaryIO) -> int:
+    """Append the records of `path` to `out` with `tag` after each header marker; returns the record count."""
+    count = 0
+    if sniff_format(path) == "fastq":
+        for headers, seqs, pluses, quals in iter_fastq_blocks(path):
+            # Headers are validated to start with "@" and hold no newline, so one replace tags them all.
+            tagged = (b"\n" + b"\n".join(headers)).replace(b"\n@", b"\n@" + tag).split(b"\n")[1:]
+            out.write(format_fastq(tagged, seqs, pluses, quals))
+            count += len(headers)
+        return count
+    for _fmt, records in iter_record_blocks(path):
+        out.write(b"\n".join([record[:1] + tag + record[1:] for record in records]) + b"\n")
+        count += len(records)
+    return count
+
+
+def write_tagged_batch(datasets: List[Dict], tags: List[str], out_dir: Path) -> Tuple[Dict, List[int]]:
+    """Concatenate several samples' reads into one dataset, prefixing each read id with its sample tag.
+
+    Paired samples go to one R1/R2 pair, single-end samples to one file. Returns the batch
+    dataset and the number of records (or pairs) each sample contributed.
+    """
+    keys = {"paired" if "paired" in dataset and "reads" not in dataset else "reads" for dataset in datasets}
+    if len(keys) != 1:
+        raise ValueError("batched samples must all be paired or all single-end")
+    key = keys.pop()
+    if any(key not in dataset for dataset in datasets):
+        raise ValueError("dataset must define reads or paired")
+    out_dir = Path(out_dir).resolve()
+    out_dir.mkdir(parents=True, exist_ok=True)
+    counts: List[int] = []
+    if key == "paired":
+        targets = [out_dir / "batch_R1.fq", out_dir / "batch_R2.fq"]
+        with targets[0].open("wb") as out1, targets[1].open("wb") as out2:
+            for dataset, tag in zip(datasets, tags):
+                paired = [Path(path) for path in dataset["paired"]]
+                if len(paired) != 2:
+                    raise ValueError("paired dataset must provide exactly two read files")
+                count1 = _write_tagged(paired[0], tag.encode("utf-8"), out1)
+                count2 = _write_tagged(paired[1], tag.encode("utf-8"), out2)
+                if count1 != count2:
+                    longer = paired[0] if count1 > count2 else paired[1]
+                    raise ValueError(f"paired read files have different record counts: {longer}")
+                counts.append(count1)
+    else:
+        # Tools detect FASTA/FASTQ from content, but keep a matching suffix and refuse mixed input.
+        tmp_target = out_dir / "batch_reads.tmp"
+        marker = None
+        with tmp_target.open("wb") as out:
+            for dataset, tag in zip(datasets, tags):
+                count = 0
+                for path in dataset["reads"]:
+                    fmt = sniff_format(Path(path))
+                    if fmt is not None and marker is not None and fmt != marker:
+                        raise ValueError(f"batched samples mix FASTA and FASTQ reads: {path}")
+                    marker = marker or fmt
+                    count += _write_tagged(Path(path), tag.encode("utf-8"), out)
+                counts.append(count)
+        targets = [out_dir / ("batch_reads.fa" if marker == "fasta" else "batch_reads.fq")]
+        tmp_target.replace(targets[0])
+    batch = {name: value for name, value in datasets[0].items() if name not in {"reads", "paired", "name"}}
+    batch[key] = [str(path) for path in targets]
+    batch["name"] = out_dir.parent.name
+    return batch, counts
+
+
+def _record_bases(fmt: str, record: bytes) -> int:
+    lines = record.split(b"\n")
+    if fmt == "fastq":
+        return len(lines[1].strip())
+    return sum(len(line.strip()) for line in lines[1:])
+
+
+def write_read_head(dataset: Dict, records: int, out_dir: Path) -> Tuple[Dict, int, int]:
+    """Copy the first `records` reads (or pairs) of a dataset into `out_dir`.
+
+    Returns the small dataset plus the number of reads and bases written (mates count as reads).
+    """
+    if "reads" in dataset:
+        key = "reads"
+    elif "paired" in dataset:
+        key = "paired"
+    else:
+        raise ValueError("dataset must define reads or paired")
+    out_dir = Path(out_dir).resolve()
+    out_dir.mkdir(parents=True, exist_ok=True)
+    reads = 0
+    bases = 0
+    files = []
+    remaining = records
+    for file_idx, raw in enumerate(dataset[key]):
+        path = Path(raw)
+        if key == "reads" and remaining <= 0:
+            break
+        target = out_dir / f"head.{file_idx}.{path.name[: -len('.gz')] if path.name.endswith('.gz') else path.name}"
+        limit = records if key == "paired" else remaining
+        written = 0
+        with target.open("wb") as out:
+            for fmt, block in iter_record_blocks(path):
+                block = block[: limit - written]
+                if block:
+                    out.write(b"\n".join(block) + b"\n")
+                bases += sum(_record_bases(fmt, record) for record in block)
+                written += len(block)
+                if written >= limit:
+                    break
+        reads += written
+        if key == "reads":
+            remaining -= written
+        files.append(str(target))
+    head = {name: value for name, value in dataset.items() if name not in {"reads", "paired"}}
+    head[key] = files
+    head["name"] = f"{dataset.get('name', 'dataset')}.head{records}"
+    return head, reads, bases
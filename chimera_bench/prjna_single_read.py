@@ -2,14 +2,20 @@ from __future__ import annotations
 
 import argparse
 import csv
-import gzip
 import json
 import subprocess
+import sys
 from pathlib import Path
 from typing import Any, Iterable
 
 import yaml
 
+if __package__:
+    from .io.records import DECOMPRESSORS, format_fastq, iter_fastq_blocks
+else:  # run as a script
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+    from chimera_bench.io.records import DECOMPRESSORS, format_fastq, iter_fastq_blocks
+
 
 DEFAULT_SOURCE_ROOT = Path(
     "/mnt/sda/CommonData/TaxonomyDataset/True/真实实验/群落结构线/当前主线/"
@@ -74,7 +80,7 @@ def _mate_marked_header(header: bytes, mate: str) -> bytes:
         token = token[:-2]
     if token.endswith(b"__mate1") or token.endswith(b"__mate2"):
         token = token.rsplit(b"__mate", 1)[0]
-    return b"@" + token + _mate_suffix(mate) + b"\n"
+    return b"@" + token + _mate_suffix(mate)
 
 
 def _gzip_ok(path: Path) -> bool:
@@ -106,7 +112,7 @@ def rewrite_fastq_with_mate(
 
     records = 0
     bases = 0
-    with gzip.open(input_path, "rb") as in_fh, tmp_path.open("wb") as raw_out:
+    with tmp_path.open("wb") as raw_out:
         proc = subprocess.Popen(
             ["pigz", "-c", "-p", str(pigz_threads)],
             stdin=subprocess.PIPE,
@@ -114,21 +120,11 @@ def rewrite_fastq_with_mate(
         )
         assert proc.stdin is not None
         try:
-            while True:
-                header = in_fh.readline()
-                if not header:
-                    break
-                seq = in_fh.readline()
-                plus = in_fh.readline()
-                qual = in_fh.readline()
-                if not (seq and plus and qual):
-                    raise ValueError(f"truncated FASTQ record in {input_path}")
-                proc.stdin.write(_mate_marked_header(header, mate))
-                proc.stdin.write(seq)
-                proc.stdin.write(plus)
-                proc.stdin.write(qual)
-                records += 1
-                bases += len(seq.rstrip(b"\r\n"))
+            for headers, seqs, pluses, quals in iter_fastq_blocks(input_path, decompressor=DECOMPRESSORS[".gz"]):
+                headers = [_mate_marked_header(header, mate) for header in headers]
+                proc.stdin.write(format_fastq(headers, seqs, pluses, quals))
+                records += len(seqs)
+                bases += sum(map(len, seqs))
         finally:
             proc.stdin.close()
             rc = proc.wait()
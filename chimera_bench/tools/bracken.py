@@ -4,6 +4,8 @@ from pathlib import Path
 import shlex
 from typing import Any, Dict, List
 
+from .kraken2 import KRAKEN2_CLASSIFY_MERGE, kraken2_classify_artifact
+
 
 class BrackenTool:
     name = "bracken"
@@ -23,6 +25,142 @@ class BrackenTool:
         kraken2_env = self.config.get("kraken2_env", self._env())
         return ["conda", "run", "-n", kraken2_env, kraken2_bin]
 
+    @staticmethod
+    def variant_tag(variant: Dict[str, Any]) -> str:
+        return f"r{variant['read_len']}_{variant['level']}_t{variant['threshold']}"
+
+    def _variants(self, exp: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Extra (read_len, level, threshold) settings re-estimated from the same Kraken2 report."""
+        variants = []
+        for raw in exp.get("bracken_variants") or self.config.get("variants") or []:
+            variant = {
+                "read_len": int(raw.get("read_len", 100)),
+                "level": str(raw.get("level", "S")),
+                "threshold": int(raw.get("threshold", 10)),
+            }
+            if variant not in variants:
+                variants.append(variant)
+        return variants
+
+    def _distrib_cmd(self, db_dir: Path, read_lens: List[int], threads: int) -> List[str]:
+        """Build missing `databaseXmers.kmer_distrib` files, one background job per read length.
+
+        Needs the `database.kraken` kept by `build_db_steps`; existing distributions are skipped.
+        """
+        database_kraken = db_dir / "database.kraken"
+        per_job = str(max(1, threads // max(1, len(read_lens))))
+        lines = [
+            "set -uo pipefail",
+            "pids=()",
+        ]
+        for read_len in read_lens:
+            distrib = db_dir / f"database{read_len}mers.kmer_distrib"
+            mers = db_dir / f"database{read_len}mers.kraken"
+            kmer2read = shlex.join(
+                [
+                    "conda",
+                    "run",
+                    "-n",
+                    self._env(),
+                    "kmer2read_distr",
+                    "--seqid2taxid",
+                    str(db_dir / "seqid2taxid.map"),
+                    "--taxonomy",
+                    str(db_dir / "taxonomy"),
+                    "--kraken",
+                    str(database_kraken),
+                    "--output",
+                    f"{mers}.tmp",
+                    "-k",
+                    "35",
+                    "-l",
+                    str(read_len),
+                    "-t",
+                    per_job,
+                ]
+            )
+            generate = shlex.join(
+                ["conda", "run", "-n", self._env(), "generate_kmer_distribution.py", "-i", str(mers), "-o", f"{distrib}.tmp"]
+            )
+            lines.extend(
+                [
+                    f"if [ ! -s {shlex.quote(str(distrib))} ]; then",
+                    f"  if [ ! -s {shlex.quote(str(database_kraken))} ]; then echo '[bracken] missing database.kraken for {read_len}mers' >&2; exit 2; fi",
+                    "  (",
+                    "    set -e",
+                    f"    {kmer2read}",
+                    f"    mv -f {shlex.quote(f'{mers}.tmp')} {shlex.quote(str(mers))}",
+                    f"    {generate}",
+                    f"    mv -f {shlex.quote(f'{distrib}.tmp')} {shlex.quote(str(distrib))}",
+                    f"    rm -f {shlex.quote(str(mers))}",
+                    "  ) &",
+                    '  pids+=("$!")',
+                    "fi",
+                ]
+            )
+        lines.extend(
+            [
+                "status=0",
+                # `${pids[@]+...}`: bash < 4.4 treats an empty array as unbound under `set -u`.
+                'for pid in ${pids[@]+"${pids[@]}"}; do wait "$pid" || status=1; done',
+                'exit "$status"',
+            ]
+        )
+        return ["bash", "-lc", "\n".join(lines)]
+
+    def _variant_steps(
+        self,
+        *,
+        db_dir: str,
+        kraken2_out: str | None,
+        kraken2_report: str,
+        out_prefix_path: Path,
+        variants: List[Dict[str, Any]],
+        threads: int,
+    ) -> List[Dict[str, Any]]:
+        read_lens = sorted({variant["read_len"] for variant in variants})
+        variant_outputs: Dict[str, Dict[str, str]] = {}
+        lines = ["set -uo pipefail", "pids=()"]
+        for variant in variants:
+            tag = self.variant_tag(variant)
+            bracken_out = f"{out_prefix_path}_{tag}.tsv"
+            cmd = self._base_cmd() + [
+                "-d",
+                str(db_dir),
+                "-i",
+                kraken2_report,
+                "-o",
+                bracken_out,
+                "-r",
+                str(variant["read_len"]),
+                "-l",
+                variant["level"],
+                "-t",
+                str(variant["threshold"]),
+            ]
+            lines.append(f"{shlex.join(cmd)} > /dev/null &")
+            lines.append('pids+=("$!")')
+            variant_outputs[tag] = {"kraken2_report": kraken2_report, "bracken_tsv": bracken_out}
+            if kraken2_out is not None:
+                variant_outputs[tag]["kraken2_out"] = kraken2_out
+        lines.extend(
+            [
+                "status=0",
+                # `${pids[@]+...}`: bash < 4.4 treats an empty array as unbound under `set -u`.
+                'for pid in ${pids[@]+"${pids[@]}"}; do wait "$pid" || status=1; done',
+                'exit "$status"',
+            ]
+        )
+        return [
+            {"name": "bracken_distrib", "cmd": self._distrib_cmd(Path(db_dir), read_lens, threads)},
+            {
+                "name": "bracken_variants",
+                "cmd": ["bash", "-lc", "\n".join(lines)],
+                "variants": {self.variant_tag(variant): variant for variant in variants},
+                "variant_outputs": variant_outputs,
+            },
+        ]
+
     @staticmethod
     def _resolve_db_dir(db_prefix: str, out_dir: str) -> Path:
         db_path = Path(db_prefix)
@@ -47,6 +185,27 @@ class BrackenTool:
         if profile_out_prefix is not None:
             out_prefix_path = Path(profile_out_prefix).resolve()
 
+        variants = self._variants(exp)
+        report = exp.get("bracken_report") or self.config.get("report")
+        if report:
+            # Sweep only: re-estimate variants from an existing Kraken2 report, no classification.
+            if not variants:
+                raise ValueError("bracken_report requires bracken_variants")
+            # `{dataset}` in the path selects each dataset's own report.
+            report_path = Path(str(report).format(dataset=dataset.get("name", "dataset"))).resolve()
+            if not report_path.exists():
+                raise FileNotFoundError(report_path)
+            # Per-read metrics come from the `.out` written next to the report, when there is one.
+            kraken2_out_path = report_path.with_suffix(".out")
+            return self._variant_steps(
+                db_dir=str(db_dir),
+                kraken2_out=str(kraken2_out_path) if kraken2_out_path.exists() else None,
+                kraken2_report=str(report_path),
+                out_prefix_path=out_prefix_path,
+                variants=variants,
+                threads=int(exp.get("threads", 32)),
+            )
+
         run_prefix_path = Path(out_prefix).resolve()
         kraken2_out = str(run_prefix_path.with_name(f"{run_prefix_path.name}_kraken2.out"))
         kraken2_report = str(run_prefix_path.with_name(f"{run_prefix_path.name}_kraken2.report"))
@@ -88,15 +247,39 @@ class BrackenTool:
         convert_script = str(Path(__file__).resolve().with_name("bracken_to_cami.py"))
         convert_cmd = ["python", convert_script, "--input", bracken_out, "--out", cami_profile]
 
-        return [
+        steps = [
             {
                 "name": "kraken2_classify",
                 "cmd": classify_cmd,
                 "outputs": {"kraken2_out": kraken2_out, "kraken2_report": kraken2_report},
+                "merge": KRAKEN2_CLASSIFY_MERGE,
+                # Same key as the kraken2 experiment's classify step, so either run can reuse the other.
+                "artifact": kraken2_classify_artifact(
+                    db_dir=str(db_dir),
+                    dataset=dataset,
+                    env=self.config.get("kraken2_env", self._env()),
+                    bin_path=self.config.get("kraken2_bin", "kraken2"),
+                    tool_args=list(exp.get("kraken2_tool_args", [])),
+                ),
             },
             {"name": "bracken", "cmd": bracken_cmd, "outputs": {"bracken_tsv": bracken_out}},
-            {"name": "convert", "cmd": convert_cmd, "outputs": {"cami_profile_tsv": cami_profile}},
         ]
+        # Without the convert step, evaluation reads `bracken_tsv` directly.
+        if self.config.get("convert", True):
+            steps.append({"name": "convert", "cmd": convert_cmd, "outputs": {"cami_profile_tsv": cami_profile}})
+        if variants:
+            # Variants re-estimate from the same report and are evaluated as sibling runs.
+            steps.extend(
+                self._variant_steps(
+                    db_dir=str(db_dir),
+                    kraken2_out=kraken2_out,
+                    kraken2_report=kraken2_report,
+                    out_prefix_path=out_prefix_path,
+                    variants=variants,
+                    threads=int(threads),
+                )
+            )
+        return steps
 
     def build_db_steps(self, *, build: Dict[str, Any], out_dir: str):
         """
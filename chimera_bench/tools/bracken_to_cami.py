@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import argparse
 from pathlib import Path
+from typing import Iterator, Tuple
 
 
 RANK_MAP = {
@@ -24,14 +25,10 @@ def _rank_name(raw: str) -> str:
     return key.lower()
 
 
-def convert(*, bracken_tsv: Path, out_path: Path) -> None:
-    if not bracken_tsv.exists():
-        raise FileNotFoundError(bracken_tsv)
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-
+def iter_bracken_rows(bracken_tsv: Path) -> Iterator[Tuple[int, str, float]]:
+    """Yield `(taxid, rank, new_est_reads)` for every positive Bracken estimate."""
     header = None
     idx_taxid = idx_level = idx_est = None
-    rows: list[tuple[int, str, float]] = []
 
     with bracken_tsv.open("r", encoding="utf-8", errors="ignore") as fh:
         for raw in fh:
@@ -82,8 +79,14 @@ def convert(*, bracken_tsv: Path, out_path: Path) -> None:
                 continue
             if est <= 0:
                 continue
-            rows.append((taxid, _rank_name(level_text), est))
+            yield taxid, _rank_name(level_text), est
 
+
+def convert(*, bracken_tsv: Path, out_path: Path) -> None:
+    if not bracken_tsv.exists():
+        raise FileNotFoundError(bracken_tsv)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    rows = list(iter_bracken_rows(bracken_tsv))
     with out_path.open("w", encoding="utf-8") as out:
         out.write("@@TAXID\tRANK\tTAXPATH\tTAXPATHSN\tPERCENTAGE\n")
         for taxid, rank, value in rows:
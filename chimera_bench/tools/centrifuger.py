@@ -79,16 +79,31 @@ class CentrifugerTool:
         classify_cmd = ["bash", "-lc", classify_script]
 
         convert_script = str(Path(__file__).resolve().with_name("centrifuger_convert.py"))
-        convert_cmd = ["python", convert_script, "--input", raw_tsv, "--out", classify_tsv]
-
+        convert_cmd = ["python", convert_script, "--input", raw_tsv]
+        convert_outputs = {}
+        if self.config.get("classify_tsv", True):
+            convert_cmd += ["--out", classify_tsv]
+            convert_outputs["classify_tsv"] = classify_tsv
+        if self.config.get("binary_predictions", False):
+            classify_bin = f"{out_prefix}_classify.predbin"
+            convert_cmd += ["--binary-out", classify_bin]
+            convert_outputs["classify_bin"] = classify_bin
+
+        classify_outputs = {"centrifuger_tsv": raw_tsv}
         steps = [
             {
                 "name": "classify",
                 "cmd": classify_cmd,
-                "outputs": {"centrifuger_tsv": raw_tsv},
+                "outputs": classify_outputs,
+                "merge": {"centrifuger_tsv": "concat_header"},
+                "per_read": {"centrifuger_tsv": 0},
             },
-            {"name": "convert", "cmd": convert_cmd, "outputs": {"classify_tsv": classify_tsv}},
         ]
+        if self.config.get("convert", True):
+            steps.append({"name": "convert", "cmd": convert_cmd, "outputs": convert_outputs})
+        else:
+            # Evaluate the raw Centrifuger TSV directly; no convert step in the timed run.
+            classify_outputs.update({"classify_native": raw_tsv, "classify_native_format": "centrifuger"})
 
         # Only run quantification (profile) when profile output dir is enabled.
         if profile_out_prefix:
@@ -2,19 +2,28 @@ from __future__ import annotations
 
 import argparse
 from pathlib import Path
+from typing import Iterator, Tuple
 
+try:
+    from .predbin import PredictionBinWriter
+except ImportError:  # run as a script by path
+    from predbin import PredictionBinWriter
 
-def convert_centrifuger_output(*, input_path: Path, out_path: Path) -> None:
-    """Convert Centrifuger stdout TSV to ChimeraBenchmark classify TSV.
+
+def _parse_score(raw: str) -> float | None:
+    try:
+        return float(raw)
+    except ValueError:
+        return None
+
+
+def iter_centrifuger_lines(input_path: Path) -> Iterator[Tuple[str, int | None, float | None]]:
+    """Yield `(read_id, taxid | None, score)` for every Centrifuger hit line.
 
     Centrifuger output columns (from README):
       readID seqID taxID score 2ndBestScore hitLength queryLength numMatches
     """
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    seen: set[str] = set()
-    with input_path.open("r", encoding="utf-8", errors="ignore") as fin, out_path.open(
-        "w", encoding="utf-8"
-    ) as fout:
+    with input_path.open("r", encoding="utf-8", errors="ignore") as fin:
         for raw in fin:
             line = raw.strip()
             if not line:
@@ -29,24 +38,60 @@ def convert_centrifuger_output(*, input_path: Path, out_path: Path) -> None:
             lower_id = read_id.lower()
             if lower_id == "readid" and taxid.lower() == "taxid":
                 continue
-            if read_id in seen:
-                continue
-            seen.add(read_id)
-            if not taxid or taxid in {"0", "-", "unclassified"}:
-                fout.write(f"{read_id}\tunclassified\n")
-            else:
-                fout.write(f"{read_id}\t{taxid}\n")
+            unclassified = not taxid or taxid in {"0", "-", "unclassified"} or not taxid.isdigit()
+            score = _parse_score(parts[3]) if len(parts) > 3 else None
+            yield read_id, None if unclassified else int(taxid), score
+
+
+def iter_centrifuger_records(input_path: Path) -> Iterator[Tuple[str, int | None, float | None]]:
+    """First hit line of every read. Centrifuger writes the hits of a read consecutively."""
+    previous = None
+    for record in iter_centrifuger_lines(input_path):
+        if record[0] != previous:
+            previous = record[0]
+            yield record
+
+
+def convert_centrifuger_output(
+    *,
+    input_path: Path,
+    out_path: Path | None = None,
+    binary_out: Path | None = None,
+) -> None:
+    """Convert Centrifuger stdout TSV to ChimeraBenchmark classify TSV and/or `.predbin`."""
+    if out_path is None and binary_out is None:
+        raise ValueError("centrifuger convert requires out_path and/or binary_out")
+    fout = None
+    writer = PredictionBinWriter(binary_out, with_scores=True) if binary_out is not None else None
+    if out_path is not None:
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        fout = out_path.open("w", encoding="utf-8")
+    try:
+        for read_id, taxid, score in iter_centrifuger_records(input_path):
+            if fout is not None:
+                fout.write(f"{read_id}\tunclassified\n" if taxid is None else f"{read_id}\t{taxid}\n")
+            if writer is not None:
+                writer.add(read_id, taxid, score)
+    finally:
+        if fout is not None:
+            fout.close()
+    if writer is not None:
+        writer.close()
 
 
 def main() -> None:
     ap = argparse.ArgumentParser()
     ap.add_argument("--input", required=True)
-    ap.add_argument("--out", required=True)
+    ap.add_argument("--out", default=None)
+    ap.add_argument("--binary-out", default=None)
     args = ap.parse_args()
 
-    convert_centrifuger_output(input_path=Path(args.input), out_path=Path(args.out))
+    convert_centrifuger_output(
+        input_path=Path(args.input),
+        out_path=Path(args.out) if args.out else None,
+        binary_out=Path(args.binary_out) if args.binary_out else None,
+    )
 
 
 if __name__ == "__main__":
     main()
-
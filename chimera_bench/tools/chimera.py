@@ -97,7 +97,12 @@ class ChimeraTool:
             profile_out_prefix=profile_out_prefix,
         )
 
-        steps = [{"name": "classify", "cmd": classify_cmd, "outputs": outputs}]
+        merge = {
+            "classify_tsv": "concat_header",
+            "chimera_profile_tsv": "weighted_profile",
+            "cami_profile_tsv": "weighted_profile",
+        }
+        steps = [{"name": "classify", "cmd": classify_cmd, "outputs": outputs, "merge": merge}]
 
         return steps
 
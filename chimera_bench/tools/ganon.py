@@ -107,6 +107,12 @@ class GanonTool:
                     **({"classify_all": all_path} if output_all else {}),
                     **({"classify_unc": unc_path} if output_unclassified else {}),
                 },
+                "merge": {
+                    "rep": "ganon_rep",
+                    "classify_one": "concat",
+                    "classify_all": "concat",
+                    "classify_unc": "concat",
+                },
             },
             {
                 "name": "report_reads",
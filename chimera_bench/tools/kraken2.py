@@ -4,6 +4,45 @@ from pathlib import Path
 import shlex
 from typing import Any, Dict, List
 
+from ..core.artifacts import file_identity, input_content_fingerprint, input_fingerprint
+
+# How scatter mode merges per-shard classify outputs (see `core/scatter.py`).
+KRAKEN2_CLASSIFY_MERGE = {"kraken2_out": "concat", "kraken2_report": "kraken2_report"}
+
+
+def kraken2_classify_artifact(
+    *,
+    db_dir: str,
+    dataset: Dict[str, Any],
+    env: str,
+    bin_path: str,
+    tool_args: List[str],
+) -> Dict[str, Any]:
+    """Artifact descriptor for a Kraken2 classification, shared by the kraken2 and bracken tools.
+
+    Threads do not change the output and are left out of the key. The DB is keyed on the
+    identity of its `.k2d` files rather than their paths, because bracken stages its DB
+    directory by hard-linking the kraken2 one.
+    """
+    inputs = list(dataset.get("reads") or dataset.get("paired") or [])
+    db_files = [Path(db_dir) / name for name in ("hash.k2d", "opts.k2d", "taxo.k2d")]
+    fields = {
+        "env": env,
+        "bin": bin_path,
+        "paired": "reads" not in dataset and "paired" in dataset,
+        "tool_args": [str(arg) for arg in tool_args],
+    }
+    artifact = {
+        "kind": "kraken2_classify",
+        "outputs": ["kraken2_out", "kraken2_report"],
+        "fields": {**fields, "db": file_identity(db_files), "inputs": input_fingerprint(inputs)},
+    }
+    db_content = input_content_fingerprint(db_files)
+    inputs_content = input_content_fingerprint(inputs)
+    if None not in db_content and None not in inputs_content:
+        artifact["content_fields"] = {**fields, "db": db_content, "inputs": inputs_content}
+    return artifact
+
 
 class Kraken2Tool:
     name = "kraken2"
@@ -65,18 +104,43 @@ class Kraken2Tool:
         classify_cmd += tool_args
 
         convert_script = str(Path(__file__).resolve().with_name("kraken2_convert.py"))
-        convert_cmd = ["python", convert_script, "--input", out_file, "--out", classify_tsv]
+        convert_cmd = ["python", convert_script, "--input", out_file]
+        convert_outputs = {}
+        if self.config.get("classify_tsv", True):
+            convert_cmd += ["--out", classify_tsv]
+            convert_outputs["classify_tsv"] = classify_tsv
+        if self.config.get("binary_predictions", False):
+            classify_bin = f"{out_prefix}_classify.predbin"
+            convert_cmd += ["--binary-out", classify_bin]
+            convert_outputs["classify_bin"] = classify_bin
+
+        classify_outputs = {"kraken2_out": out_file, "kraken2_report": report_file}
+        classify_step = {
+            "name": "classify",
+            "cmd": classify_cmd,
+            "outputs": classify_outputs,
+            "merge": KRAKEN2_CLASSIFY_MERGE,
+            # Read-id column of each per-read output, for multi-sample batching.
+            "per_read": {"kraken2_out": 1},
+            "artifact": kraken2_classify_artifact(
+                db_dir=str(db_dir),
+                dataset=dataset,
+                env=self.config.get("env", "kraken"),
+                bin_path=self.config.get("bin", "kraken2"),
+                tool_args=tool_args,
+            ),
+        }
+        if not self.config.get("convert", True):
+            # Evaluate the raw `.out` directly; no convert step in the timed run.
+            classify_outputs.update({"classify_native": out_file, "classify_native_format": "kraken2"})
+            return [classify_step]
 
         return [
-            {
-                "name": "classify",
-                "cmd": classify_cmd,
-                "outputs": {"kraken2_out": out_file, "kraken2_report": report_file},
-            },
+            classify_step,
             {
                 "name": "convert",
                 "cmd": convert_cmd,
-                "outputs": {"classify_tsv": classify_tsv},
+                "outputs": convert_outputs,
             },
         ]
 
@@ -2,13 +2,17 @@ from __future__ import annotations
 
 import argparse
 from pathlib import Path
+from typing import Iterator, Tuple
 
+try:
+    from .predbin import PredictionBinWriter
+except ImportError:  # run as a script by path
+    from predbin import PredictionBinWriter
 
-def convert_kraken2_output(*, input_path: Path, out_path: Path) -> None:
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    with input_path.open("r", encoding="utf-8", errors="ignore") as fin, out_path.open(
-        "w", encoding="utf-8"
-    ) as fout:
+
+def iter_kraken2_records(input_path: Path) -> Iterator[Tuple[str, int | None]]:
+    """Yield `(read_id, taxid | None)` from a Kraken2 `--output` file, one per line."""
+    with input_path.open("r", encoding="utf-8", errors="ignore") as fin:
         for raw in fin:
             line = raw.strip()
             if not line:
@@ -21,21 +25,49 @@ def convert_kraken2_output(*, input_path: Path, out_path: Path) -> None:
             taxid = parts[2].strip()
             if not read_id:
                 continue
-            if status == "U" or taxid in {"0", "-", "unclassified", ""}:
-                fout.write(f"{read_id}\tunclassified\n")
-            else:
-                fout.write(f"{read_id}\t{taxid}\n")
+            unclassified = status == "U" or taxid in {"0", "-", "unclassified", ""}
+            yield read_id, None if unclassified or not taxid.isdigit() else int(taxid)
+
+
+def convert_kraken2_output(
+    *,
+    input_path: Path,
+    out_path: Path | None = None,
+    binary_out: Path | None = None,
+) -> None:
+    if out_path is None and binary_out is None:
+        raise ValueError("kraken2 convert requires out_path and/or binary_out")
+    fout = None
+    writer = PredictionBinWriter(binary_out) if binary_out is not None else None
+    if out_path is not None:
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        fout = out_path.open("w", encoding="utf-8")
+    try:
+        for read_id, taxid in iter_kraken2_records(input_path):
+            if fout is not None:
+                fout.write(f"{read_id}\tunclassified\n" if taxid is None else f"{read_id}\t{taxid}\n")
+            if writer is not None:
+                writer.add(read_id, taxid)
+    finally:
+        if fout is not None:
+            fout.close()
+    if writer is not None:
+        writer.close()
 
 
 def main() -> None:
     ap = argparse.ArgumentParser()
     ap.add_argument("--input", required=True)
-    ap.add_argument("--out", required=True)
+    ap.add_argument("--out", default=None)
+    ap.add_argument("--binary-out", default=None)
     args = ap.parse_args()
 
-    convert_kraken2_output(input_path=Path(args.input), out_path=Path(args.out))
+    convert_kraken2_output(
+        input_path=Path(args.input),
+        out_path=Path(args.out) if args.out else None,
+        binary_out=Path(args.binary_out) if args.binary_out else None,
+    )
 
 
 if __name__ == "__main__":
     main()
-
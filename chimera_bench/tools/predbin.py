@@ -0,0 +1,202 @@
+"""Compact binary per-read prediction files (`.predbin`).
+
+Layout (little-endian, columnar so each column can be memory-mapped as a flat array):
+
+    header  32 bytes: magic b"CBPRED01", u64 record count, u32 flags, 12 reserved bytes
+    hashes  count x u64  blake2b-64 of the normalized read id, sorted ascending, unique
+    taxids  count x u32  0 = unclassified
+    scores  count x f32  only when flags & FLAG_SCORES (NaN = no score)
+
+This module is imported by the converter scripts, which run as plain scripts, so it must not
+depend on the `chimera_bench` package.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import heapq
+import math
+import os
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Tuple
+
+MAGIC = b"CBPRED01"
+HEADER = struct.Struct("<8sQI12x")
+FLAG_SCORES = 1
+PREDBIN_SUFFIX = ".predbin"
+UNCLASSIFIED_TAXID = 0
+_CHUNK_RECORDS = 4_000_000
+_RUN_RECORD = struct.Struct("<QIf")
+_WRITE_BATCH = 1 << 16
+
+
+def normalize_read_id(read_id: str) -> str:
+    # Same rule as `chimera_bench.core.metrics.normalize_read_id`.
+    stripped = read_id.strip()
+    return stripped.split()[0] if stripped else ""
+
+
+def read_id_hash(read_id: str) -> int:
+    digest = hashlib.blake2b(normalize_read_id(read_id).encode("utf-8", "surrogateescape"), digest_size=8)
+    return int.from_bytes(digest.digest(), "little")
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+class PredictionBinWriter:
+    """Collect (read id, taxid, score) records and write them sorted by read-id hash.
+
+    Records are sorted in memory in chunks and spilled to temporary runs that are merged at
+    the end, so memory stays bounded for very large read sets. When a read id appears more
+    than once the last record wins, matching how the TSV parser fills its dict.
+    """
+
+    def __init__(self, path: Path, *, with_scores: bool = False, chunk_records: int = _CHUNK_RECORDS) -> None:
+        self.path = Path(path)
+        self.with_scores = with_scores
+        self.chunk_records = chunk_records
+        self._hashes = array("Q")
+        self._taxids = array("I")
+        self._scores = array("f")
+        self._runs: List[Path] = []
+        self._tmp_dir: tempfile.TemporaryDirectory | None = None
+
+    def add(self, read_id: str, taxid: int | None, score: float | None = None) -> None:
+        self._hashes.append(read_id_hash(read_id))
+        self._taxids.append(taxid or UNCLASSIFIED_TAXID)
+        self._scores.append(math.nan if score is None else score)
+        if len(self._hashes) >= self.chunk_records:
+            self._spill()
+
+    def _sorted_chunk(self) -> Iterator[Tuple[int, int, float]]:
+        hashes, taxids, scores = self._hashes, self._taxids, self._scores
+        # sorted() is stable, so later duplicates stay after earlier ones.
+        for idx in sorted(range(len(hashes)), key=hashes.__getitem__):
+            yield hashes[idx], taxids[idx], scores[idx]
+
+    def _work_dir(self) -> Path:
+        if self._tmp_dir is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._tmp_dir = tempfile.TemporaryDirectory(prefix="predbin.", dir=self.path.parent)
+        return Path(self._tmp_dir.name)
+
+    def _spill(self) -> None:
+        run_path = self._work_dir() / f"run{len(self._runs):05d}.bin"
+        with run_path.open("wb") as fh:
+            for record in self._sorted_chunk():
+                fh.write(_RUN_RECORD.pack(*record))
+        self._runs.append(run_path)
+        self._hashes = array("Q")
+        self._taxids = array("I")
+        self._scores = array("f")
+
+    @staticmethod
+    def _iter_run(path: Path, run_idx: int) -> Iterator[Tuple[int, int, int, float]]:
+        with path.open("rb") as fh:
+            while True:
+                block = fh.read(_RUN_RECORD.size * 65536)
+                if not block:
+                    return
+                for record_hash, taxid, score in _RUN_RECORD.iter_unpack(block):
+                    yield record_hash, run_idx, taxid, score
+
+    def _merged(self) -> Iterator[Tuple[int, int, int, float]]:
+        if not self._runs:
+            return ((h, 0, t, s) for h, t, s in self._sorted_chunk())
+        if self._hashes:
+            self._spill()
+        return heapq.merge(*(self._iter_run(path, idx) for idx, path in enumerate(self._runs)))
+
+    def close(self) -> int:
+        """Write the file and return its record count.
+
+        Merged records are streamed: hashes go straight into the output after a placeholder
+        header and taxids/scores into temporary column files appended at the end, so memory
+        holds one write batch per column rather than the whole file.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        work_dir = self._work_dir()
+        flags = FLAG_SCORES if self.with_scores else 0
+        count = 0
+        with (
+            tmp_path.open("wb") as out,
+            (work_dir / "taxids.bin").open("w+b") as taxid_fh,
+            (work_dir / "scores.bin").open("w+b") as score_fh,
+        ):
+            out.write(HEADER.pack(MAGIC, 0, flags))
+            hashes = array("Q")
+            taxids = array("I")
+            scores = array("f")
+            pending = None
+            for record_hash, _run_idx, taxid, score in self._merged():
+                if pending is not None and record_hash != pending[0]:
+                    hashes.append(pending[0])
+                    taxids.append(pending[1])
+                    scores.append(pending[2])
+                    if len(hashes) >= _WRITE_BATCH:
+                        count += self._write_columns(out, taxid_fh, score_fh, hashes, taxids, scores)
+                        hashes, taxids, scores = array("Q"), array("I"), array("f")
+                # A repeated read id keeps its last record.
+                pending = (record_hash, taxid, score)
+            if pending is not None:
+                hashes.append(pending[0])
+                taxids.append(pending[1])
+                scores.append(pending[2])
+            count += self._write_columns(out, taxid_fh, score_fh, hashes, taxids, scores)
+            taxid_fh.seek(0)
+            shutil.copyfileobj(taxid_fh, out)
+            if self.with_scores:
+                score_fh.seek(0)
+                shutil.copyfileobj(score_fh, out)
+            out.seek(0)
+            out.write(HEADER.pack(MAGIC, count, flags))
+        os.replace(tmp_path, self.path)
+        self._tmp_dir.cleanup()
+        self._tmp_dir = None
+        return count
+
+    def _write_columns(
+        self, out: BinaryIO, taxid_fh: BinaryIO, score_fh: BinaryIO, hashes: array, taxids: array, scores: array
+    ) -> int:
+        out.write(_little_endian(hashes))
+        taxid_fh.write(_little_endian(taxids))
+        if self.with_scores:
+            score_fh.write(_little_endian(scores))
+        return len(hashes)
+
+    def __enter__(self) -> "PredictionBinWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        elif self._tmp_dir is not None:
+            self._tmp_dir.cleanup()
+
+
+def read_header(fh: BinaryIO) -> Tuple[int, int]:
+    raw = fh.read(HEADER.size)
+    if len(raw) != HEADER.size:
+        raise ValueError("truncated predbin header")
+    magic, count, flags = HEADER.unpack(raw)
+    if magic != MAGIC:
+        raise ValueError(f"not a predbin file (magic {magic!r})")
+    return count, flags
+
+
+def column_offsets(count: int, flags: int) -> Tuple[int, int, int | None]:
+    hashes_at = HEADER.size
+    taxids_at = hashes_at + 8 * count
+    scores_at = taxids_at + 4 * count if flags & FLAG_SCORES else None
+    return hashes_at, taxids_at, scores_at
@@ -91,72 +91,15 @@ class TaxorTool:
             query_q = shlex.quote(query_path)
 
             if is_paired:
-                python_script = r"""
-import gzip
-import sys
-from pathlib import Path
-
-path = Path(sys.argv[1])
-suffix = sys.argv[2]
-
-def open_text(p: Path):
-    if str(p).endswith(".gz"):
-        return gzip.open(p, "rt", encoding="utf-8", errors="ignore")
-    return p.open("r", encoding="utf-8", errors="ignore")
-
-def rewrite_header(line: str, prefix: str) -> str:
-    if not line.startswith(prefix):
-        return line
-    content = line[len(prefix):].rstrip("\n")
-    if not content:
-        return line
-    parts = content.split(None, 1)
-    seq_id = parts[0] if parts else ""
-    rest = (" " + parts[1]) if len(parts) > 1 else ""
-    if not seq_id:
-        return line
-    return f"{prefix}{seq_id}{suffix}{rest}\n"
-
-with open_text(path) as fh:
-    first = fh.readline()
-    if not first:
-        raise SystemExit(0)
-    if first.startswith("@"):
-        # FASTQ: header, seq, plus, qual
-        header = first
-        while header:
-            seq = fh.readline()
-            plus = fh.readline()
-            qual = fh.readline()
-            if not seq or not plus or not qual:
-                break
-            sys.stdout.write(rewrite_header(header, "@"))
-            sys.stdout.write(seq)
-            sys.stdout.write(rewrite_header(plus, "+"))
-            sys.stdout.write(qual)
-            header = fh.readline()
-    elif first.startswith(">"):
-        # FASTA: rewrite only header lines
-        line = first
-        while line:
-            if line.startswith(">"):
-                sys.stdout.write(rewrite_header(line, ">"))
-            else:
-                sys.stdout.write(line)
-            line = fh.readline()
-    else:
-        sys.stdout.write(first)
-        for line in fh:
-            sys.stdout.write(line)
-"""
+                mates_script = shlex.quote(str(Path(__file__).resolve().with_name("taxor_mates.py")))
                 r1 = shlex.quote(str(query_inputs[0]))
                 r2 = shlex.quote(str(query_inputs[1]))
                 script = "\n".join(
                     [
                         "set -euo pipefail",
                         f"rm -f {query_q}",
-                        f"python -u - {r1} /1 <<'PY' > {query_q}\n{python_script}\nPY",
-                        f"python -u - {r2} /2 <<'PY' >> {query_q}\n{python_script}\nPY",
+                        f"python -u {mates_script} {r1} /1 > {query_q}",
+                        f"python -u {mates_script} {r2} /2 >> {query_q}",
                         "cleanup() {",
                         f"  rm -f {query_q} || true",
                         "}",
@@ -263,6 +206,7 @@ with open_text(path) as fh:
                         str(target_tsv),
                         "--out",
                         input_file_path,
+                        *(["--index", str(build_cfg["reference_index"])] if build_cfg.get("reference_index") else []),
                     ],
                     "outputs": {"input_file": input_file_path},
                 }
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import argparse
+import shutil
+import sys
+from pathlib import Path
+from typing import BinaryIO
+
+if __package__:
+    from ..io.records import format_fastq, iter_fastq_blocks, iter_line_blocks, open_sequence_bytes
+else:  # run as a script by the taxor search step
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+    from chimera_bench.io.records import format_fastq, iter_fastq_blocks, iter_line_blocks, open_sequence_bytes
+
+
+def rewrite_header(line: bytes, prefix: bytes, suffix: bytes) -> bytes:
+    """`<prefix><id><suffix>[ <rest>]` for a header line without its newline; other lines unchanged."""
+    if not line.startswith(prefix):
+        return line
+    parts = line[len(prefix) :].split(None, 1)
+    if not parts:
+        return line
+    rest = b" " + parts[1] if len(parts) > 1 else b""
+    return prefix + parts[0] + suffix + rest
+
+
+def write_with_mate_suffix(path: Path, suffix: bytes, out: BinaryIO) -> None:
+    """Copy a FASTQ/FASTA file (optionally gzipped) to `out`, appending `suffix` to every read id.
+
+    FASTQ header and plus lines and FASTA header lines are rewritten; other input is copied as is.
+    """
+    with open_sequence_bytes(path) as fh:
+        first = fh.read(1)
+    if first == b"@":
+        for headers, seqs, pluses, quals in iter_fastq_blocks(path):
+            headers = [rewrite_header(header, b"@", suffix) for header in headers]
+            pluses = [rewrite_header(plus, b"+", suffix) for plus in pluses]
+            out.write(format_fastq(headers, seqs, pluses, quals))
+    elif first == b">":
+        for block in iter_line_blocks(path):
+            lines = [rewrite_header(line, b">", suffix) if line.startswith(b">") else line for line in block]
+            out.write(b"\n".join(lines) + b"\n")
+    elif first:
+        with open_sequence_bytes(path) as fh:
+            shutil.copyfileobj(fh, out)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("input")
+    ap.add_argument("suffix")
+    args = ap.parse_args()
+    write_with_mate_suffix(Path(args.input), args.suffix.encode("utf-8"), sys.stdout.buffer)
+    sys.stdout.buffer.flush()
+
+
+if __name__ == "__main__":
+    main()
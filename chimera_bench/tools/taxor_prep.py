@@ -1,55 +1,29 @@
 from __future__ import annotations
 
 import argparse
-import re
+import sys
 from pathlib import Path
 
+if __package__:
+    from ..io.reference_index import ReferenceIndex
+else:  # run as a script by the taxor build step
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+    from chimera_bench.io.reference_index import ReferenceIndex
 
-def _accession_from_path(path_str: str) -> str | None:
-    name = Path(path_str).name
-    parts = name.split("_")
-    if len(parts) >= 2 and parts[0] in {"GCF", "GCA"}:
-        return f"{parts[0]}_{parts[1]}"
-    match = re.search(r"(GCF|GCA)_\d+\.\d+", name)
-    if match:
-        return match.group(0)
-    return None
-
-
-def write_taxor_input(*, assembly_summary: Path, target_tsv: Path, out_path: Path) -> int:
-    assembly_map: dict[str, str] = {}
-    with assembly_summary.open("r", encoding="utf-8", errors="ignore") as fh:
-        for raw in fh:
-            line = raw.strip()
-            if not line or line.startswith("#"):
-                continue
-            parts = line.split("\t")
-            if len(parts) < 20:
-                continue
-            accession = parts[0]
-            taxid = parts[6]
-            if accession and taxid:
-                assembly_map[accession] = taxid
 
+def write_taxor_input(
+    *, assembly_summary: Path, target_tsv: Path, out_path: Path, index_path: Path | None = None
+) -> int:
     out_path.parent.mkdir(parents=True, exist_ok=True)
     written = 0
-    with target_tsv.open("r", encoding="utf-8", errors="ignore") as fin, out_path.open(
-        "w",
-        encoding="utf-8",
-    ) as fout:
-        for raw in fin:
-            line = raw.strip()
-            if not line:
-                continue
-            filepath = line.split("\t", 1)[0]
-            accession = _accession_from_path(filepath)
-            if not accession:
-                continue
-            taxid = assembly_map.get(accession)
-            if not taxid:
-                continue
-            fout.write(f"{accession}\t{taxid}\t{filepath}\n")
-            written += 1
+    with ReferenceIndex(index_path or ":memory:") as index:
+        source_id = index.ensure(target_tsv, [assembly_summary], sizes=False)
+        with out_path.open("w", encoding="utf-8") as fout:
+            for genome in index.genomes(source_id):
+                if not genome["accession"] or not genome["species_taxid"]:
+                    continue
+                fout.write(f"{genome['accession']}\t{genome['species_taxid']}\t{genome['raw_path']}\n")
+                written += 1
     return written
 
 
@@ -58,16 +32,17 @@ def main() -> None:
     ap.add_argument("--assembly-summary", required=True)
     ap.add_argument("--target-tsv", required=True)
     ap.add_argument("--out", required=True)
+    ap.add_argument("--index", default=None, help="persistent reference index (SQLite); in-memory when omitted")
     args = ap.parse_args()
 
     written = write_taxor_input(
         assembly_summary=Path(args.assembly_summary),
         target_tsv=Path(args.target_tsv),
         out_path=Path(args.out),
+        index_path=Path(args.index) if args.index else None,
     )
     print(f"Wrote {written} records to {args.out}")
 
 
 if __name__ == "__main__":
     main()
-